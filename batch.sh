@@ -2,11 +2,7 @@
 TARGET=boxing
 RUNS=4
 
-for i in $(seq 1 $RUNS); do
-  ad-load run "$TARGET" --bare
-  mv prebid_summaries.json    "${TARGET}_run_${i}_prebid_summaries.json"
-  mv google_ads_summary.json  "${TARGET}_run_${i}_google_ads_summary.json"
-  mv performance_metrics.json "${TARGET}_run_${i}_performance_metrics.json"
-done
+# Runs share one Chrome as concurrent tabs; outputs land in data/bench/<sweep>/<run_id>/
+ad-load bench "$TARGET" --runs "$RUNS" --parallel "$RUNS"
 
-echo "All done."
\ No newline at end of file
+echo "All done."
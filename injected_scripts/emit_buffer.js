@@ -0,0 +1,45 @@
+(function() {
+    // Shared event channel for the tracking scripts; injected first in the bundle
+    if (window.__adLoadPush) return;
+
+    const quiet = !!window.__adLoadQuiet;
+    const CAPACITY = 256;
+
+    // Quiet mode: events go into a preallocated slot array and leave the page
+    // in one binding call per flush, off the ad event's own task
+    const slots = new Array(CAPACITY).fill(null);
+    let size = 0;
+    let timer = null;
+
+    function send(payload) {
+        if (typeof window.__adLoadEmit !== 'function') return;
+        try { window.__adLoadEmit(payload); } catch (e) {}
+    }
+
+    function flush() {
+        if (timer !== null) {
+            clearTimeout(timer);
+            timer = null;
+        }
+        if (!size) return;
+        send(JSON.stringify(slots.slice(0, size)));
+        for (let i = 0; i < size; i++) slots[i] = null;
+        size = 0;
+    }
+
+    window.__adLoadPush = function(event) {
+        // Wall clock of the event itself, comparable across frames and with
+        // Chrome's own timestamps; "ts" is only when Python received it
+        if (event.epoch === undefined) event.epoch = performance.timeOrigin + performance.now();
+        if (!quiet) {
+            send(JSON.stringify(event));
+            return;
+        }
+        if (size === CAPACITY) flush();
+        slots[size++] = event;
+        if (timer === null) timer = setTimeout(flush, 250);
+    };
+    window.__adLoadFlush = flush;
+    window.__adLoadLog = quiet ? function() {} : console.log.bind(console);
+    window.addEventListener('pagehide', flush);
+})();
@@ -1,4 +1,6 @@
 ;(function() {
+    const frameName = window.name || 'unnamed-frame';
+
     window.googleAdsPerformanceData = window.googleAdsPerformanceData || {
         frameName,
         slotResponses: [],
@@ -7,6 +9,19 @@
         viewables: []
     }
 
+    // Push each event to Python as it happens (Runtime.addBinding channel)
+    function emit(type, data) {
+        const event = { source: 'gpt', type, frameName, t: performance.now(), data }
+        if (window.__adLoadPush) {
+            window.__adLoadPush(event)
+            return
+        }
+        if (typeof window.__adLoadEmit !== 'function') return
+        try {
+            window.__adLoadEmit(JSON.stringify(event))
+        } catch (e) {}
+    }
+
     // Polling Google Publisher Tags (GPT)
     function waitForGPT() {
         if (window.googletag && Array.isArray(window.googletag.cmd)) {
@@ -18,7 +33,7 @@
 
     // Init
     function initGPTTracking() {
-        const pubads = gogoletag.pubads()
+        const pubads = googletag.pubads()
         
         
         // Response Back from GPT
@@ -35,15 +50,17 @@
                 },
                 timestamp: performance.now()
             })
+            emit('slotResponseReceived', { slot: event.slot.getSlotElementId() })
         })
 
         // iFrame injected
         pubads.addEventListener('slotRenderEnded', event => {
-            window.googleAdsPerfromanceData.slotRenders.push({
+            window.googleAdsPerformanceData.slotRenders.push({
                 slot: event.slot.getSlotElementId(),
                 isEmpty: event.isEmpty,
                 timestamp: performance.now()
             })
+            emit('slotRenderEnded', { slot: event.slot.getSlotElementId(), isEmpty: event.isEmpty })
         })
 
         // Onload 
@@ -52,6 +69,7 @@
                 slot: event.slot.getSlotElementId(),
                 timestamp: performance.now()
             })
+            emit('slotOnLoad', { slot: event.slot.getSlotElementId() })
         })
 
         pubads.addEventListener('impressionViewable', event => {
@@ -59,9 +77,12 @@
                 slot: event.slot.getSlotElementId(),
                 timestamp: performance.now()
             })
+            emit('impressionViewable', { slot: event.slot.getSlotElementId() })
         })
 
-        console.log(`[DSQ-GPT] Google Ads Tracking Initialized in frame '${frameName}' `)
+        if (!window.__adLoadQuiet) {
+            console.log(`[DSQ-GPT] Google Ads Tracking Initialized in frame '${frameName}' `)
+        }
     }
 
         waitForGPT()
@@ -1,54 +1,182 @@
 (() => {
-  try {
-    const nav = performance.getEntriesByType("navigation")[0];
-    const paints = performance.getEntriesByType("paint");
-    const marks = performance.getEntriesByType("mark");
-    const measures = performance.getEntriesByType("measure");
-    
-    // Get LCP from Performance Observer if available
-    let lcp = null;
-    if (window.lcpValue) {
-      lcp = window.lcpValue;
+  // Injected at document start (and again into new frames), so install once
+  if (window.getPerformanceSummary) return;
+
+  const frameName = window.name || 'unnamed-frame';
+  const MAX_HOSTS = 50;
+  const MAX_IFRAMES = 20;
+  const MAX_INTERACTIONS = 10;
+
+  // Running aggregates only; no entry lists are kept
+  const state = {
+    firstPaint: null,
+    fcp: null,
+    lcp: null,
+    lcpElement: null,
+    lcpUrl: null,
+    cls: 0,
+    clsWindow: 0,
+    clsWindowStart: 0,
+    clsWindowLast: 0,
+    longTasks: { count: 0, total: 0, max: 0, tbt: 0 },
+    interactions: 0,
+    slowest: [],          // longest interaction per interactionId, top N
+    resources: { count: 0, transferSize: 0, encodedBodySize: 0, byType: {}, byHost: {} },
+    iframes: [],
+  };
+
+  function hostOf(url) {
+    try { return new URL(url).hostname; } catch (e) { return 'unknown'; }
+  }
+
+  function onPaint(entry) {
+    if (entry.name === 'first-paint') state.firstPaint = entry.startTime;
+    if (entry.name === 'first-contentful-paint') state.fcp = entry.startTime;
+  }
+
+  function onLcp(entry) {
+    state.lcp = entry.renderTime || entry.loadTime || entry.startTime;
+    state.lcpElement = entry.element ? entry.element.tagName : null;
+    state.lcpUrl = entry.url || null;
+  }
+
+  function onLayoutShift(entry) {
+    if (entry.hadRecentInput) return;
+    // Session windows: shifts < 1s apart, capped at 5s; CLS is the worst window
+    if (state.clsWindow &&
+        entry.startTime - state.clsWindowLast < 1000 &&
+        entry.startTime - state.clsWindowStart < 5000) {
+      state.clsWindow += entry.value;
+    } else {
+      state.clsWindow = entry.value;
+      state.clsWindowStart = entry.startTime;
+    }
+    state.clsWindowLast = entry.startTime;
+    state.cls = Math.max(state.cls, state.clsWindow);
+  }
+
+  function onLongTask(entry) {
+    const lt = state.longTasks;
+    lt.count += 1;
+    lt.total += entry.duration;
+    lt.max = Math.max(lt.max, entry.duration);
+    // TBT counts the part of each task beyond 50ms after FCP
+    if (state.fcp === null || entry.startTime >= state.fcp) {
+      lt.tbt += Math.max(0, entry.duration - 50);
+    }
+  }
+
+  function onEvent(entry) {
+    if (!entry.interactionId) return;
+    const known = state.slowest.find(i => i.id === entry.interactionId);
+    if (known) {
+      known.duration = Math.max(known.duration, entry.duration);
     } else {
-      const lcpEntries = paints.filter(p => p.name === "largest-contentful-paint");
-      lcp = lcpEntries.length > 0 ? lcpEntries[lcpEntries.length - 1].startTime : null;
+      state.interactions += 1;
+      state.slowest.push({ id: entry.interactionId, duration: entry.duration, type: entry.name });
+    }
+    state.slowest.sort((a, b) => b.duration - a.duration);
+    state.slowest.length = Math.min(state.slowest.length, MAX_INTERACTIONS);
+  }
+
+  function onResource(entry) {
+    const r = state.resources;
+    r.count += 1;
+    r.transferSize += entry.transferSize || 0;
+    r.encodedBodySize += entry.encodedBodySize || 0;
+    r.byType[entry.initiatorType] = (r.byType[entry.initiatorType] || 0) + 1;
+
+    const host = hostOf(entry.name);
+    let h = r.byHost[host];
+    if (!h) {
+      if (Object.keys(r.byHost).length >= MAX_HOSTS) {
+        h = r.byHost['other'] = r.byHost['other'] ||
+          { count: 0, duration: 0, transferSize: 0, lastResponseEnd: 0 };
+      } else {
+        h = r.byHost[host] = { count: 0, duration: 0, transferSize: 0, lastResponseEnd: 0 };
+      }
+    }
+    h.count += 1;
+    h.duration += entry.duration;
+    h.transferSize += entry.transferSize || 0;
+    h.lastResponseEnd = Math.max(h.lastResponseEnd, entry.responseEnd);
+
+    // Ad and Disqus iframe documents, as seen from the embedding frame
+    if (entry.initiatorType === 'iframe' && state.iframes.length < MAX_IFRAMES) {
+      state.iframes.push({
+        host: host,
+        url: entry.name.slice(0, 200),
+        startTime: entry.startTime,
+        ttfb: entry.responseStart ? entry.responseStart - entry.startTime : null,
+        duration: entry.duration,
+        transferSize: entry.transferSize || 0,
+      });
+    }
+  }
+
+  const observers = [];
+  function observe(type, handler, extra) {
+    if (!PerformanceObserver.supportedEntryTypes ||
+        !PerformanceObserver.supportedEntryTypes.includes(type)) return;
+    try {
+      const po = new PerformanceObserver(list => list.getEntries().forEach(handler));
+      po.observe(Object.assign({ type, buffered: true }, extra || {}));
+      observers.push([po, handler]);
+    } catch (e) {}
+  }
+
+  observe('paint', onPaint);
+  observe('largest-contentful-paint', onLcp);
+  observe('layout-shift', onLayoutShift);
+  observe('longtask', onLongTask);
+  observe('event', onEvent, { durationThreshold: 16 });
+  observe('first-input', onEvent);
+  observe('resource', onResource);
+
+  function inp() {
+    // INP is the 98th percentile interaction: skip one per 50 interactions
+    if (!state.slowest.length) return null;
+    const skip = Math.min(Math.floor(state.interactions / 50), state.slowest.length - 1);
+    return state.slowest[skip].duration;
+  }
+
+  // Called by the collector: drain queued entries, then read navigation timing
+  // as it stands now instead of at document start
+  window.getPerformanceSummary = function () {
+    try {
+      observers.forEach(([po, handler]) => po.takeRecords().forEach(handler));
+      const nav = performance.getEntriesByType('navigation')[0];
+      const since = v => (nav && v ? v - nav.startTime : null);
+      return {
+        frameName: frameName,
+        url: location.href,
+        ttfb: nav ? nav.responseStart - nav.requestStart : null,
+        domInteractive: nav ? since(nav.domInteractive) : null,
+        domContentLoaded: nav ? since(nav.domContentLoadedEventEnd) : null,
+        loadEvent: nav ? since(nav.loadEventEnd) : null,
+        firstPaint: state.firstPaint,
+        fcp: state.fcp,
+        lcp: state.lcp,
+        lcpElement: state.lcpElement,
+        lcpUrl: state.lcpUrl,
+        cls: state.cls,
+        tbt: state.longTasks.tbt,
+        longTasks: {
+          count: state.longTasks.count,
+          total: state.longTasks.total,
+          max: state.longTasks.max,
+        },
+        inp: inp(),
+        interactions: state.interactions,
+        totalResources: state.resources.count,
+        resources: state.resources,
+        iframes: state.iframes,
+        pageLoadTime: performance.now(),
+        userAgent: navigator.userAgent,
+        timestamp: new Date().toISOString(),
+      };
+    } catch (err) {
+      return { frameName: frameName, error: err.message, timestamp: new Date().toISOString() };
     }
-    
-    const result = {
-      // Navigation timing
-      ttfb: nav ? nav.responseStart - nav.requestStart : null,
-      domContentLoaded: nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
-      loadEvent: nav ? nav.loadEventEnd - nav.startTime : null,
-      
-      // Paint timing
-      fcp: paints.find(p => p.name === "first-contentful-paint")?.startTime || null,
-      lcp: lcp,
-      
-      // Additional metrics
-      domInteractive: nav ? nav.domInteractive - nav.startTime : null,
-      firstPaint: paints.find(p => p.name === "first-paint")?.startTime || null,
-      
-      // Resource timing
-      totalResources: performance.getEntriesByType("resource").length,
-      
-      // Custom marks and measures
-      customMarks: marks.length,
-      customMeasures: measures.length,
-      
-      // Page load time
-      pageLoadTime: performance.now(),
-      
-      // User agent info
-      userAgent: navigator.userAgent,
-      timestamp: new Date().toISOString()
-    };
-    
-    // store for later
-    window.__perfMetrics = result;
-  } catch (err) {
-    window.__perfMetrics = {
-      error: err.message,
-      timestamp: new Date().toISOString()
-    };
-  }
-})();
\ No newline at end of file
+  };
+})();
@@ -1,29 +1,70 @@
 (function() {
     const frameName = window.name || 'unnamed-frame';
-    console.log("Performance Tracker Initialized");
+    // Quiet mode: no console I/O on the main thread we are measuring
+    const quiet = !!window.__adLoadQuiet;
+    const log = quiet ? function() {} : console.log.bind(console);
+    log("Performance Tracker Initialized");
 
     const pageLoadTime = performance.now();
-    console.log("Frame loaded at:", pageLoadTime.toFixed(2), "ms, frame:", frameName);
+    if (!quiet) log("Frame loaded at:", pageLoadTime.toFixed(2), "ms, frame:", frameName);
 
     window.prebidPerformanceData = {
         frameName: frameName,
         pageLoadTime: pageLoadTime,
         bidWins: [],
         adRenders: [],
+        adRenderFailures: [],
         auctions: [],
+        targeting: [],
     };
 
     window.getPrebidPerformanceSummary = () => window.prebidPerformanceData;
 
+    // Push each event to Python as it happens (Runtime.addBinding channel)
+    function emit(type, data) {
+        const event = { source: 'prebid', type, frameName, t: performance.now(), data };
+        if (window.__adLoadPush) {
+            window.__adLoadPush(event);
+            return;
+        }
+        if (typeof window.__adLoadEmit !== 'function') return;
+        try {
+            window.__adLoadEmit(JSON.stringify(event));
+        } catch (e) {}
+    }
+
+    // Auctions are looked up by id; each carries per-bidder timings relative
+    // to its auctionInit, keyed by bidder code
+    function getAuction(auctionId) {
+        let auction = window.prebidPerformanceData.auctions.find(a => a.auctionId === auctionId);
+        if (!auction) {
+            auction = { auctionId, startTime: performance.now(), bidders: {} };
+            auction.timeSincePageLoad = auction.startTime - pageLoadTime;
+            window.prebidPerformanceData.auctions.push(auction);
+        }
+        return auction;
+    }
+
+    function getBidder(auctionId, bidder) {
+        const auction = getAuction(auctionId);
+        if (!auction.bidders[bidder]) {
+            auction.bidders[bidder] = {
+                requested: null, done: null, adUnits: 0,
+                responses: [], noBids: 0, timeouts: 0
+            };
+        }
+        return [auction, auction.bidders[bidder]];
+    }
+
     function waitForPrebid() {
         if (typeof window.pbjs !== 'undefined' &&
             typeof window.pbjs.onEvent === 'function' &&
             window.pbjs.getConfig) {
-                console.log("Prebid.js is fully loaded in frame")
+                log("Prebid.js is fully loaded in frame")
                 setupPrebidTracking();
         } else {
             if (typeof window.pbjs !== 'undefined') {
-                console.log("Prebid.js detected");
+                log("Prebid.js detected");
             }
             setTimeout(waitForPrebid, 200); // Timeout here
         }
@@ -33,24 +74,109 @@
         // Track Auction Starts
         pbjs.onEvent('auctionInit', function(data) {
             const auctionTime = performance.now();
-            console.log("Auction Started in frame:", frameName, 'ID:', data.auctionId, 'at', auctionTime.toFixed(2), 'ms');
-            window.prebidPerformanceData.auctions.push({
+            if (!quiet) log("Auction Started in frame:", frameName, 'ID:', data.auctionId, 'at', auctionTime.toFixed(2), 'ms');
+            const auction = getAuction(data.auctionId);
+            auction.startTime = auctionTime;
+            auction.timeSincePageLoad = auctionTime - pageLoadTime;
+            auction.timeout = data.timeout;
+            emit('auctionInit', {
                 auctionId: data.auctionId,
-                startTime: auctionTime,
-                timeSincePageLoad: auctionTime - pageLoadTime
+                adUnitCodes: data.adUnitCodes,
+                timeout: data.timeout
+            });
+        });
+
+        // Track Bid Requests, one per bidder per auction
+        pbjs.onEvent('bidRequested', function(request) {
+            const [auction, bidder] = getBidder(request.auctionId, request.bidderCode);
+            bidder.requested = performance.now() - auction.startTime;
+            bidder.adUnits = (request.bids || []).length;
+            emit('bidRequested', {
+                auctionId: request.auctionId,
+                bidder: request.bidderCode,
+                adUnits: bidder.adUnits
             });
         });
 
         // Track Bid Responses
         pbjs.onEvent('bidResponse', function(bid) {
             const bidTime = performance.now();
-            console.log("Bid Response in frame:", frameName, "Bidder:", bid.bidder, "CPM:", bid.cpm, 'at', bidTime.toFixed(2), 'ms');
+            if (!quiet) log("Bid Response in frame:", frameName, "Bidder:", bid.bidder, "CPM:", bid.cpm, 'at', bidTime.toFixed(2), 'ms');
+            const [auction, bidder] = getBidder(bid.auctionId, bid.bidder);
+            bidder.responses.push({
+                adUnitCode: bid.adUnitCode,
+                cpm: bid.cpm,
+                t: bidTime - auction.startTime,
+                timeToRespond: bid.timeToRespond
+            });
+            emit('bidResponse', {
+                auctionId: bid.auctionId,
+                bidder: bid.bidder,
+                cpm: bid.cpm,
+                adUnitCode: bid.adUnitCode,
+                timeToRespond: bid.timeToRespond
+            });
+        });
+
+        // Track bidders that answered without a bid
+        pbjs.onEvent('noBid', function(bid) {
+            const [auction, bidder] = getBidder(bid.auctionId, bid.bidder);
+            bidder.noBids += 1;
+            emit('noBid', {
+                auctionId: bid.auctionId,
+                bidder: bid.bidder,
+                adUnitCode: bid.adUnitCode,
+                t: performance.now() - auction.startTime
+            });
+        });
+
+        // Track bids that missed the auction timeout (one event, many bids)
+        pbjs.onEvent('bidTimeout', function(bids) {
+            (bids || []).forEach(bid => {
+                const [, bidder] = getBidder(bid.auctionId, bid.bidder);
+                bidder.timeouts += 1;
+            });
+            emit('bidTimeout', (bids || []).map(bid => ({
+                auctionId: bid.auctionId,
+                bidder: bid.bidder,
+                adUnitCode: bid.adUnitCode
+            })));
+        });
+
+        // Track when each bidder has finished all its requests
+        pbjs.onEvent('bidderDone', function(request) {
+            const [auction, bidder] = getBidder(request.auctionId, request.bidderCode);
+            bidder.done = performance.now() - auction.startTime;
+            emit('bidderDone', {
+                auctionId: request.auctionId,
+                bidder: request.bidderCode,
+                t: bidder.done
+            });
+        });
+
+        // Track targeting handed to the ad server, per ad unit
+        pbjs.onEvent('setTargeting', function(targeting) {
+            const units = Object.keys(targeting || {}).map(adUnitCode => ({
+                adUnitCode,
+                bidder: targeting[adUnitCode].hb_bidder || null,
+                pb: targeting[adUnitCode].hb_pb || null
+            }));
+            window.prebidPerformanceData.targeting.push({ t: performance.now(), units });
+            emit('setTargeting', { units });
         });
 
         // Track Auction End
         pbjs.onEvent('auctionEnd', function(data) {
             const endTime = performance.now();
-            console.log("Auction Ended in Frame:", frameName, 'ID:', data.auctionId, 'at', endTime.toFixed(2), 'ms');
+            if (!quiet) log("Auction Ended in Frame:", frameName, 'ID:', data.auctionId, 'at', endTime.toFixed(2), 'ms');
+
+            const auction = getAuction(data.auctionId);
+            auction.endTime = endTime;
+            auction.duration = endTime - auction.startTime;
+            emit('auctionEnd', {
+                auctionId: data.auctionId,
+                duration: auction.duration
+            });
         });
 
         // Track Bid Wins
@@ -58,12 +184,14 @@
             const winTime = performance.now();
             const timeSincePageLoad = winTime - pageLoadTime;
 
-            console.log('Bid WON on:', frameName);
-                console.log('  Bidder:', bid.bidder);
-                console.log('  CPM:', bid.cpm);
-                console.log('  Ad Unit:', bid.adUnitCode);
-                console.log('  Win Time:', winTime.toFixed(2), 'ms');
-                console.log('  Time since frame load:', timeSincePageLoad.toFixed(2), 'ms');
+            if (!quiet) {
+                log('Bid WON on:', frameName);
+                log('  Bidder:', bid.bidder);
+                log('  CPM:', bid.cpm);
+                log('  Ad Unit:', bid.adUnitCode);
+                log('  Win Time:', winTime.toFixed(2), 'ms');
+                log('  Time since frame load:', timeSincePageLoad.toFixed(2), 'ms');
+            }
 
             window.prebidPerformanceData.bidWins.push({
                 bidder: bid.bidder,
@@ -73,6 +201,12 @@
                 timeSincePageLoad: timeSincePageLoad,
                 auctionId: bid.auctionId
             });
+            emit('bidWon', {
+                auctionId: bid.auctionId,
+                bidder: bid.bidder,
+                cpm: bid.cpm,
+                adUnitCode: bid.adUnitCode
+            });
         });
 
         // Track Ad Rendering
@@ -80,24 +214,27 @@
             const renderTime = performance.now();
             const timeSincePageLoad = renderTime - pageLoadTime;
 
-            console.log('AD RENDERED in frame:', frameName);
-                console.log('  Ad Unit:', data.adUnitCode);
-                console.log('  Render Time:', renderTime.toFixed(2), 'ms');
-                console.log('  Time since frame load:', timeSincePageLoad.toFixed(2), 'ms');
+            if (!quiet) {
+                log('AD RENDERED in frame:', frameName);
+                log('  Ad Unit:', data.adUnitCode);
+                log('  Render Time:', renderTime.toFixed(2), 'ms');
+                log('  Time since frame load:', timeSincePageLoad.toFixed(2), 'ms');
+            }
 
             window.prebidPerformanceData.adRenders.push({
                 adUnitCode: data.adUnitCode,
                 renderTime: renderTime,
                 timeSincePageLoad: timeSincePageLoad
             });
+            emit('adRenderSucceeded', { adUnitCode: data.adUnitCode, auctionId: data.bid ? data.bid.auctionId : null });
 
             // Calcualte time from bid win to render
-            const correspondingWin = window.prebidPerformanceData.bidWins.find(
+            const correspondingWin = quiet ? null : window.prebidPerformanceData.bidWins.find(
                 win => win.adUnitCode === data.adUnitCode
             );
             if (correspondingWin) {
                 const timeToRender = renderTime - correspondingWin.winTime;
-                console.log('  Time from bid win to render:', timeToRender.toFixed(2), 'ms');
+                log('  Time from bid win to render:', timeToRender.toFixed(2), 'ms');
             }
         });
 
@@ -105,14 +242,23 @@
         // Track Ad Rendering Failures
         pbjs.onEvent('adRenderFailed', function(data) {
             // Logging unit and reasons
-            console.log("Ad Render Failed in frame:", frameName);
-            console.log('  Ad Unit:', data.adUnitCode);
-            console.log('  Reason:', data.reason);
+            log("Ad Render Failed in frame:", frameName);
+            log('  Ad Unit:', data.adUnitCode);
+            log('  Reason:', data.reason);
+
+            window.prebidPerformanceData.adRenderFailures.push({
+                adUnitCode: data.adUnitCode,
+                reason: data.reason,
+                failTime: performance.now()
+            });
+            emit('adRenderFailed', { adUnitCode: data.adUnitCode, reason: data.reason,
+                                     auctionId: data.bid ? data.bid.auctionId : null });
         });
 
         // Summary Function -> Manual Calling
         window.getPrebidPerformanceSummary = function() {
             const data = window.prebidPerformanceData;
+            if (quiet) return data;
             console.log('Prebid Performance Summary for frame:', frameName);
             console.log('  Frame Load Time:', data.pageLoadTime.toFixed(2), 'ms');
             console.log('  Total Auctions:', data.auctions.length);
@@ -142,6 +288,9 @@
     // Start the monitoring
     waitForPrebid();
 
+    // Console summaries are for watching a run by hand; quiet runs skip them
+    if (quiet) return;
+
     window.addEventListener('message', e => {
         if(e.data && e.data.type === "PREBID_SUMMARY") {
             console.log('Prebid Summary Obtained from', e.data.frameName, e.data.payload);
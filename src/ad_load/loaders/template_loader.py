@@ -14,4 +14,8 @@ def _load_raw_template(name: str) -> str:
 def render_template(name: str, **kwargs) -> str:
     raw = _load_raw_template(name)
     ctx = {"timestamp": int(time.time()), **kwargs}
-    return raw.format(**ctx)
\ No newline at end of file
+    return raw.format(**ctx)
+
+def read_template(name: str) -> str:
+    # Served as is (scripts), without placeholder substitution
+    return _load_raw_template(name)
@@ -1,6 +1,11 @@
 #Default Libraries
 import argparse
 import asyncio
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlparse
 
 # Pydoll Imports
 from pydoll.browser.chromium import Chrome
@@ -8,25 +13,308 @@ from pydoll.browser.chromium import Chrome
 #Local Imports
 from ad_load.modes.disqus_only import disqus_only
 from ad_load.modes.full_page   import full_page
+from ad_load.modes.bench       import bench
+from ad_load.modes.overhead    import overhead, ARMS
+from ad_load.modes.pool        import run_pool, DEVICES
+from ad_load.modes.serve       import serve, submit, SOCKET_PATH
+from ad_load.modes.harness     import harness_bench, FRAME_COUNTS
 from ad_load.loaders.site_loader import load_site
 from ad_load.utils.make_chrome_options import make_chrome_options
+from ad_load.utils.network_cache import NETCACHE_DIR
+from ad_load.utils.profiles import PROFILES, get_profile
+from ad_load.utils.browser_context import CACHE_MODES
+from ad_load.utils.report import report
+from ad_load.utils.results_store import RESULTS_DB, load_run, query_bidders, write_json_view
+from ad_load.utils.bidders import bidder_stats, format_bidders
+from ad_load.utils.soak import SOAK_INTERVAL, parse_duration
+from ad_load.utils.fixture_server import FixtureServer, make_scenario
+from ad_load.utils.metrics import FLUSH_INTERVAL, start_exporters
+from ad_load.utils.blocking import BLOCK_PRESETS
+from ad_load.utils.disqus_extractor import (DISQUS_CACHE, DisqusConfigCache,
+                                            fetch_disqus_info_static, resolve_disqus_info)
+
+def add_run_options(p: argparse.ArgumentParser):
+    p.add_argument("--headless", action="store_true", help="run Chrome headless")
+    p.add_argument("--mobile", action="store_true", help="Emulates a mobile device")
+    p.add_argument("--timeout", type=int, default=30, help="Hard cap before automatic exit (seconds)")
+    p.add_argument("--idle-ms", type=int, default=1500,
+                   help="Finish once every Disqus auction has rendered and ad traffic is idle this long")
+    p.add_argument("--fixed-window", action="store_true",
+                   help="Always wait the full --timeout instead of finishing on completion")
+    p.add_argument("--profile", choices=list(PROFILES),
+                   help="Network/CPU/device profile; overrides a site's own profile")
+    p.add_argument("--block", choices=[*BLOCK_PRESETS, "none"],
+                   help="Request blocking preset; overrides a site's own block rules ('none' disables them)")
+    net = p.add_mutually_exclusive_group()
+    net.add_argument("--record", action="store_true",
+                     help="Record every response into the network cache")
+    net.add_argument("--replay", action="store_true",
+                     help="Serve every request from the network cache, never the live network")
+    p.add_argument("--netcache", default=NETCACHE_DIR, help="Network cache directory")
+    p.add_argument("--db", default=RESULTS_DB, help="Results store (SQLite)")
+    p.add_argument("--json", action="store_true",
+                   help="Also write the per-run JSON summaries next to events.ndjson")
+    p.add_argument("--quiet", action="store_true",
+                   help="Buffer in-page events and skip all console output while measuring")
+    p.add_argument("--trace", action="store_true",
+                   help="Record a Chrome trace and attribute main-thread time to ad scripts")
+    p.add_argument("--filmstrip", action="store_true",
+                   help="Record a screencast filmstrip; adds Speed Index and per-slot visibility")
+    p.add_argument("--replay-delays", action="store_true",
+                   help="Delay replayed responses by their recorded latency")
+    p.add_argument("--cache", choices=CACHE_MODES, default="cold",
+                   help="cold: fresh browser context; warm: shared default context; "
+                        "primed: fresh context after one throwaway load")
+    p.add_argument("--disqus-cache", default=DISQUS_CACHE,
+                   help="Cache of each page's Disqus forum/identifier ('' to disable)")
+    p.add_argument("--soak", type=parse_duration, metavar="DURATION",
+                   help="Keep the page open this long (e.g. 30m, 2h), sampling memory and refresh cycles")
+    p.add_argument("--soak-interval", type=float, default=SOAK_INTERVAL,
+                   help="Seconds between --soak samples")
+    add_metrics_options(p)
+
+def add_metrics_options(p: argparse.ArgumentParser):
+    p.add_argument("--metrics-port", type=int,
+                   help="Serve live OpenMetrics at http://127.0.0.1:PORT/metrics")
+    p.add_argument("--metrics-file",
+                   help="Rewrite this file with the live OpenMetrics text every --metrics-interval")
+    p.add_argument("--metrics-interval", type=float, default=FLUSH_INTERVAL,
+                   help="Seconds between --metrics-file writes")
+
+def netcache_spec(args) -> dict | None:
+    if not (args.record or args.replay):
+        return None
+    return {
+        "mode": "record" if args.record else "replay",
+        "root": args.netcache,
+        "delays": args.replay_delays,
+    }
+
+def run_options(args) -> dict:
+    # Keyword arguments forwarded to every bare or full-page run
+    return {
+        "headless": args.headless,
+        "timeout": args.timeout,
+        "idle_ms": args.idle_ms,
+        "fixed_window": args.fixed_window,
+        "netcache": netcache_spec(args),
+        "db": args.db,
+        "json_out": args.json,
+        "trace": args.trace,
+        "instrument": "quiet" if args.quiet else "verbose",
+        "disqus_cache": args.disqus_cache or None,
+        "cache_mode": args.cache,
+        "filmstrip": args.filmstrip,
+        "soak": args.soak,
+        "soak_interval": args.soak_interval,
+        "block": args.block,
+    }
+
+def target_profile(sites: dict, name: str, override: str | None = None) -> str | None:
+    # --profile wins over the `profile:` key of a sites.yaml entry
+    profile = override or sites.get(name, {}).get("profile")
+    try:
+        get_profile(profile)
+    except ValueError:
+        # Only a sites.yaml value gets here; argparse already checks --profile
+        raise SystemExit(f"Unknown profile {profile!r} for {name} in sites.yaml, "
+                         f"expected one of {', '.join(PROFILES)}") from None
+    return profile
 
 def build_parser() -> argparse.ArgumentParser:
     p   = argparse.ArgumentParser()
     sub = p.add_subparsers(dest="cmd", required=True)
 
-    run = sub.add_parser("run", help="run full workflow or, with --bare, Disqus-only")
+    run = sub.add_parser("run", help="measure the full page or, with --bare, Disqus only")
     run.add_argument("target", help="site key or URL")
     run.add_argument("--bare",    action="store_true", help="render a bare Disqus-only page")
-    run.add_argument("--headless", action="store_true", help="run Chrome headless")
-    run.add_argument("--mobile", action="store_true", help="Emulates a mobile device")
-    run.add_argument("--timeout", type=int, default=30, help="Time before automatic exit (seconds)")
+    run.add_argument("--daemon",  action="store_true",
+                     help="submit the run to a running `ad-load serve` instead of launching Chrome")
+    run.add_argument("--socket",  default=SOCKET_PATH, help="Daemon socket for --daemon")
+    add_run_options(run)
     
+    bn = sub.add_parser("bench", help="repeat bare Disqus runs as concurrent tabs in one Chrome")
+    bn.add_argument("targets", nargs="+", help="site keys or URLs")
+    bn.add_argument("--full", action="store_true", help="measure the full pages instead of bare Disqus")
+    bn.add_argument("--runs", type=int, default=4, help="Runs per target")
+    bn.add_argument("--parallel", type=int, default=4, help="Maximum concurrent tabs")
+    add_run_options(bn)
+    bn.add_argument("--workers", type=int, default=0,
+                    help="Run jobs in N worker processes, each with its own Chrome")
+    bn.add_argument("--devices", nargs="+", choices=DEVICES,
+                    help="Device sweep (requires --workers); defaults to --mobile")
+    bn.add_argument("--job-timeout", type=int,
+                    help="Seconds before a pool worker is considered hung and restarted "
+                         "(default: --soak + --timeout + 90)")
+
+    oh = sub.add_parser("overhead", help="measure how much the injected instrumentation shifts metrics")
+    oh.add_argument("target", help="site key or URL")
+    oh.add_argument("--runs", type=int, default=5, help="Runs per arm")
+    oh.add_argument("--arms", nargs="+", choices=ARMS, default=list(ARMS),
+                    help="Instrumentation levels to compare; the first is the baseline")
+    add_run_options(oh)
+
+    hb = sub.add_parser("harness", help="benchmark the harness itself against the offline fixture")
+    hb.add_argument("--frames", nargs="+", type=int, default=list(FRAME_COUNTS),
+                    help="Fixture frame counts to sweep")
+    hb.add_argument("--runs", type=int, default=3, help="Runs per frame count")
+    hb.add_argument("--seed", type=int, default=1, help="Seed for the stub bidders' latencies")
+    hb.add_argument("--baseline", help="Exit non-zero on a significant regression against this result")
+    hb.add_argument("--save-baseline", help="Store this result as the new baseline")
+    hb.add_argument("--threshold", type=float, default=0.1,
+                    help="Minimum relative slowdown (0.1 = 10%%) that counts as a regression")
+    add_run_options(hb)
+
+    fx = sub.add_parser("fixture", help="serve the offline fixture page until interrupted")
+    fx.add_argument("--port", type=int, default=8800, help="Port on 127.0.0.1 and localhost")
+    fx.add_argument("--frames", type=int, default=2, help="Disqus-like iframes on the page")
+    fx.add_argument("--depth", type=int, default=1, help="Frames nested inside each of those")
+    fx.add_argument("--top-slots", type=int, default=0, help="Ad slots on the page itself")
+    fx.add_argument("--refresh-ms", type=int, default=0, help="Re-run auctions every N ms")
+    fx.add_argument("--seed", type=int, default=1, help="Seed for the stub bidders' latencies")
+
+    rp = sub.add_parser("report", help="aggregate saved runs and check them against a baseline")
+    rp.add_argument("paths", nargs="*",
+                    help="run or sweep directories; reads the results store when omitted")
+    rp.add_argument("--db", default=RESULTS_DB, help="Results store (SQLite)")
+    rp.add_argument("--days", type=float, help="Only runs from the last N days (results store only)")
+    rp.add_argument("--out", help="Write the aggregated report as JSON")
+    rp.add_argument("--baseline", help="Exit non-zero on a significant regression against this report")
+    rp.add_argument("--save-baseline", help="Store this report as the new baseline")
+    rp.add_argument("--threshold", type=float, default=0.05,
+                    help="Minimum relative slowdown counted as a regression")
+    rp.add_argument("--boot", type=int, default=1000, help="Bootstrap resamples per metric")
+    rp.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Processes used to parse run files")
+
+    bd = sub.add_parser("bidders", help="per-bidder latency, timeout and no-bid rates across runs")
+    bd.add_argument("--db", default=RESULTS_DB, help="Results store (SQLite)")
+    bd.add_argument("--days", type=float, help="Only runs from the last N days")
+    bd.add_argument("--site", help="Only runs of this site")
+    bd.add_argument("--out", help="Write the per-bidder stats as JSON")
+
+    ex = sub.add_parser("export", help="write a stored run back out as JSON files")
+    ex.add_argument("run_id", help="run id as recorded in the results store")
+    ex.add_argument("--db", default=RESULTS_DB, help="Results store (SQLite)")
+    ex.add_argument("--out", help="Output directory (default data/<run_id>)")
+
+    sv = sub.add_parser("serve", help="keep warm Chrome instances and run jobs sent by `run --daemon`")
+    sv.add_argument("--socket", default=SOCKET_PATH, help="Unix socket to listen on")
+    sv.add_argument("--browsers", type=int, default=1, help="Warm Chrome instances (concurrent runs)")
+    sv.add_argument("--max-runs", type=int, default=50, help="Relaunch a browser after this many runs")
+    sv.add_argument("--max-growth-mb", type=float, default=1024,
+                    help="Relaunch a browser whose process tree grew this much since launch")
+    sv.add_argument("--health-interval", type=float, default=30,
+                    help="Seconds between health checks of idle browsers")
+    sv.add_argument("--headless", action="store_true", help="run Chrome headless")
+    sv.add_argument("--mobile", action="store_true", help="Emulates a mobile device")
+    sv.add_argument("--status", action="store_true", help="Print the running daemon's health and exit")
+    add_metrics_options(sv)
+
+    wm = sub.add_parser("warm", help="prefill the Disqus config cache so runs skip the extra page load")
+    wm.add_argument("targets", nargs="*", help="site keys or URLs (default: every site in sites.yaml)")
+    wm.add_argument("--disqus-cache", default=DISQUS_CACHE, help="Disqus config cache file")
+    wm.add_argument("--refresh", action="store_true", help="Re-resolve entries that are still fresh")
+    wm.add_argument("--forget", action="store_true", help="Only drop the targets' cache entries")
+    wm.add_argument("--static-only", action="store_true",
+                    help="Never start Chrome; report pages the static parse can't resolve")
+    wm.add_argument("--headless", action="store_true", help="run Chrome headless for the fallback")
+
     sub.add_parser("list", help="show saved site shortcuts")
 
     return p
 
+def resolve_target(sites: dict, target: str) -> tuple[str, str]:
+    if target in sites:
+        return target, sites[target]["url"]
+    name = urlparse(target).netloc or target
+    return name.removeprefix("www."), target
+
+def resolve_targets(sites: dict, targets: list[str]) -> list[tuple[str, str]]:
+    # Names key run ids, output directories and sweep results, so two URLs on
+    # one host get a short hash of the URL appended to tell them apart
+    resolved = [resolve_target(sites, t) for t in targets]
+    urls     = [url for _, url in resolved]
+    repeated = sorted({url for url in urls if urls.count(url) > 1})
+    if repeated:
+        raise SystemExit(f"Duplicate targets: {', '.join(repeated)}")
+    names = [name for name, _ in resolved]
+    return [
+        (f"{name}-{hashlib.sha1(url.encode()).hexdigest()[:6]}"
+         if names.count(name) > 1 and name not in sites else name, url)
+        for name, url in resolved
+    ]
+
+async def submit_run(sites: dict, args):
+    name, url = resolve_target(sites, args.target)
+    options   = run_options(args)
+    options.pop("headless")
+    request   = {"cmd": "run", "url": url, "site": name, "mode": "bare" if args.bare else "full",
+                 "profile": target_profile(sites, name, args.profile), "options": options}
+
+    def progress(msg):
+        print(f"[daemon] {msg['run_id']} {msg['event']}"
+              + (f" on browser {msg['browser']}" if "browser" in msg else ""))
+    try:
+        result = await submit(request, args.socket, on_event=progress)
+    except (ConnectionError, FileNotFoundError):
+        raise SystemExit(f"No daemon listening on {args.socket}; start one with `ad-load serve`")
+    if result["event"] == "error":
+        raise SystemExit(f"[daemon] {result['run_id']} failed: {result['error']}")
+    run = result["summary"]["run"]
+    print(f"[daemon] {run['run_id']} done: completed={run['completed']} "
+          f"waited={run['waited']:.1f}s events={run['events']}")
+
+async def warm(sites: dict, args):
+    cache   = DisqusConfigCache(args.disqus_cache)
+    targets = resolve_targets(sites, args.targets or list(sites))
+    if args.forget:
+        for name, url in targets:
+            cache.invalidate(url)
+            print(f"[warm] {name:20} dropped")
+        return
+
+    # Static fetches run side by side; only the leftovers need Chrome
+    todo = [(n, u) for n, u in targets if args.refresh or cache.get(u) is None]
+    for name, url in targets:
+        if (name, url) not in todo:
+            print(f"[warm] {name:20} cached {cache.get(url)}")
+    found = await asyncio.gather(*(asyncio.to_thread(fetch_disqus_info_static, u) for _, u in todo))
+
+    misses = []
+    for (name, url), info in zip(todo, found):
+        if info:
+            cache.put(url, *info, source="static")
+            print(f"[warm] {name:20} static  {info}")
+        else:
+            misses.append((name, url))
+    if not misses:
+        return
+    if args.static_only:
+        for name, _ in misses:
+            print(f"[warm] {name:20} unresolved")
+        return
+
+    options = await make_chrome_options(headless=args.headless)
+    async with Chrome(options=options) as browser:
+        await browser.start()
+        for name, url in misses:
+            cache.invalidate(url)
+            info = await resolve_disqus_info(browser, url, cache=cache, static=False)
+            print(f"[warm] {name:20} browser {info}")
+
 async def app(args):
+    # Exporters live as long as the command; commands without the options get none
+    exporters = start_exporters(getattr(args, "metrics_port", None),
+                                getattr(args, "metrics_file", None),
+                                getattr(args, "metrics_interval", FLUSH_INTERVAL))
+    try:
+        await run_command(args)
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+
+async def run_command(args):
     sites = load_site()
 
     if args.cmd == "list":
@@ -34,7 +322,70 @@ async def app(args):
             print(f"{name:20} {info['url']}")
         return
 
-    url = sites.get(args.target, {}).get("url", args.target)
+    if args.cmd == "report":
+        since = time.time() - args.days * 86400 if args.days else 0
+        code = report(args.paths, db=args.db, since=since, out=args.out, baseline=args.baseline,
+                      save_baseline=args.save_baseline, threshold=args.threshold,
+                      n_boot=args.boot, jobs=args.jobs)
+        raise SystemExit(code)
+
+    if args.cmd == "bidders":
+        since = time.time() - args.days * 86400 if args.days else 0
+        stats = bidder_stats(query_bidders(args.db, since, args.site))
+        print(format_bidders(stats))
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(stats, f, indent=2)
+            print(f"Wrote {args.out}")
+        return
+
+    if args.cmd == "export":
+        summary = load_run(args.db, args.run_id)
+        if summary is None:
+            raise SystemExit(f"No run {args.run_id!r} in {args.db}")
+        for out in write_json_view(args.out or os.path.join("data", args.run_id), summary):
+            print(f"Wrote {out}")
+        return
+
+    if args.cmd == "serve":
+        if args.status:
+            try:
+                health = await submit({"cmd": "health"}, args.socket)
+            except (ConnectionError, FileNotFoundError):
+                raise SystemExit(f"No daemon listening on {args.socket}")
+            print(json.dumps(health, indent=2))
+            return
+        await serve(args.socket, browsers=args.browsers, headless=args.headless,
+                    device="mobile" if args.mobile else "desktop", max_runs=args.max_runs,
+                    max_growth_mb=args.max_growth_mb, health_interval=args.health_interval)
+        return
+
+    if args.cmd == "run" and args.daemon:
+        await submit_run(sites, args)
+        return
+
+    if args.cmd == "warm":
+        await warm(sites, args)
+        return
+
+    if args.cmd == "fixture":
+        scenario = make_scenario(frames=args.frames, depth=args.depth, top_slots=args.top_slots,
+                                 refresh_ms=args.refresh_ms, seed=args.seed)
+        with FixtureServer(scenario, port=args.port) as server:
+            print(f"Serving the fixture page at {server.url} (Ctrl+C to stop)")
+            await asyncio.Event().wait()
+
+    if args.cmd == "bench" and (args.workers or args.devices):
+        if not args.workers:
+            raise SystemExit("--devices requires --workers")
+        targets = resolve_targets(sites, args.targets)
+        devices = args.devices or ["mobile" if args.mobile else "desktop"]
+        profiles = {name: target_profile(sites, name, args.profile) for name, _ in targets}
+        await run_pool(targets, runs=args.runs, workers=args.workers, devices=devices,
+                       job_timeout=args.job_timeout, profiles=profiles,
+                       mode="full" if args.full else "bare", **run_options(args))
+        return
+
     options = await make_chrome_options(
         headless=args.headless,
         mobile=args.mobile,
@@ -42,11 +393,34 @@ async def app(args):
     
     try:
         async with Chrome(options=options) as browser:
+            await browser.start()
+            if args.cmd == "bench":
+                targets  = resolve_targets(sites, args.targets)
+                profiles = {name: target_profile(sites, name, args.profile) for name, _ in targets}
+                await bench(browser, targets, runs=args.runs, parallel=args.parallel,
+                            profiles=profiles, mode="full" if args.full else "bare",
+                            **run_options(args))
+                return
+            if args.cmd == "harness":
+                opts = run_options(args)
+                opts.pop("disqus_cache")
+                code = await harness_bench(browser, args.frames, runs=args.runs,
+                                           scenario={"seed": args.seed}, baseline=args.baseline,
+                                           save_baseline=args.save_baseline,
+                                           threshold=args.threshold, profile=args.profile, **opts)
+                raise SystemExit(code)
+
+            name, url = resolve_target(sites, args.target)
+            profile   = target_profile(sites, name, args.profile)
+            if args.cmd == "overhead":
+                await overhead(browser, url, name, runs=args.runs, arms=args.arms,
+                               profile=profile, **run_options(args))
+                return
             if args.bare:
-                await disqus_only(browser, url, headless=args.headless, timeout=args.timeout)
+                await disqus_only(browser, url, site=name, profile=profile, **run_options(args))
                 print("Hello")
             else:
-                await full_page(browser, url, headless=args.headless)
+                await full_page(browser, url, site=name, profile=profile, **run_options(args))
     except asyncio.CancelledError:
         pass
     except (OSError, ConnectionResetError):
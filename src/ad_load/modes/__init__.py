@@ -1,4 +1,8 @@
 __all__ = [
+    "measure",
     "disqus_only",
-    "full_page"
+    "full_page",
+    "bench",
+    "overhead",
+    "serve",
 ]
\ No newline at end of file
@@ -0,0 +1,94 @@
+# Default Libraries
+import asyncio
+import json
+import os
+import time
+
+# Local Imports
+from ad_load.modes.disqus_only import disqus_only
+from ad_load.modes.full_page import full_page
+from ad_load.modes.measure import DATA_DIR
+from ad_load.utils.metrics import QUEUE_DEPTH
+from ad_load.utils.results_store import new_id
+
+BENCH_DIR = os.path.join(DATA_DIR, "bench")
+
+def runner(mode: str):
+    # "bare" or "full" (see measure.MODES)
+    return full_page if mode == "full" else disqus_only
+
+def make_run_id(name: str, index: int, sweep_id: str | None = None) -> str:
+    # Prefixed with the sweep so a later sweep never reuses an id in the store
+    return f"{sweep_id}-{name}-{index:03d}" if sweep_id else f"{name}-{index:03d}"
+
+def plan_runs(targets: list[tuple[str, str]], runs: int,
+              sweep_id: str | None = None) -> list[tuple[str, str, str]]:
+    # Interleave targets so every batch of concurrent tabs mixes sites
+    # instead of hammering one publisher with N identical loads.
+    return [
+        (make_run_id(name, i, sweep_id), name, url)
+        for i in range(1, runs + 1)
+        for name, url in targets
+    ]
+
+def write_sweep(sweep_dir: str, index: dict, summaries: dict) -> dict:
+    out_index = os.path.join(sweep_dir, "index.json")
+    with open(out_index, "w") as f:
+        json.dump(index, f, indent=2)
+
+    # Every run's summaries in one file, keyed by run id
+    out_merged = os.path.join(sweep_dir, "merged.json")
+    with open(out_merged, "w") as f:
+        json.dump(summaries, f, indent=2)
+
+    print(f"Sweep finished in {index['wall_time']:.1f}s, wrote {out_index}")
+    return index
+
+async def bench(browser, targets: list[tuple[str, str]], runs: int = 1, parallel: int = 4,
+                out_dir: str = BENCH_DIR, profiles: dict | None = None, mode: str = "bare",
+                **run_opts) -> dict:
+    sweep_id  = new_id()
+    sweep_dir = os.path.join(out_dir, sweep_id)
+    os.makedirs(sweep_dir, exist_ok=True)
+
+    planned = plan_runs(targets, runs, sweep_id)
+    slots   = asyncio.Semaphore(max(1, parallel))
+    summaries = {}
+    run_page  = runner(mode)
+    print(f"Bench {sweep_id}: {len(planned)} {mode} runs, {parallel} concurrent tabs")
+
+    QUEUE_DEPTH.set(len(planned), queue="bench")
+
+    async def one(run_id: str, name: str, url: str) -> dict:
+        async with slots:
+            QUEUE_DEPTH.dec(queue="bench")
+            started = time.time()
+            profile = (profiles or {}).get(name)
+            record  = {"run_id": run_id, "target": name, "url": url, "profile": profile,
+                       "started": started}
+            try:
+                summaries[run_id] = await run_page(
+                    browser, url, out_dir=os.path.join(sweep_dir, run_id), run_id=run_id,
+                    site=name, profile=profile, **run_opts
+                )
+                record["status"] = "ok"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                record["status"] = "error"
+                record["error"]  = str(e)
+            record["elapsed"] = time.time() - started
+            print(f"[bench] {run_id} {record['status']} in {record['elapsed']:.1f}s")
+            return record
+
+    wall_start = time.time()
+    records = await asyncio.gather(*(one(*run) for run in planned))
+
+    return write_sweep(sweep_dir, {
+        "sweep_id": sweep_id,
+        "runs": runs,
+        "parallel": parallel,
+        "mode": mode,
+        "wall_time": time.time() - wall_start,
+        "results": {r["run_id"]: r for r in records},
+    }, summaries)
@@ -0,0 +1,105 @@
+# Default Libraries
+import json
+import os
+import time
+from collections import defaultdict
+
+# Third Party
+import numpy as np
+
+# Local Imports
+from ad_load.modes.bench import BENCH_DIR
+from ad_load.modes.measure import measure_page
+from ad_load.utils.fixture_server import FixtureServer, make_scenario
+from ad_load.utils.report import compare, summarize
+
+FRAME_COUNTS = (1, 2, 4, 8)
+
+# All ms except commands_per_frame; attach_ms and commands_per_frame have one
+# sample per frame, the rest one per run
+HARNESS_METRICS = ("attach_ms", "commands_per_frame", "collect_ms", "overhead_ms", "wall_ms")
+
+def harness_samples(summary: dict, wall_ms: float) -> list[tuple[str, float]]:
+    run     = summary["run"]
+    stats   = run["injection"]
+    samples = [("attach_ms", ms) for ms in stats.get("attach_ms", {}).values()]
+    samples += [("commands_per_frame", n) for n in stats["per_frame"].values()]
+    samples += [
+        ("collect_ms", run["collect_ms"]),
+        # Everything but the page's own load: setup, collection and teardown
+        ("overhead_ms", wall_ms - run["waited"] * 1000),
+        ("wall_ms", wall_ms),
+    ]
+    return samples
+
+def collect_slope(groups: dict) -> float | None:
+    # ms of collection added per extra frame, fitted over the frame counts
+    points = [(int(label.split()[0]), metrics["collect_ms"]["p50"]["value"])
+              for label, metrics in groups.get("fixture", {}).items() if "collect_ms" in metrics]
+    if len(points) < 2:
+        return None
+    counts, values = zip(*points)
+    return float(np.polyfit(counts, values, 1)[0])
+
+def format_harness(groups: dict) -> str:
+    lines = [f"{'frames':10} {'metric':20} {'n':>5} {'p50':>10} {'p95':>10}"]
+    for label, metrics in groups.get("fixture", {}).items():
+        for metric in HARNESS_METRICS:
+            if metric in metrics:
+                s = metrics[metric]
+                lines.append(f"{label:10} {metric:20} {s['n']:>5} "
+                             f"{s['p50']['value']:10.1f} {s['p95']['value']:10.1f}")
+    return "\n".join(lines)
+
+async def harness_bench(browser, frame_counts: list[int] = FRAME_COUNTS, runs: int = 3,
+                        out_dir: str = BENCH_DIR, scenario: dict | None = None,
+                        baseline: str | None = None, save_baseline: str | None = None,
+                        threshold: float = 0.1, n_boot: int = 1000, **run_opts) -> int:
+    # Full-page runs against the offline fixture, one server per frame count
+    sweep_id  = time.strftime("harness-%Y%m%d-%H%M%S")
+    sweep_dir = os.path.join(out_dir, sweep_id)
+    os.makedirs(sweep_dir, exist_ok=True)
+
+    run_opts = {**run_opts, "db": None}
+    run_opts.pop("netcache", None)
+    grouped  = defaultdict(list)
+    for count in frame_counts:
+        label = f"{count:02d} frames"
+        with FixtureServer(make_scenario(**{**(scenario or {}), "frames": count})) as server:
+            for i in range(1, runs + 1):
+                run_id  = f"f{count:02d}-{i:03d}"
+                started = time.monotonic()
+                summary = await measure_page(browser, server.url, mode="full", run_id=run_id,
+                                             out_dir=os.path.join(sweep_dir, run_id),
+                                             site="fixture", **run_opts)
+                wall_ms = (time.monotonic() - started) * 1000
+                for metric, value in harness_samples(summary, wall_ms):
+                    grouped[("fixture", label, metric)].append(value)
+                print(f"[harness] {run_id} done in {wall_ms:.0f}ms "
+                      f"(completed={summary['run']['completed']})")
+
+    groups = summarize({k: np.asarray(v, dtype=float) for k, v in grouped.items()}, n_boot)
+    slope  = collect_slope(groups)
+    result = {"generated": time.time(), "frame_counts": list(frame_counts), "runs": runs,
+              "collect_ms_per_frame": slope, "groups": groups}
+    print(format_harness(groups))
+    if slope is not None:
+        print(f"\nCollection adds {slope:.1f}ms per frame")
+
+    out = os.path.join(sweep_dir, "harness.json")
+    for path in (out, save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(result, f, indent=2)
+            print(f"Wrote {path}")
+
+    if not baseline:
+        return 0
+    with open(baseline) as f:
+        regressions = compare(groups, json.load(f)["groups"], threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['profile']} {r['metric']} {r['percentile']}: "
+              f"{r['baseline']:.1f} -> {r['current']:.1f}")
+    if not regressions:
+        print(f"No significant harness regressions against {baseline}")
+    return 1 if regressions else 0
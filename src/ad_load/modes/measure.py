@@ -0,0 +1,331 @@
+# Default Libraries
+import base64
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+# Pydoll Imports
+from pydoll.commands.fetch_commands import FetchCommands
+from pydoll.constants import RequestStage, ResourceType
+from pydoll.protocol.page.events import PageEvent
+
+# Local Imports
+from ad_load.loaders.script_loader import load_script
+from ad_load.utils.cdp_injector import inject_scripts
+from ad_load.utils.completion import CompletionDetector
+from ad_load.utils.event_stream import EventSink
+from ad_load.utils.collector import ContextRegistry, collect_summaries, probe_page, split_summaries
+from ad_load.utils.interception import RequestInterceptor, exact_url_pattern
+from ad_load.utils.network_cache import make_network_cache
+from ad_load.utils.profiles import get_profile, apply_profile
+from ad_load.utils.results_store import RESULTS_DB, new_id, save_run, write_json_view
+from ad_load.utils.tracing import TraceRecorder, summarize_trace
+from ad_load.utils.browser_context import RunContext, preload
+from ad_load.utils.filmstrip import FilmstripRecorder, ad_slot_boxes, summarize_filmstrip
+from ad_load.utils.soak import SOAK_INTERVAL, SoakSampler
+from ad_load.utils.metrics import EventMetrics, track_run
+from ad_load.utils.blocking import RequestBlocker, TransferStats, site_rules
+
+DATA_DIR = "data"
+
+# bare: the Disqus embed alone, served in place of the publisher document.
+# full: the publisher page as is, with every frame's ads counted.
+MODES = ("bare", "full")
+
+async def rewrite_document(tab, interceptor: RequestInterceptor, url: str, html: str):
+    # Serves `html` in place of the target document, then stops intercepting it
+    async def on_document(p, session):
+        if session or p.get("resourceType") != "Document" or p["request"]["url"] != url:
+            return False
+        b64 = base64.b64encode(html.encode()).decode()
+        await tab._execute_command(
+            FetchCommands.fulfill_request(
+                request_id    = p["requestId"],
+                response_code = 200,
+                response_headers=[{"name":"Content-Type","value":"text/html"}],
+                body          = b64,
+            )
+        )
+        # Rewrite done, nothing else needs to pause
+        await interceptor.remove("document")
+        return True
+
+    await interceptor.add("document", [{
+        "urlPattern": exact_url_pattern(url),
+        "resourceType": ResourceType.DOCUMENT,
+        "requestStage": RequestStage.RESPONSE,
+    }], on_document)
+
+@track_run
+async def measure_page(browser, url: str, html: str | None = None, mode: str = "bare",
+                       headless: bool = False, timeout: int = 30,
+                       out_dir: str = DATA_DIR, idle_ms: int = 1500,
+                       fixed_window: bool = False, run_id: str | None = None,
+                       netcache: dict | None = None, profile: str | None = None,
+                       site: str | None = None, db: str | None = RESULTS_DB,
+                       json_out: bool = False, trace: bool = False,
+                       instrument: str = "verbose",
+                       cache_mode: str = "cold", filmstrip: bool = False,
+                       soak: float | None = None, soak_interval: float = SOAK_INTERVAL,
+                       block: str | None = None) -> dict:
+    # One measured load of `url`; `html`, when given, replaces its document
+    cache = make_network_cache(netcache)
+    emulation = get_profile(profile)
+    # The site's block rules, unless `block` names a preset (or "none")
+    rules = site_rules(site, block)
+
+    # Its own browser context per run; --cache decides what is in it beforehand
+    async with RunContext(browser, cache_mode) as context:
+        preload_ms = None
+        if cache_mode == "primed":
+            preload_start = time.monotonic()
+            scratch = await context.new_tab()
+            try:
+                await apply_profile(scratch, emulation)
+                scratch_interceptor = RequestInterceptor(scratch)
+                if html is not None:
+                    await rewrite_document(scratch, scratch_interceptor, url, html)
+                if rules:
+                    await RequestBlocker(rules).install(scratch, scratch_interceptor)
+                if cache:
+                    await cache.install(scratch, scratch_interceptor)
+                await preload(scratch, url, timeout, idle_ms)
+            finally:
+                await scratch.close()
+            preload_ms = (time.monotonic() - preload_start) * 1000
+            print(f"Primed cache in {preload_ms / 1000:.1f}s")
+
+        tab = await context.new_tab()
+        sink = film = tracer = soaking = None
+        try:
+            # Listening for context
+            registry = ContextRegistry()
+            await registry.attach(tab)
+            # Runtime.enable and auto-attach come from the frame pipeline below,
+            # which pauses every iframe until its setup is in place
+
+            # Streaming every pushed Prebid/GPT event to disk as it happens
+            os.makedirs(out_dir, exist_ok=True)
+            run_id = run_id or new_id()
+            sink = EventSink(os.path.join(out_dir, "events.ndjson"), run_id=run_id, registry=registry,
+                             profile=profile)
+            if instrument != "none":
+                await sink.attach(tab)
+            sink.subscribe(EventMetrics().on_event)
+
+            # Bare runs finish on the Disqus frames' auctions; a full page may hold
+            # any number of auctions (or none), so it finishes on load plus idle ads
+            detector = CompletionDetector(tab, idle_ms=idle_ms,
+                                          frame_prefix="dsq-" if mode == "bare" else None)
+            sink.subscribe(detector.on_event)
+            await detector.start()
+
+            # Bytes per resource type, and what block rules kept off the wire.
+            # Not in the "none" arm, which keeps Network off like the page alone
+            transfer = None
+            if instrument != "none":
+                transfer = TransferStats()
+                await transfer.attach(tab)
+
+            # Throttling and device emulation for this tab and its ad iframes
+            await apply_profile(tab, emulation)
+
+            # Main-thread totals for the top frame, read back by probe_page
+            await tab._execute_command({"method": "Performance.enable"})
+
+            # Script Injection ("none" leaves the page untouched for overhead baselines)
+            if instrument != "none":
+                emit_js = load_script("emit_buffer.js")
+                prebid_js = load_script("prebid_tracking.js")
+                google_js = load_script("google_ads.js")
+                performance_js = load_script("performance_metrics.js")
+                await inject_scripts(tab, emit_js, prebid_js, performance_js, google_js,
+                                     quiet=instrument == "quiet")
+            # Iframe sessions get the block rules and Network.enable from the
+            # frame pipeline, which has to run even with nothing injected
+            await tab.attach_frames()
+
+            # Only the target document is intercepted, so bidder requests and
+            # creatives never pause in the harness (unless recording or replaying)
+            interceptor = RequestInterceptor(tab)
+
+            if html is not None:
+                await rewrite_document(tab, interceptor, url, html)
+            # Before the network cache, so blocked requests are never recorded or replayed
+            blocker = None
+            if rules:
+                blocker = RequestBlocker(rules)
+                await blocker.install(tab, interceptor)
+            if cache:
+                await cache.install(tab, interceptor)
+
+            tracer = None
+            if trace:
+                tracer = TraceRecorder(tab, os.path.join(out_dir, "trace.json.gz"))
+                await tracer.start()
+
+            film = None
+            if filmstrip:
+                film = FilmstripRecorder(tab, os.path.join(out_dir, "filmstrip"))
+                sink.subscribe(film.on_event)
+                await tab.cdp.track_sessions()
+                await film.start()
+
+            # Refresh cycles are counted from the first auction on
+            sampler = None
+            if soak:
+                sampler = SoakSampler(tab, os.path.join(out_dir, "soak.ndjson"), interval=soak_interval)
+                await sampler.attach()
+                sink.subscribe(sampler.on_event)
+                await tab.cdp.track_sessions()
+
+            loaded = asyncio.Event()
+            await tab.on(PageEvent.LOAD_EVENT_FIRED, lambda _ev: loaded.set(), temporary=True)
+
+            nav_start = time.time()
+            await tab.go_to_commit(url)
+            soaking = asyncio.create_task(sampler.run(soak)) if sampler else None
+
+            print(f"{'Bare Disqus' if mode == 'bare' else 'Full'} page loaded.")
+            started_at = time.time()
+            started   = time.monotonic()
+            completed = False
+            if fixed_window:
+                try:
+                    await asyncio.wait_for(asyncio.Event().wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    print("Time limit reached, collecting.")
+            else:
+                if mode == "full":
+                    try:
+                        await asyncio.wait_for(loaded.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                completed = await detector.wait(max(0, timeout - (time.monotonic() - started)))
+                if completed:
+                    print(f"Ad activity settled after {time.monotonic() - started:.1f}s, collecting.")
+                else:
+                    print("Time limit reached, collecting.")
+            waited = time.monotonic() - started
+
+            # The page stays open for the rest of the soak, sampled every soak_interval
+            if soaking:
+                print(f"Soaking for {max(0, soak - waited) / 60:.1f} more minutes.")
+                await soaking
+            run_meta = {
+                "run_id": run_id,
+                "mode": mode,
+                "instrument": instrument,
+                "site": site or urlparse(url).netloc.removeprefix("www."),
+                "url": url,
+                "started": started_at,
+                "completed": completed,
+                "waited": waited,
+                "timeout": timeout,
+                "idle_ms": None if fixed_window else idle_ms,
+                "events": sink.count,
+                "fetch_paused": dict(interceptor.paused),
+                "injection": tab.injection_stats(),
+                "profile": emulation,
+                "cache": {"mode": cache_mode, "context": context.id is not None,
+                          "preload_ms": preload_ms},
+            }
+            if cache:
+                run_meta["netcache"] = {"mode": netcache["mode"], **cache.stats}
+            if transfer:
+                run_meta["network"] = transfer.summary()
+                print(f"Transferred {run_meta['network']['transferred_bytes'] / 1024:.0f}KB "
+                      f"({run_meta['network']['ad_bytes'] / 1024:.0f}KB ad path), "
+                      f"blocked {run_meta['network']['blocked_requests']} requests")
+            if blocker:
+                run_meta["block"] = {**rules, "filtered": blocker.blocked}
+            if sampler:
+                run_meta["soak"] = sampler.summary()
+                for flag in run_meta["soak"]["flags"]:
+                    print(f"[soak] {flag}")
+                print(f"Wrote {sampler.count} soak samples over {run_meta['soak']['cycles']} "
+                      f"refresh cycles to {sampler.path}")
+            print(f"Fetch paused {interceptor.paused}")
+            run_meta["probe"] = await probe_page(tab)
+
+            # Speed Index, and when each ad slot actually became visible
+            if film:
+                await film.stop()
+                try:
+                    slots = await ad_slot_boxes(tab, top_level=mode == "full")
+                except Exception as e:
+                    print(f"[WARN] reading ad slot boxes failed: {e}")
+                    slots = []
+                film_summary = await asyncio.to_thread(summarize_filmstrip, film.frames, film.hists,
+                                                       slots, film.renders, nav_start)
+                film_summary.update(skipped=film.skipped, dropped=film.dropped, dir=film.dir)
+                out_film = os.path.join(out_dir, "filmstrip.json")
+                with open(out_film, "w") as f:
+                    json.dump(film_summary, f, indent=2)
+                film_summary.pop("progress")
+                run_meta["filmstrip"] = film_summary
+                print(f"Wrote {film_summary['frames']} filmstrip frames, "
+                      f"Speed Index {film_summary['speed_index'] or 0:.0f}ms, to {out_film}")
+
+            # Main-thread cost per Disqus frame and script origin
+            trace_summary = None
+            if tracer:
+                await tracer.stop()
+                trace_summary = await asyncio.to_thread(summarize_trace, tracer.path)
+                run_meta["trace"] = {"path": tracer.path, "bytes": tracer.bytes,
+                                     "events": trace_summary["events"]}
+                out_trace = os.path.join(out_dir, "trace_summary.json")
+                with open(out_trace, "w") as f:
+                    json.dump(trace_summary["frames"], f, indent=2)
+                print(f"Wrote trace attribution to {out_trace}")
+
+            # Capturing Prebid, Google Ads and Web Vitals in one pass over live frames
+            collect_start = time.monotonic()
+            collected = await collect_summaries(tab, registry)
+            filtered_summaries, filtered_ga, perf_data = split_summaries(
+                collected, prefix="dsq-" if mode == "bare" else None)
+            for summaries in (filtered_summaries, filtered_ga, perf_data):
+                for frame in summaries.values():
+                    frame["profile"] = profile
+            # Closed after collection so events flushed from quiet-mode buffers still land
+            sink.close()
+            run_meta["events"] = sink.count
+            run_meta["frames"] = len(collected)
+            run_meta["collect_ms"] = (time.monotonic() - collect_start) * 1000
+
+            summary = {
+                "prebid": filtered_summaries,
+                "google_ads": filtered_ga,
+                "performance": perf_data,
+                "run": run_meta,
+            }
+            if trace_summary:
+                summary["trace"] = trace_summary["frames"]
+
+            # Every run lands in the results store; the JSON files are an optional
+            # view, written first so a failed insert still leaves the run on disk
+            if json_out:
+                for out in write_json_view(out_dir, summary):
+                    print(f"Wrote {out}")
+            if db:
+                await asyncio.to_thread(save_run, db, summary)
+                print(f"\nStored run {run_id} in {db}")
+        finally:
+            # Also on a failed run: nothing of it may outlive the tab
+            if soaking and not soaking.done():
+                soaking.cancel()
+                await asyncio.gather(soaking, return_exceptions=True)
+            if sink:
+                sink.close()
+            for what, cleanup in (("stopping the filmstrip", film and film.stop),
+                                  ("ending the trace", tracer and tracer.abort),
+                                  ("closing the tab", tab.close)):
+                if cleanup:
+                    try:
+                        await cleanup()
+                    except Exception as e:
+                        print(f"[WARN] {what} failed: {e}")
+
+        return summary
@@ -0,0 +1,87 @@
+# Default Libraries
+import json
+import os
+import time
+
+# Third Party
+import numpy as np
+
+# Local Imports
+from ad_load.modes.disqus_only import disqus_only
+from ad_load.modes.bench import BENCH_DIR
+from ad_load.utils.report import bootstrap_ci
+
+ARMS = ("none", "quiet", "verbose")
+
+# Keys of run["probe"]; all are ms except heap_mb
+PROBE_METRICS = ("ttfb", "fcp", "lcp", "domContentLoaded", "loadEvent",
+                 "script_ms", "task_ms", "layout_ms", "style_ms", "heap_mb")
+
+def plan_arms(arms: list[str], runs: int) -> list[tuple[str, str]]:
+    # Arms alternate run by run so slow drift (network, CDN caches) hits all of them
+    return [(f"{arm}-{i:03d}", arm) for i in range(1, runs + 1) for arm in arms]
+
+def compare_arms(probes: dict[str, list[dict]], baseline: str = "none",
+                 n_boot: int = 1000) -> dict:
+    # Median per arm with a bootstrap CI, and the shift against the baseline arm
+    result = {}
+    for metric in PROBE_METRICS:
+        medians = {}
+        for arm, rows in probes.items():
+            values = np.array([r[metric] for r in rows if r.get(metric) is not None], dtype=float)
+            if not len(values):
+                continue
+            lo, hi = bootstrap_ci(values, [50], n_boot)[0] if len(values) > 1 else (values[0],) * 2
+            medians[arm] = {"n": int(len(values)), "median": float(np.median(values)),
+                            "lo": float(lo), "hi": float(hi)}
+        base = medians.get(baseline)
+        for arm, stats in medians.items():
+            if base and arm != baseline:
+                stats["delta"] = stats["median"] - base["median"]
+                stats["shift"] = stats["delta"] / base["median"] if base["median"] else None
+        if medians:
+            result[metric] = medians
+    return result
+
+def format_overhead(result: dict, arms: list[str]) -> str:
+    lines = [f"{'metric':18}" + "".join(f"{arm:>26}" for arm in arms)]
+    for metric, medians in result.items():
+        cells = []
+        for arm in arms:
+            s = medians.get(arm)
+            if s is None:
+                cells.append(f"{'-':>26}")
+            elif "delta" in s:
+                shift = f" ({s['shift']:+.1%})" if s["shift"] is not None else ""
+                cells.append(f"{s['median']:10.1f} {s['delta']:+8.1f}{shift:>8}")
+            else:
+                cells.append(f"{s['median']:26.1f}")
+        lines.append(f"{metric:18}" + "".join(cells))
+    return "\n".join(lines)
+
+async def overhead(browser, url: str, name: str, runs: int = 5, arms: list[str] = ARMS,
+                   out_dir: str = BENCH_DIR, n_boot: int = 1000, **run_opts) -> dict:
+    # Runs are sequential: concurrent tabs would measure each other's load
+    sweep_id  = time.strftime("overhead-%Y%m%d-%H%M%S")
+    sweep_dir = os.path.join(out_dir, sweep_id)
+    os.makedirs(sweep_dir, exist_ok=True)
+
+    # Every arm waits the same fixed window; "none" has no events to finish on
+    run_opts = {**run_opts, "fixed_window": True, "db": None}
+    run_opts.pop("instrument", None)
+    probes   = {arm: [] for arm in arms}
+    for run_id, arm in plan_arms(list(arms), runs):
+        summary = await disqus_only(browser, url, out_dir=os.path.join(sweep_dir, run_id),
+                                    run_id=run_id, site=name, instrument=arm, **run_opts)
+        probes[arm].append(summary["run"]["probe"])
+        print(f"[overhead] {run_id} done")
+
+    result = compare_arms(probes, baseline=arms[0], n_boot=n_boot)
+    print(format_overhead(result, list(arms)))
+
+    out = os.path.join(sweep_dir, "overhead.json")
+    with open(out, "w") as f:
+        json.dump({"target": name, "url": url, "runs": runs, "arms": list(arms),
+                   "probes": probes, "metrics": result}, f, indent=2)
+    print(f"Wrote {out}")
+    return result
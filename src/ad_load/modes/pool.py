@@ -0,0 +1,261 @@
+# Default Libraries
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import signal
+import socket
+import time
+from collections import deque
+
+# Pydoll Imports
+from pydoll.browser.chromium import Chrome
+
+# Local Imports
+from ad_load.modes.bench import BENCH_DIR, plan_runs, runner, write_sweep
+from ad_load.utils.make_chrome_options import make_chrome_options
+from ad_load.utils.metrics import QUEUE_DEPTH, RUNS, RUNS_IN_FLIGHT
+from ad_load.utils.results_store import new_id
+
+DEVICES   = ("desktop", "mobile")
+JOB_SETUP = 90      # seconds on top of a run's own window: Chrome launch, collection, teardown
+
+def job_deadline(run_opts: dict) -> float:
+    # A run waits up to --timeout, then stays open for the rest of --soak
+    return (run_opts.get("soak") or 0) + (run_opts.get("timeout") or 0) + JOB_SETUP
+
+def make_jobs(targets: list[tuple[str, str]], runs: int, devices: list[str],
+              sweep_dir: str, profiles: dict | None = None, mode: str = "bare",
+              sweep_id: str | None = None) -> list[dict]:
+    jobs = []
+    for device in devices:
+        for run_id, name, url in plan_runs(targets, runs, sweep_id):
+            if len(devices) > 1:
+                run_id = f"{run_id}-{device}"
+            jobs.append({
+                "job": run_id,
+                "run_id": run_id,
+                "target": name,
+                "url": url,
+                "device": device,
+                "profile": (profiles or {}).get(name),
+                "mode": mode,
+                "out_dir": os.path.join(sweep_dir, run_id),
+                "attempt": 1,
+            })
+    return jobs
+
+def job_attempt(job: dict) -> dict:
+    # A killed attempt may already have saved its run, so each retry stores
+    # under its own id and directory
+    if job["attempt"] == 1:
+        return job
+    suffix = f"-a{job['attempt']}"
+    return {**job, "run_id": job["run_id"] + suffix, "out_dir": job["out_dir"] + suffix}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def launch_browser(device: str, headless: bool) -> Chrome:
+    options = await make_chrome_options(headless=headless, mobile=device == "mobile")
+    browser = Chrome(options=options, connection_port=_free_port())
+    await browser.start()
+    return browser
+
+async def _worker_loop(worker_id: int, inbox, result_q, headless: bool, run_opts: dict):
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    # One Chrome per device, launched on first use and kept for the next jobs
+    browsers = {}
+    try:
+        result_q.put(("ready", worker_id))
+        while True:
+            try:
+                job = await asyncio.to_thread(inbox.get, True, 0.5)
+            except queue.Empty:
+                continue
+            if job is None:
+                break
+
+            started = time.time()
+            record  = {"run_id": job["run_id"], "job": job["job"], "target": job["target"],
+                       "url": job["url"], "device": job["device"], "profile": job["profile"], "worker": worker_id,
+                       "attempt": job["attempt"], "started": started}
+            summary = None
+            try:
+                if job["device"] not in browsers:
+                    browsers[job["device"]] = await launch_browser(job["device"], headless)
+                summary = await runner(job["mode"])(browsers[job["device"]], job["url"],
+                                            out_dir=job["out_dir"], run_id=job["run_id"],
+                                            site=job["target"], profile=job["profile"],
+                                            headless=headless, **run_opts)
+                record["status"] = "ok"
+            except Exception as e:
+                # A broken browser is relaunched on the next job
+                browser = browsers.pop(job["device"], None)
+                if browser is not None:
+                    await stop_browser(browser)
+                record["status"] = "error"
+                record["error"]  = str(e)
+            record["elapsed"] = time.time() - started
+            result_q.put(("done", worker_id, record, summary))
+            result_q.put(("ready", worker_id))
+    finally:
+        for browser in browsers.values():
+            await stop_browser(browser)
+
+async def stop_browser(browser: Chrome):
+    try:
+        await browser.stop()
+    except Exception:
+        pass
+
+def _worker_main(worker_id: int, inbox, result_q, headless: bool, run_opts: dict):
+    # Ctrl+C is handled by the coordinator, which terminates workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        asyncio.run(_worker_loop(worker_id, inbox, result_q, headless, run_opts))
+    except asyncio.CancelledError:
+        pass
+
+class _Worker:
+    def __init__(self, ctx, worker_id: int, result_q, headless: bool, run_opts: dict):
+        self.id      = worker_id
+        self.job     = None
+        self.started = None
+        self.inbox   = ctx.Queue()
+        self.proc    = ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.inbox, result_q, headless, run_opts),
+            daemon=True,
+        )
+        self.proc.start()
+
+    def terminate(self, grace: float = 5.0):
+        if not self.proc.is_alive():
+            return
+        # SIGTERM first so the worker can close its Chrome, then force it
+        self.proc.terminate()
+        self.proc.join(grace)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+
+async def run_pool(targets: list[tuple[str, str]], runs: int = 1, workers: int = 2,
+                   devices: list[str] = ("desktop",), headless: bool = False,
+                   job_timeout: float | None = None, max_attempts: int = 2,
+                   out_dir: str = BENCH_DIR, profiles: dict | None = None, mode: str = "bare",
+                   **run_opts) -> dict:
+    sweep_id  = new_id()
+    sweep_dir = os.path.join(out_dir, sweep_id)
+    os.makedirs(sweep_dir, exist_ok=True)
+
+    # --job-timeout overrides the deadline derived from the run's own window
+    deadline = job_timeout or job_deadline(run_opts)
+    ctx      = mp.get_context("spawn")
+    result_q = ctx.Queue()
+
+    # The coordinator owns the shared job queue and hands the next job to
+    # whichever worker reports ready, so it always knows who holds what.
+    # Records are keyed by the run id of the attempt that finished the job.
+    jobs    = {job["job"]: job for job in make_jobs(targets, runs, list(devices), sweep_dir,
+                                                  profiles, mode, sweep_id)}
+    pending = deque(jobs)
+    print(f"Pool {sweep_id}: {len(jobs)} jobs across {workers} worker processes")
+
+    records, summaries, finished = {}, {}, set()
+    next_id = 0
+    pool    = {}
+    idle    = deque()
+    crashes = 0
+
+    def spawn():
+        nonlocal next_id
+        next_id += 1
+        pool[next_id] = _Worker(ctx, next_id, result_q, headless, run_opts)
+
+    def fail(worker: _Worker, reason: str):
+        # The job a dead or hung worker was holding is retried on another worker
+        job    = jobs[worker.job]
+        run_id = job_attempt(job)["run_id"]
+        print(f"[pool] worker {worker.id} {reason} on {run_id}")
+        if job["attempt"] < max_attempts:
+            job["attempt"] += 1
+            pending.appendleft(job["job"])
+        else:
+            finished.add(job["job"])
+            records[run_id] = {"run_id": run_id, "job": job["job"], "target": job["target"],
+                                      "url": job["url"], "device": job["device"],
+                                      "profile": job["profile"],
+                                      "worker": worker.id, "attempt": job["attempt"],
+                                      "status": "error", "error": reason}
+
+    for _ in range(max(1, workers)):
+        spawn()
+
+    wall_start = time.time()
+    try:
+        while len(finished) < len(jobs):
+            try:
+                msg = await asyncio.to_thread(result_q.get, True, 0.5)
+            except queue.Empty:
+                msg = None
+
+            if msg and msg[0] == "ready" and msg[1] in pool:
+                idle.append(pool[msg[1]])
+            elif msg and msg[0] == "done" and msg[1] in pool:
+                _, wid, record, summary = msg
+                finished.add(record["job"])
+                records[record["run_id"]] = record
+                RUNS.inc(status=record["status"])
+                if summary is not None:
+                    summaries[record["run_id"]] = summary
+                pool[wid].job = None
+                print(f"[pool] {record['run_id']} {record['status']} in {record['elapsed']:.1f}s "
+                      f"({len(finished)}/{len(jobs)})")
+
+            now = time.time()
+            for wid, worker in list(pool.items()):
+                hung = worker.job and now - worker.started > deadline
+                if worker.proc.is_alive() and not hung:
+                    continue
+                worker.terminate()
+                del pool[wid]
+                if worker in idle:
+                    idle.remove(worker)
+                if worker.job:
+                    fail(worker, "timed out" if hung else f"exited ({worker.proc.exitcode})")
+                else:
+                    crashes += 1
+                    if crashes > 3 * max(1, workers):
+                        raise RuntimeError("pool workers keep exiting before taking a job")
+                if len(finished) < len(jobs):
+                    spawn()
+
+            while pending and idle:
+                worker = idle.popleft()
+                worker.job, worker.started = pending.popleft(), time.time()
+                worker.inbox.put(job_attempt(jobs[worker.job]))
+
+            # Runs happen in the workers; the coordinator exports what it sees
+            QUEUE_DEPTH.set(len(pending), queue="pool")
+            RUNS_IN_FLIGHT.set(sum(1 for w in pool.values() if w.job))
+    finally:
+        for worker in pool.values():
+            worker.inbox.put(None)
+        for worker in pool.values():
+            worker.proc.join(10)
+            worker.terminate()
+
+    return write_sweep(sweep_dir, {
+        "sweep_id": sweep_id,
+        "runs": runs,
+        "workers": workers,
+        "devices": list(devices),
+        "mode": mode,
+        "wall_time": time.time() - wall_start,
+        "results": records,
+    }, summaries)
@@ -0,0 +1,294 @@
+# Default Libraries
+import asyncio
+import json
+import os
+import time
+
+# Local Imports
+from ad_load.modes.bench import runner
+from ad_load.modes.measure import DATA_DIR, MODES
+from ad_load.modes.pool import launch_browser, stop_browser
+from ad_load.utils.metrics import QUEUE_DEPTH
+
+SOCKET_PATH  = os.path.join(DATA_DIR, "ad-load.sock")
+DAEMON_DIR   = os.path.join(DATA_DIR, "daemon")
+STREAM_LIMIT = 64 * 1024 * 1024
+
+# Run options a client may set per job; headless and device are the daemon's
+JOB_OPTIONS = ("timeout", "idle_ms", "fixed_window", "netcache", "db", "json_out",
+               "trace", "instrument", "disqus_cache", "cache_mode", "filmstrip",
+               "soak", "soak_interval", "block")
+
+# Messages after which the daemon closes the connection
+FINAL_EVENTS = ("done", "error", "health")
+
+def process_tree_rss_mb(pid: int) -> float | None:
+    # Linux only: resident memory of Chrome plus every renderer/GPU/utility child
+    try:
+        entries = [e for e in os.listdir("/proc") if e.isdigit()]
+    except OSError:
+        return None
+    children = {}
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        stack.extend(children.get(p, ()))
+        try:
+            with open(f"/proc/{p}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            continue
+    return total / 2**20
+
+# One warm Chrome. It is replaced after max_runs runs, once its process tree
+# has grown max_growth_mb past its size at launch, or when it stops answering.
+class BrowserSlot:
+    def __init__(self, slot_id: int, device: str, headless: bool,
+                 max_runs: int, max_growth_mb: float):
+        self.id            = slot_id
+        self.device        = device
+        self.headless      = headless
+        self.max_runs      = max_runs
+        self.max_growth_mb = max_growth_mb
+        self.browser       = None
+        self.busy          = False
+        # Held across health check, recycle, relaunch and run, so the monitor
+        # and a job never act on the same browser at once
+        self.lock          = asyncio.Lock()
+        self.runs          = 0
+        self.total_runs    = 0
+        self.generation    = 0
+        self.launched      = None
+        self.base_mb       = None
+
+    def memory_mb(self) -> float | None:
+        process = getattr(getattr(self.browser, "_browser_process_manager", None), "_process", None)
+        return process_tree_rss_mb(process.pid) if process is not None else None
+
+    async def ensure(self):
+        if self.browser is None:
+            self.browser    = await launch_browser(self.device, self.headless)
+            self.generation += 1
+            self.runs       = 0
+            self.launched   = time.time()
+            self.base_mb    = self.memory_mb()
+        return self.browser
+
+    async def healthy(self, timeout: float = 5) -> bool:
+        try:
+            await asyncio.wait_for(self.browser.get_version(), timeout)
+            return True
+        except Exception:
+            return False
+
+    def recycle_reason(self) -> str | None:
+        if self.runs >= self.max_runs:
+            return f"{self.runs} runs"
+        mem = self.memory_mb()
+        if mem is not None and self.base_mb is not None and mem - self.base_mb > self.max_growth_mb:
+            return f"memory +{mem - self.base_mb:.0f}MB"
+        return None
+
+    async def recycle(self, reason: str):
+        print(f"[serve] recycling browser {self.id} ({reason})")
+        browser, self.browser = self.browser, None
+        if browser is not None:
+            await stop_browser(browser)
+
+    def status(self) -> dict:
+        return {
+            "id": self.id,
+            "up": self.browser is not None,
+            "busy": self.busy,
+            "generation": self.generation,
+            "runs": self.runs,
+            "total_runs": self.total_runs,
+            "uptime": time.time() - self.launched if self.browser is not None else None,
+            "memory_mb": self.memory_mb(),
+            "base_mb": self.base_mb,
+        }
+
+class Daemon:
+    def __init__(self, browsers: int = 1, device: str = "desktop", headless: bool = True,
+                 max_runs: int = 50, max_growth_mb: float = 1024,
+                 health_interval: float = 30, out_dir: str = DAEMON_DIR):
+        self.slots   = [BrowserSlot(i + 1, device, headless, max_runs, max_growth_mb)
+                        for i in range(max(1, browsers))]
+        self.jobs    = asyncio.Queue()
+        self.out_dir = out_dir
+        self.health_interval = health_interval
+        self.started = time.time()
+        self.done    = 0
+        self.failed  = 0
+        self._seq    = 0
+        self._tasks  = []
+
+    async def start(self, warm: bool = True):
+        # Browsers launch up front so the first job doesn't pay for it
+        if warm:
+            await asyncio.gather(*(slot.ensure() for slot in self.slots))
+        self._tasks = [asyncio.create_task(self._slot_loop(slot)) for slot in self.slots]
+        self._tasks.append(asyncio.create_task(self._monitor()))
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for slot in self.slots:
+            if slot.browser is not None:
+                await stop_browser(slot.browser)
+                slot.browser = None
+
+    async def run_job(self, slot: BrowserSlot, job: dict) -> dict:
+        if slot.browser is not None and not await slot.healthy():
+            await slot.recycle("health check failed")
+        browser = await slot.ensure()
+        opts    = {k: v for k, v in (job.get("options") or {}).items() if k in JOB_OPTIONS}
+        mode    = job.get("mode") or "bare"
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}; choose from {', '.join(MODES)}")
+        try:
+            summary = await runner(mode)(browser, job["url"], headless=slot.headless,
+                                         out_dir=os.path.join(self.out_dir, job["run_id"]),
+                                         run_id=job["run_id"], site=job.get("site"),
+                                         profile=job.get("profile"), **opts)
+        except Exception:
+            await slot.recycle("run failed")
+            raise
+        finally:
+            slot.runs       += 1
+            slot.total_runs += 1
+        reason = slot.recycle_reason()
+        if reason:
+            await slot.recycle(reason)
+        return summary
+
+    async def _slot_loop(self, slot: BrowserSlot):
+        while True:
+            job, reply = await self.jobs.get()
+            QUEUE_DEPTH.set(self.jobs.qsize(), queue="daemon")
+            async with slot.lock:
+                slot.busy = True
+                reply.put_nowait({"event": "started", "run_id": job["run_id"], "browser": slot.id})
+                try:
+                    summary = await self.run_job(slot, job)
+                    self.done += 1
+                    reply.put_nowait({"event": "done", "run_id": job["run_id"], "summary": summary})
+                except Exception as e:
+                    self.failed += 1
+                    reply.put_nowait({"event": "error", "run_id": job["run_id"], "error": str(e)})
+                finally:
+                    slot.busy = False
+                    self.jobs.task_done()
+
+    async def _monitor(self):
+        # Idle browsers that stopped answering are replaced before a job finds them
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for slot in self.slots:
+                if slot.lock.locked():
+                    continue
+                async with slot.lock:
+                    if slot.browser is None or await slot.healthy():
+                        continue
+                    await slot.recycle("health check failed")
+                    try:
+                        await slot.ensure()
+                    except Exception as e:
+                        print(f"[serve] relaunching browser {slot.id} failed: {e}")
+
+    def health(self) -> dict:
+        return {
+            "event": "health",
+            "uptime": time.time() - self.started,
+            "queued": self.jobs.qsize(),
+            "done": self.done,
+            "failed": self.failed,
+            "browsers": [slot.status() for slot in self.slots],
+        }
+
+    def next_run_id(self, site: str | None) -> str:
+        self._seq += 1
+        return f"{site or 'run'}-{time.strftime('%Y%m%d-%H%M%S')}-{self._seq:04d}"
+
+    async def handle(self, reader, writer):
+        # One JSON request line in; NDJSON events out until a final one
+        async def send(msg: dict):
+            writer.write(json.dumps(msg, default=str).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            try:
+                request = json.loads(await reader.readline())
+            except ValueError:
+                await send({"event": "error", "error": "bad request"})
+                return
+            if request.get("cmd") == "health":
+                await send(self.health())
+            elif request.get("cmd") == "run":
+                # Ids are always the daemon's own; a client-chosen one could
+                # collide with a run already in the results store
+                job   = {**request, "run_id": self.next_run_id(request.get("site"))}
+                reply = asyncio.Queue()
+                await self.jobs.put((job, reply))
+                QUEUE_DEPTH.set(self.jobs.qsize(), queue="daemon")
+                await send({"event": "queued", "run_id": job["run_id"], "position": self.jobs.qsize()})
+                while True:
+                    msg = await reply.get()
+                    await send(msg)
+                    if msg["event"] in FINAL_EVENTS:
+                        break
+            else:
+                await send({"event": "error", "error": f"unknown cmd {request.get('cmd')!r}"})
+        except ConnectionError:
+            # The client went away; a queued job still runs and is stored
+            pass
+        finally:
+            writer.close()
+
+async def serve(socket_path: str = SOCKET_PATH, **daemon_opts):
+    if os.path.exists(socket_path):
+        try:
+            await submit({"cmd": "health"}, socket_path)
+            raise SystemExit(f"A daemon is already listening on {socket_path}")
+        except (ConnectionError, FileNotFoundError):
+            os.unlink(socket_path)
+
+    daemon = Daemon(**daemon_opts)
+    await daemon.start()
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    server = await asyncio.start_unix_server(daemon.handle, path=socket_path, limit=STREAM_LIMIT)
+    print(f"[serve] listening on {socket_path} with {len(daemon.slots)} browser(s)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await daemon.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+async def submit(request: dict, socket_path: str = SOCKET_PATH, on_event=None) -> dict:
+    # Sends one request and returns the final message; earlier ones go to on_event
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+    try:
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("daemon closed the connection")
+            msg = json.loads(line)
+            if msg.get("event") in FINAL_EVENTS:
+                return msg
+            if on_event:
+                on_event(msg)
+    finally:
+        writer.close()
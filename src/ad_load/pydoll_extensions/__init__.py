@@ -1,3 +1,4 @@
+from .cdp_client import CDPClient, CDPError, SessionDetached
 from .tab_wrapper import TabWrapper
 
-__all__ = ["TabWrapper"]
\ No newline at end of file
+__all__ = ["CDPClient", "CDPError", "SessionDetached", "TabWrapper"]
\ No newline at end of file
@@ -0,0 +1,130 @@
+# Default Libraries
+import asyncio
+import functools
+import json
+import time
+
+# Local Imports
+from ad_load.utils.metrics import CDP_LATENCY
+
+# Any session, as opposed to None which means the top-level target only
+ALL_SESSIONS = object()
+
+class CDPError(Exception):
+    def __init__(self, method: str, error: dict, session: str | None = None):
+        self.method  = method
+        self.code    = error.get("code")
+        self.session = session
+        super().__init__(f"{method} failed{f' in {session}' if session else ''}: "
+                         f"{error.get('message', error)}")
+
+class SessionDetached(Exception):
+    pass
+
+def _observe_latency(method: str, sent: float, future: asyncio.Future):
+    # Only commands sent through this client; pydoll's own _execute_command
+    # calls are not seen here
+    if not future.cancelled() and future.exception() is None:
+        CDP_LATENCY.observe(time.monotonic() - sent, method=method)
+
+# Sits on the tab's own pydoll connection. Ids and futures come from pydoll's
+# command manager, so responses are never confused with pydoll's commands;
+# sessionId is added per call, so any auto-attached iframe can be driven
+# through the same websocket.
+class CDPClient:
+    def __init__(self, tab, timeout: float = 10):
+        self._tab      = tab
+        self.timeout   = timeout
+        self.sessions  = {}
+        self._pending  = {}
+        self._routes   = {}
+        self._tracking = False
+
+    @property
+    def _handler(self):
+        return self._tab._connection_handler
+
+    async def send_many(self, commands: list[dict], session: str | None = None,
+                        timeout: float | None = None) -> list[dict]:
+        # Every frame is written before any reply is awaited, so a paused
+        # iframe receives its whole setup in one burst
+        handler = self._handler
+        await handler._ensure_active_connection()
+        manager = handler._command_manager
+        pending = self._pending.setdefault(session, set())
+
+        futures = []
+        for command in commands:
+            command = dict(command)
+            if session:
+                command["sessionId"] = session
+            future = manager.create_command_future(command)
+            pending.add(command["id"])
+            futures.append((command["id"], future))
+            await handler._ws_connection.send(json.dumps(command))
+            # Timed per command, from its own send to its own reply
+            future.add_done_callback(functools.partial(_observe_latency, command["method"],
+                                                       time.monotonic()))
+
+        try:
+            raw = await asyncio.wait_for(asyncio.gather(*(f for _, f in futures)),
+                                         timeout or self.timeout)
+        except asyncio.TimeoutError:
+            for command_id, _ in futures:
+                manager.remove_pending_command(command_id)
+            raise
+        finally:
+            pending.difference_update(command_id for command_id, _ in futures)
+        return [json.loads(r) if isinstance(r, str) else r for r in raw]
+
+    async def send(self, command: dict, session: str | None = None,
+                   timeout: float | None = None) -> dict:
+        (response,) = await self.send_many([command], session, timeout)
+        return response
+
+    async def call(self, method: str, params: dict | None = None, session: str | None = None,
+                   timeout: float | None = None) -> dict:
+        # Like send, but returns the result and raises CDPError on failure
+        response = await self.send({"method": method, "params": params or {}}, session, timeout)
+        if "error" in response:
+            raise CDPError(method, response["error"], session)
+        return response.get("result", {})
+
+    async def on(self, event: str, callback, session=ALL_SESSIONS):
+        # One pydoll registration per event name; callbacks are filtered by
+        # sessionId here (None = top-level target only)
+        if event not in self._routes:
+            self._routes[event] = []
+            await self._tab.on(event, lambda ev, event=event: self._route(event, ev))
+        self._routes[event].append((session, callback))
+
+    def _route(self, event: str, ev: dict):
+        session = ev.get("sessionId")
+        for wanted, callback in list(self._routes.get(event, ())):
+            if wanted is not ALL_SESSIONS and wanted != session:
+                continue
+            result = callback(ev)
+            if asyncio.iscoroutine(result):
+                asyncio.ensure_future(result)
+
+    async def track_sessions(self):
+        # Keeps self.sessions current and fails commands still waiting on a
+        # session that has gone away, instead of letting them time out
+        if self._tracking:
+            return
+        self._tracking = True
+        await self.on("Target.attachedToTarget", self._on_attached)
+        await self.on("Target.detachedFromTarget", self._on_detached)
+
+    def _on_attached(self, ev):
+        p = ev["params"]
+        self.sessions[p["sessionId"]] = p.get("targetInfo", {})
+
+    def _on_detached(self, ev):
+        session = ev["params"].get("sessionId")
+        self.sessions.pop(session, None)
+        pending = self._handler._command_manager._pending_commands
+        for command_id in self._pending.pop(session, ()):
+            future = pending.pop(command_id, None)
+            if future is not None and not future.done():
+                future.set_exception(SessionDetached(session))
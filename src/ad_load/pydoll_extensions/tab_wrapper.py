@@ -1,19 +1,28 @@
 # Default Libraries
 import asyncio
-import itertools
-import json
+import time
 
 # Pydoll Imports
 from pydoll.browser.tab import Tab
 from pydoll.commands.page_commands import PageCommands
 from pydoll.protocol.page.events import PageEvent
 from pydoll.commands.runtime_commands import RuntimeCommands
-from pydoll.commands.dom_commands  import DomCommands
+
+# Local Imports
+from ad_load.pydoll_extensions.cdp_client import CDPClient
 
 class TabWrapper():
     def __init__(self, real_tab: Tab):
         self._tab = real_tab
-        self._cdp_id = itertools.count(1)
+        self.cdp = CDPClient(real_tab)
+        self._session_commands = []
+        self._bundles = []
+        self._frame_pipeline = False
+        # CDP commands issued for injection, keyed by frame id ("page" = tab setup)
+        self.command_counts = {}
+        self.attach_errors = {}
+        # Attach -> iframe released, ms per frame
+        self.attach_ms = {}
                 
     async def go_to_commit(self, url: str):
         if await self._tab._refresh_if_url_not_changed(url):
@@ -40,39 +49,56 @@ class TabWrapper():
         )
         return resp["result"]["result"]["value"]
     
-    async def inject_script(self, script: str):
-        await self._tab._execute_command(
-            PageCommands.add_script_to_evaluate_on_new_document(
-                source=script,
-                run_immediately=True
-            )
-        )
-        
-    async def inject_into_new_frames(self, user_script: str):        
-        user_code_literal = json.dumps(user_script)
-
-        wrapper = f"""
-            ;(function(){{
-                try {{
-                    const fe = window.frameElement;
-                    const me = fe ? `iframe#${{fe.id}}` : 'top-level';
-                    console.log(`[DSQ-DBG] running in ${{me}} @ ${{location.href}}`);
-                    console.log('[DSQ-DBG] wrapper executing in frame:', fe && fe.id, location.hostname);
-
-                    const sources = Array.from(document.getElementsByTagName('iframe'))
-                                        .map(f => f.src || '<no-src>');
-                    console.log(`[DSQ-DBG] child iframes:`, sources);
-
-                    (new Function(userCode))();
-                }} catch(e) {{
-                    console.error("[DSQ-DBG] wrapper error", e);
-                }}
-            }})();
-        """
-
-        await self._tab._execute_command(DomCommands.enable())
-
-        await self._tab._execute_command({
+    def add_session_command(self, method: str, params: dict | None = None):
+        # Sent to every attached iframe session before it is released
+        self._session_commands.append({"method": method, "params": params or {}})
+
+    async def inject_bundle(self, source: str):
+        # Registered for new documents in this target right away; iframes in
+        # other processes get it from the single attach handler below
+        self._bundles.append(source)
+        await self._send_counted("page", PageCommands.add_script_to_evaluate_on_new_document(
+            source=source,
+            run_immediately=True
+        ))
+        await self.attach_frames()
+
+    async def attach_frames(self):
+        # Auto-attaches iframes and releases each one after the session
+        # commands (and any bundles) are in place; installed once per tab
+        if not self._frame_pipeline:
+            self._frame_pipeline = True
+            await self._install_frame_pipeline()
+
+    async def _send_counted(self, frame: str, command: dict):
+        self.command_counts[frame] = self.command_counts.get(frame, 0) + 1
+        return await self._tab._execute_command(command)
+
+    def injection_stats(self) -> dict:
+        frames = {k: v for k, v in self.command_counts.items() if k != "page"}
+        return {
+            "frames": len(frames),
+            "commands": sum(self.command_counts.values()),
+            "page_commands": self.command_counts.get("page", 0),
+            "per_frame": frames,
+            "attach_errors": self.attach_errors,
+            "attach_ms": self.attach_ms,
+        }
+
+    async def _install_frame_pipeline(self):
+        # Default execution context per same-target frame, for the frame walker
+        contexts = {}
+
+        def on_context(ev):
+            info = ev["params"]["context"]
+            aux  = info.get("auxData", {})
+            if aux.get("frameId") and aux.get("isDefault", True):
+                contexts[aux["frameId"]] = info["id"]
+
+        await self.cdp.track_sessions()
+        await self.cdp.on("Runtime.executionContextCreated", on_context, session=None)
+        await self._send_counted("page", RuntimeCommands.enable())
+        await self._send_counted("page", {
             "method": "Target.setAutoAttach",
             "params": {
                 "autoAttach": True,
@@ -81,16 +107,10 @@ class TabWrapper():
             }
         })
 
-        await self._tab._execute_command(
-            PageCommands.add_script_to_evaluate_on_new_document(
-                source=wrapper,
-                run_immediately=True
-            )
-        )
-
-        # On Load iFrame Tree Traversal
+        # One walk after load for frames that were already alive when the
+        # bundle was registered; the bundle's own guard makes repeats no-ops
         async def on_load(_event):
-            resp_tree = await self._tab._execute_command({"method":"Page.getFrameTree"})
+            resp_tree = await self._tab._execute_command({"method": "Page.getFrameTree"})
             if "result" not in resp_tree:
                 print("[WARN] Page.getFrameTree failed:", resp_tree)
                 return
@@ -100,76 +120,54 @@ class TabWrapper():
                 for child in node.get("childFrames", []):
                     yield from traverse(child)
 
-            for frame_id in traverse(resp_tree["result"]["frameTree"]):
-                resp_owner = await self._tab._execute_command(
-                    DomCommands.get_frame_owner(frame_id=frame_id)
-                )
-                
-                if "result" not in resp_owner:
-                    continue
-                backend = resp_owner["result"]["backendNodeId"]
-
-                resp_attrs = await self._tab._execute_command(
-                    DomCommands.get_attributes(node_id=backend)
-                )
-                if "result" not in resp_attrs:
-                    continue
-
-                attr_list = resp_attrs["result"]["attributes"]
-
-                attrs = dict(zip(attr_list[0::2], attr_list[1::2]))
-                dsq_id = attrs.get("id", "")
-                await self._tab._execute_command(
-                    PageCommands.add_script_to_evaluate_on_new_document(
-                        source=wrapper,
-                        run_immediately=True,
-                        frameId=frame_id
-                    )
-                )
-                print(f"[INFO] injected into existing DSQ frame {dsq_id}")
+            # Every frame's evaluates go out together; a frame that navigated
+            # away in the meantime only fails its own reply
+            frames = [f for f in traverse(resp_tree["result"]["frameTree"]) if f in contexts]
+            async def walk(frame_id):
+                commands = [RuntimeCommands.evaluate(expression=source, context_id=contexts[frame_id])
+                            for source in self._bundles]
+                self.command_counts[frame_id] = self.command_counts.get(frame_id, 0) + len(commands)
+                try:
+                    await self.cdp.send_many(commands)
+                except Exception as e:
+                    self.attach_errors[frame_id] = str(e)
+            await asyncio.gather(*map(walk, frames))
 
         await self._tab.on(PageEvent.LOAD_EVENT_FIRED, on_load, temporary=True)
 
-        # Will be able to catch Disqus comment iframe and the nested ad iframe
+        # Catches the Disqus comment iframe and the nested ad iframes. The
+        # iframe is paused until runIfWaitingForDebugger, so the whole setup is
+        # pipelined on its session and the replies are checked afterwards.
         async def on_attach(evt):
             info      = evt["params"]["targetInfo"]
             sessionId = evt["params"]["sessionId"]
-            
-            if info.get("type") == "iframe":
-                ws = self._tab._connection_handler._ws_connection
-                
-                await ws.send(json.dumps({
-                    "id": next(self._cdp_id),
-                    "method": "Runtime.enable",
-                    "sessionId": sessionId
-                }))
-                
-                await ws.send(json.dumps({
-                    "id": next(self._cdp_id),
-                    "method": "Page.enable",
-                    "sessionId": sessionId
-                }))
-                
-                await ws.send(json.dumps({
-                    "id": next(self._cdp_id),
-                    "method": "Page.addScriptToEvaluateOnNewDocument",
-                    "params": {
-                        "source": wrapper,
-                        "runImmediately": True,
-                    },
-                    "sessionId": sessionId
-                }))
-                
-                await ws.send(json.dumps({
-                    "id": next(self._cdp_id),
-                    "method": "Runtime.runIfWaitingForDebugger",
-                    "sessionId": sessionId
-                }))
-                print(f"[INFO] injected into new cross-origin DSQ iframe {info['targetId']}")
+            if info.get("type") != "iframe":
+                return
+            attached = time.monotonic()
+
+            commands = [{"method": "Runtime.enable"}]
+            commands += [
+                {"method": "Page.addScriptToEvaluateOnNewDocument",
+                 "params": {"source": source, "runImmediately": True}}
+                for source in self._bundles
+            ]
+            commands += self._session_commands
+            commands.append({"method": "Runtime.runIfWaitingForDebugger"})
+
+            frame = info["targetId"]
+            self.command_counts[frame] = self.command_counts.get(frame, 0) + len(commands)
+            try:
+                responses = await self.cdp.send_many(commands, session=sessionId)
+            except Exception as e:
+                self.attach_errors[frame] = str(e) or type(e).__name__
+                return
+            self.attach_ms[frame] = (time.monotonic() - attached) * 1000
+            failed = [f"{c['method']}: {r['error'].get('message')}"
+                      for c, r in zip(commands, responses) if "error" in r]
+            if failed:
+                self.attach_errors[frame] = "; ".join(failed)
 
-        await self._tab.on("Target.attachedToTarget", on_attach)
+        await self.cdp.on("Target.attachedToTarget", on_attach)
 
-        print("[INFO] master DSQ injector registered")
-    
     def __getattr__(self, name):
         return getattr(self._tab, name)
\ No newline at end of file
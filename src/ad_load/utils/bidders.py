@@ -0,0 +1,113 @@
+# Default Libraries
+from collections import defaultdict
+
+# Third Party
+import numpy as np
+
+# Histogram edges in ms for bidder latency; the last bin is open-ended
+LATENCY_BINS = (0, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, np.inf)
+
+def bidder_records(run_id: str, prebid: dict) -> list[dict]:
+    # One record per (auction, bidder) from the prebid summaries of one run
+    records = []
+    for frame_name, frame in (prebid or {}).items():
+        for auction in frame.get("auctions", []):
+            for bidder, b in (auction.get("bidders") or {}).items():
+                times = [r["t"] for r in b.get("responses", [])]
+                records.append({
+                    "run_id": run_id,
+                    "frame_name": frame_name,
+                    "auction_id": auction.get("auctionId"),
+                    "bidder": bidder,
+                    "requested": b.get("requested"),
+                    "first_response": min(times) if times else None,
+                    "done": b.get("done"),
+                    "ad_units": b.get("adUnits", 0),
+                    "responses": len(times),
+                    "no_bids": b.get("noBids", 0),
+                    "timeouts": b.get("timeouts", 0),
+                    "max_cpm": max((r.get("cpm") or 0 for r in b.get("responses", [])), default=None),
+                    "auction_duration": auction.get("duration"),
+                })
+    return records
+
+def _finish(r: dict) -> float | None:
+    # When the auction stopped waiting on this bidder
+    duration = r["auction_duration"]
+    if r["done"] is not None:
+        return min(r["done"], duration) if duration is not None else r["done"]
+    if r["timeouts"]:
+        return duration
+    return None
+
+def _latency(r: dict) -> float | None:
+    end = r["done"] if r["done"] is not None else r["first_response"]
+    return end - (r["requested"] or 0) if end is not None else None
+
+def critical_path(records: list[dict]) -> tuple[dict, int]:
+    # The bidder finishing last holds the auction open; the gap to the
+    # runner-up is time the auction spent waiting on it alone
+    auctions = defaultdict(list)
+    for r in records:
+        finish = _finish(r)
+        if finish is not None:
+            auctions[(r["run_id"], r["frame_name"], r["auction_id"])].append((finish, r["bidder"]))
+
+    critical = defaultdict(lambda: {"auctions": 0, "waited_ms": 0.0})
+    for finishes in auctions.values():
+        finishes.sort()
+        last, bidder = finishes[-1]
+        runner_up = finishes[-2][0] if len(finishes) > 1 else 0.0
+        critical[bidder]["auctions"] += 1
+        critical[bidder]["waited_ms"] += last - runner_up
+    return dict(critical), len(auctions)
+
+def bidder_stats(records: list[dict]) -> dict:
+    by_bidder = defaultdict(list)
+    for r in records:
+        by_bidder[r["bidder"]].append(r)
+    critical, auctions = critical_path(records)
+
+    stats = {}
+    for bidder, rows in sorted(by_bidder.items()):
+        latency  = np.array([v for v in map(_latency, rows) if v is not None], dtype=float)
+        units    = sum(max(r["ad_units"], 1) for r in rows)
+        counts, _ = np.histogram(latency, bins=LATENCY_BINS)
+        crit     = critical.get(bidder, {"auctions": 0, "waited_ms": 0.0})
+        stats[bidder] = {
+            "requests": len(rows),
+            "responses": sum(r["responses"] for r in rows),
+            # Requests in the percentiles; one that timed out without any
+            # reply has no latency and only counts toward timeout_rate
+            "latency_n": len(latency),
+            "timed_out_no_reply": sum(1 for r in rows if r["timeouts"] and _latency(r) is None),
+            "latency_p50": float(np.percentile(latency, 50)) if len(latency) else None,
+            "latency_p95": float(np.percentile(latency, 95)) if len(latency) else None,
+            "histogram": counts.tolist(),
+            "timeout_rate": sum(1 for r in rows if r["timeouts"]) / len(rows),
+            "no_bid_rate": sum(r["no_bids"] for r in rows) / units,
+            "critical_share": crit["auctions"] / auctions if auctions else 0.0,
+            "waited_ms": crit["waited_ms"],
+        }
+    return stats
+
+def _ms(value: float | None) -> str:
+    return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+
+def format_bidders(stats: dict) -> str:
+    lines = [f"{'bidder':20} {'req':>6} {'lat-n':>6} {'p50':>8} {'p95':>8} {'timeout':>8} "
+             f"{'no-bid':>7} {'last':>6} {'waited':>10}"]
+    for bidder, s in sorted(stats.items(), key=lambda kv: -kv[1]["waited_ms"]):
+        lines.append(f"{bidder:20} {s['requests']:>6} {s['latency_n']:>6} "
+                     f"{_ms(s['latency_p50'])} {_ms(s['latency_p95'])} "
+                     f"{s['timeout_rate']:8.1%} {s['no_bid_rate']:7.1%} "
+                     f"{s['critical_share']:6.1%} {s['waited_ms']:9.0f}ms")
+    excluded = sum(s["timed_out_no_reply"] for s in stats.values())
+    if excluded:
+        lines.append(f"p50/p95 leave out {excluded} request(s) that timed out without a reply; "
+                     f"they count toward timeout only")
+    edges = [f"{int(e)}" for e in LATENCY_BINS[:-1]]
+    lines.append("\nLatency histogram (ms): " + " | ".join(f"{e}+" for e in edges))
+    for bidder, s in sorted(stats.items()):
+        lines.append(f"{bidder:20} " + " ".join(f"{c:>5}" for c in s["histogram"]))
+    return "\n".join(lines)
@@ -0,0 +1,168 @@
+# Default Libraries
+from fnmatch import fnmatchcase
+from functools import partial
+
+# Pydoll Imports
+from pydoll.commands.fetch_commands import FetchCommands
+from pydoll.constants import NetworkErrorReason
+
+# Local Imports
+from ad_load.loaders.site_loader import load_site
+from ad_load.utils.completion import is_ad_request
+
+# urls:  Network.setBlockedURLs patterns, dropped by Chrome itself with no
+#        round trip to the harness
+# types: Network resource types, dropped unless the URL is on the ad path or
+#        matches an allow pattern; only these types are ever paused
+# allow: extra patterns exempt from `types`
+BLOCK_PRESETS = {
+    "no-media": {
+        "urls": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mpd*"],
+        "types": ["Media", "Image", "Font"],
+        "allow": ["*disqus.com*", "*disquscdn.com*"],
+    },
+    "ads-only": {
+        "urls": [
+            "*google-analytics.com*", "*googletagmanager.com/gtag*", "*hotjar.com*",
+            "*scorecardresearch.com*", "*quantserve.com*", "*chartbeat.com*",
+            "*connect.facebook.net*", "*platform.twitter.com*", "*youtube.com/embed*",
+            "*.mp4*", "*.webm*", "*.m3u8*", "*.mpd*",
+        ],
+        "types": ["Media", "Image", "Font", "Stylesheet", "TextTrack", "Manifest"],
+        "allow": ["*disqus.com*", "*disquscdn.com*"],
+    },
+}
+
+# Frames GPT and AdSense render creatives into; friendly iframes stay on
+# about:blank, so only their name gives them away
+AD_FRAME_NAMES = ("google_ads_iframe", "aswift_")
+
+def resolve_rules(spec: dict | str | None) -> dict | None:
+    # A preset name, or a sites.yaml `block:` mapping that may name a preset
+    # and add urls/types/allow on top of it
+    if spec in (None, "none"):
+        return None
+    if isinstance(spec, str):
+        spec = {"preset": spec}
+    preset = spec.get("preset")
+    if preset is not None and preset not in BLOCK_PRESETS:
+        raise ValueError(f"Unknown block preset {preset!r}, expected one of {', '.join(BLOCK_PRESETS)}")
+    base  = BLOCK_PRESETS.get(preset, {})
+    rules = {"preset": preset}
+    for key in ("urls", "types", "allow"):
+        rules[key] = list(dict.fromkeys(base.get(key, []) + list(spec.get(key) or [])))
+    return rules
+
+def site_rules(site: str | None, override: str | None = None) -> dict | None:
+    # --block wins over the `block:` key of a sites.yaml entry ("none" drops it)
+    if override is not None:
+        return resolve_rules(override)
+    return resolve_rules(load_site().get(site, {}).get("block") if site else None)
+
+def is_allowed(url: str, allow: list[str]) -> bool:
+    return is_ad_request(url) or any(fnmatchcase(url, pattern) for pattern in allow)
+
+def is_ad_frame(frame: dict, ad_frames: set) -> bool:
+    return (frame.get("parentId") in ad_frames or is_ad_request(frame.get("url") or "")
+            or (frame.get("name") or "").startswith(AD_FRAME_NAMES))
+
+# Creative assets come from CDNs no URL list keeps up with, so requests are
+# judged by the frame that issued them: anything from an ad frame, or from a
+# frame nested in one, is on the ad path whatever its URL.
+class RequestBlocker:
+    def __init__(self, rules: dict):
+        self.rules     = rules
+        self.blocked   = {}
+        self.ad_frames = set()
+
+    def _on_attached(self, ev):
+        info = ev["params"].get("targetInfo", {})
+        if info.get("type") == "iframe" and is_ad_frame(
+                {"url": info.get("url"), "parentId": info.get("parentFrameId")}, self.ad_frames):
+            self.ad_frames.add(info["targetId"])
+
+    def _on_frame_attached(self, ev):
+        p = ev["params"]
+        if p.get("parentFrameId") in self.ad_frames:
+            self.ad_frames.add(p["frameId"])
+
+    def _on_frame_navigated(self, ev):
+        frame = ev["params"]["frame"]
+        if is_ad_frame(frame, self.ad_frames):
+            self.ad_frames.add(frame["id"])
+
+    async def install(self, tab, interceptor):
+        if self.rules["types"]:
+            await tab.on("Target.attachedToTarget", self._on_attached)
+            await tab.on("Page.frameAttached", self._on_frame_attached)
+            await tab.on("Page.frameNavigated", self._on_frame_navigated)
+            await tab._execute_command({"method": "Page.enable"})
+            tab.add_session_command("Page.enable")
+        if self.rules["urls"]:
+            for command in ({"method": "Network.enable", "params": {}},
+                            {"method": "Network.setBlockedURLs", "params": {"urls": self.rules["urls"]}}):
+                await tab._execute_command(dict(command))
+                tab.add_session_command(command["method"], command["params"])
+        if self.rules["types"]:
+            patterns = [{"urlPattern": "*", "resourceType": t, "requestStage": "Request"}
+                        for t in self.rules["types"]]
+            await interceptor.add("block", patterns, partial(self.handle, interceptor), sessions=True)
+
+    async def handle(self, interceptor, p: dict, session: str | None) -> bool:
+        if "responseStatusCode" in p or p.get("resourceType") not in self.rules["types"]:
+            return False
+        if p.get("frameId") in self.ad_frames or is_allowed(p["request"]["url"], self.rules["allow"]):
+            return False
+        kind = p["resourceType"]
+        self.blocked[kind] = self.blocked.get(kind, 0) + 1
+        await interceptor.send(
+            FetchCommands.fail_request(p["requestId"], NetworkErrorReason.BLOCKED_BY_CLIENT), session
+        )
+        return True
+
+# Bytes on the wire per resource type, for the page and every iframe session.
+# A blocked request never transfers, so blocked ones are counted, not sized.
+class TransferStats:
+    def __init__(self):
+        self.by_type  = {}
+        self.blocked  = {}
+        self.ad_bytes = 0
+        self._pending = {}
+
+    async def attach(self, tab):
+        await tab._execute_command({"method": "Network.enable"})
+        tab.add_session_command("Network.enable")
+        await tab.on("Network.requestWillBeSent", self._on_request)
+        await tab.on("Network.loadingFinished", self._on_finished)
+        await tab.on("Network.loadingFailed", self._on_failed)
+
+    def _on_request(self, ev):
+        p = ev["params"]
+        self._pending[(ev.get("sessionId"), p["requestId"])] = (
+            p.get("type", "Other"), is_ad_request(p["request"]["url"]))
+
+    def _on_finished(self, ev):
+        p = ev["params"]
+        kind, ad = self._pending.pop((ev.get("sessionId"), p["requestId"]), ("Other", False))
+        size     = int(p.get("encodedDataLength") or 0)
+        stats    = self.by_type.setdefault(kind, {"requests": 0, "bytes": 0})
+        stats["requests"] += 1
+        stats["bytes"]    += size
+        if ad:
+            self.ad_bytes += size
+
+    def _on_failed(self, ev):
+        p = ev["params"]
+        kind, _ = self._pending.pop((ev.get("sessionId"), p["requestId"]), (p.get("type", "Other"), False))
+        if p.get("blockedReason") or "BLOCKED_BY_CLIENT" in p.get("errorText", ""):
+            self.blocked[kind] = self.blocked.get(kind, 0) + 1
+
+    def summary(self) -> dict:
+        return {
+            "transferred_bytes": sum(s["bytes"] for s in self.by_type.values()),
+            "ad_bytes": self.ad_bytes,
+            "requests": sum(s["requests"] for s in self.by_type.values()),
+            "by_type": self.by_type,
+            "blocked_requests": sum(self.blocked.values()),
+            "blocked": self.blocked,
+        }
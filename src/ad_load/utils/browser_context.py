@@ -0,0 +1,57 @@
+# Default Libraries
+import asyncio
+
+# Pydoll Imports
+from pydoll.protocol.page.events import PageEvent
+
+# Local Imports
+from ad_load.pydoll_extensions import TabWrapper
+from ad_load.utils.completion import CompletionDetector
+
+CACHE_MODES = ("cold", "warm", "primed")
+
+# The browser context a run's tabs live in. cold and primed get their own
+# context (empty HTTP cache, cookies and storage), disposed when the run ends;
+# warm uses the default context, sharing whatever earlier runs left behind.
+class RunContext:
+    def __init__(self, browser, mode: str = "cold"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}; choose from {', '.join(CACHE_MODES)}")
+        self._browser = browser
+        self.mode     = mode
+        self.id       = None
+
+    async def __aenter__(self):
+        if self.mode != "warm":
+            self.id = await self._browser.create_browser_context()
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.id is None:
+            return
+        try:
+            await self._browser.delete_browser_context(self.id)
+        except Exception as e:
+            print(f"[WARN] disposing browser context {self.id} failed: {e}")
+
+    async def new_tab(self) -> TabWrapper:
+        return TabWrapper(await self._browser.new_tab(browser_context_id=self.id))
+
+async def preload(tab: TabWrapper, url: str, timeout: float, idle_ms: int):
+    # Throwaway visit for --cache primed: waits for the load event, then for
+    # ad traffic in the page and its iframes to go quiet, then leaves
+    detector = CompletionDetector(tab, idle_ms=idle_ms)
+    await detector.start()
+    await tab.attach_frames()
+
+    loaded = asyncio.Event()
+    await tab.on(PageEvent.LOAD_EVENT_FIRED, lambda _ev: loaded.set(), temporary=True)
+    loop     = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    await tab.go_to_commit(url)
+    try:
+        await asyncio.wait_for(loaded.wait(), max(0, deadline - loop.time()))
+    except asyncio.TimeoutError:
+        return
+    while loop.time() < deadline and not detector.network_idle():
+        await asyncio.sleep(detector.poll_ms / 1000)
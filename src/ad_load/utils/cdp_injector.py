@@ -1,6 +1,27 @@
+# Default Libraries
+import hashlib
+
+# Local Imports
 from ad_load.pydoll_extensions import TabWrapper
 
-async def inject_scripts(tab: TabWrapper, *scripts: str) -> None:
-    for script in scripts:
-        await tab.inject_script(script)
-        await tab.inject_into_new_frames(script)
\ No newline at end of file
+def bundle_scripts(*scripts: str, quiet: bool = False) -> str:
+    # One payload per frame instead of one per script. The guard is keyed by
+    # the bundle's digest, so re-running it in a frame (frame walker, both
+    # injection paths firing) never resets the trackers' state.
+    digest = hashlib.sha1("\0".join((str(quiet),) + scripts).encode()).hexdigest()[:12]
+    parts  = [
+        f"try {{\n{script}\n}} catch (e) {{ console.error('[ad-load] injected script failed', e); }}"
+        for script in scripts
+    ]
+    return (
+        ";(function() {\n"
+        "    const seen = window.__adLoadBundles = window.__adLoadBundles || {};\n"
+        f"    if (seen['{digest}']) return;\n"
+        f"    seen['{digest}'] = true;\n"
+        f"    window.__adLoadQuiet = {'true' if quiet else 'false'};\n"
+        + "\n".join(parts) +
+        "\n})();\n"
+    )
+
+async def inject_scripts(tab: TabWrapper, *scripts: str, quiet: bool = False) -> None:
+    await tab.inject_bundle(bundle_scripts(*scripts, quiet=quiet))
@@ -0,0 +1,159 @@
+# Default Libraries
+import asyncio
+
+# Pydoll Imports
+from pydoll.commands.runtime_commands import RuntimeCommands
+
+# One round trip per frame returns everything the injected scripts hold
+COLLECT_JS = """
+    (() => (window.__adLoadFlush && window.__adLoadFlush(), {
+        prebid: window.getPrebidPerformanceSummary
+            ? window.getPrebidPerformanceSummary()
+            : null,
+        google_ads: window.getGoogleAdsSummary
+            ? window.getGoogleAdsSummary()
+            : null,
+        performance: window.getPerformanceSummary
+            ? window.getPerformanceSummary()
+            : null
+    }))()
+"""
+
+# Top-frame timings read after the fact from the browser's own buffers, so
+# they exist even when nothing was injected (overhead baselines)
+PROBE_JS = """
+    new Promise(resolve => {
+        const nav = performance.getEntriesByType('navigation')[0];
+        const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+        const out = {
+            ttfb: nav ? nav.responseStart - nav.requestStart : null,
+            domContentLoaded: nav ? nav.domContentLoadedEventEnd - nav.startTime : null,
+            loadEvent: nav ? nav.loadEventEnd - nav.startTime : null,
+            fcp: fcp ? fcp.startTime : null,
+            lcp: null
+        };
+        try {
+            new PerformanceObserver((list, observer) => {
+                const entries = list.getEntries();
+                if (entries.length) out.lcp = entries[entries.length - 1].startTime;
+                observer.disconnect();
+                resolve(out);
+            }).observe({ type: 'largest-contentful-paint', buffered: true });
+        } catch (e) {}
+        setTimeout(() => resolve(out), 100);
+    })
+"""
+
+# Performance.getMetrics durations are in seconds
+_PROBE_METRICS = {
+    "ScriptDuration": "script_ms",
+    "TaskDuration": "task_ms",
+    "LayoutDuration": "layout_ms",
+    "RecalcStyleDuration": "style_ms",
+}
+
+# Live main-world execution contexts, keyed by (sessionId, contextId)
+class ContextRegistry:
+    def __init__(self):
+        self.live = {}
+
+    async def attach(self, tab):
+        await tab.on("Runtime.executionContextCreated", self._on_created)
+        await tab.on("Runtime.executionContextDestroyed", self._on_destroyed)
+        await tab.on("Runtime.executionContextsCleared", self._on_cleared)
+        await tab.on("Target.detachedFromTarget", self._on_detached)
+
+    def frame_for(self, session: str | None, ctx_id: int) -> str | None:
+        return self.live.get((session, ctx_id))
+
+    def snapshot(self) -> dict:
+        return dict(self.live)
+
+    def _on_created(self, ev):
+        info = ev["params"]["context"]
+        aux  = info.get("auxData", {})
+        # Isolated worlds share the frame id but never see the injected globals
+        if aux.get("frameId") and aux.get("isDefault", True):
+            self.live[(ev.get("sessionId"), info["id"])] = aux["frameId"]
+
+    def _on_destroyed(self, ev):
+        self.live.pop((ev.get("sessionId"), ev["params"]["executionContextId"]), None)
+
+    def _on_cleared(self, ev):
+        self._drop_session(ev.get("sessionId"))
+
+    def _on_detached(self, ev):
+        self._drop_session(ev["params"].get("sessionId"))
+
+    def _drop_session(self, session: str | None):
+        for key in [k for k in self.live if k[0] == session]:
+            del self.live[key]
+
+async def collect_summaries(tab, registry: ContextRegistry, timeout: float = 5) -> dict:
+    # All evaluates are in flight at once, each on its own session; a slow or
+    # detached iframe costs at most `timeout` and only its own entry
+    async def one(session, ctx_id):
+        command = RuntimeCommands.evaluate(
+            expression=COLLECT_JS,
+            return_by_value=True,
+            context_id=ctx_id
+        )
+        try:
+            resp = await tab.cdp.send(command, session, timeout)
+            return resp.get("result", {}).get("result", {}).get("value")
+        except Exception as e:
+            return {"Error": str(e) or type(e).__name__}
+
+    snapshot = registry.snapshot()
+    values = await asyncio.gather(*(one(session, ctx_id) for session, ctx_id in snapshot))
+
+    collected = {}
+    for frame_id, value in zip(snapshot.values(), values):
+        if value:
+            collected[frame_id] = value
+    return collected
+
+async def probe_page(tab) -> dict:
+    probe = {}
+    try:
+        resp = await tab._execute_command(RuntimeCommands.evaluate(
+            expression=PROBE_JS,
+            return_by_value=True,
+            await_promise=True
+        ))
+        probe.update(resp.get("result", {}).get("result", {}).get("value") or {})
+        resp = await tab._execute_command({"method": "Performance.getMetrics"})
+        for metric in resp.get("result", {}).get("metrics", []):
+            if metric["name"] in _PROBE_METRICS:
+                probe[_PROBE_METRICS[metric["name"]]] = metric["value"] * 1000
+            elif metric["name"] == "JSHeapUsedSize":
+                probe["heap_mb"] = metric["value"] / (1 << 20)
+    except Exception as e:
+        probe["error"] = str(e)
+    return probe
+
+def _has_ads(key: str, summary: dict) -> bool:
+    if key == "prebid":
+        return bool(summary.get("auctions"))
+    return bool(summary.get("slotResponses") or summary.get("slotRenders"))
+
+def split_summaries(collected: dict, prefix: str | None = "dsq-") -> tuple[dict, dict, dict]:
+    # Prebid and GPT summaries are re-keyed by Disqus iframe name;
+    # Web Vitals stay keyed by frame id for every frame that reported them.
+    # With prefix None (full pages) any frame that saw ad activity is kept,
+    # and names shared by several frames get the frame id appended.
+    prebid, google_ads, performance = {}, {}, {}
+    for frame_id, value in collected.items():
+        for key, out in (("prebid", prebid), ("google_ads", google_ads)):
+            summary = value.get(key)
+            if not isinstance(summary, dict):
+                continue
+            name = summary.get("frameName", "")
+            if prefix is not None:
+                if name.startswith(prefix):
+                    out[name] = summary
+            elif _has_ads(key, summary):
+                out[name if name not in out else f"{name}#{frame_id}"] = summary
+        if value.get("performance") is not None:
+            performance[frame_id] = value["performance"]
+    return prebid, google_ads, performance
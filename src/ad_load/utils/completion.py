@@ -0,0 +1,118 @@
+# Default Libraries
+import asyncio
+
+# Hosts and path fragments that belong to the ad path: Prebid, GPT and the
+# SSPs Disqus frames bid against.
+AD_URL_MARKERS = (
+    "prebid", "pbjs",
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com",
+    "adservice.google", "amazon-adsystem.com", "adnxs.com", "rubiconproject.com",
+    "pubmatic.com", "openx.net", "criteo.", "casalemedia.com", "3lift.com",
+    "sharethrough.com", "teads.tv", "adsrvr.org", "33across.com", "smartadserver.com",
+)
+
+NETWORK_EVENTS = (
+    "Network.requestWillBeSent",
+    "Network.responseReceived",
+    "Network.loadingFinished",
+    "Network.loadingFailed",
+)
+
+# Pushed events that count towards a frame's auction progress
+OUTCOME_EVENTS = {"adRenderSucceeded", "adRenderFailed", "slotRenderEnded"}
+
+def is_ad_request(url: str) -> bool:
+    url = url.lower()
+    return any(marker in url for marker in AD_URL_MARKERS)
+
+def frames_complete(states: dict, prefix: str | None = "dsq-") -> bool:
+    # Only Disqus frames that started an auction are tracked; a frame still
+    # loading Prebid keeps the ad network busy, which the idle check catches.
+    # With prefix None every frame counts and a page without auctions is done.
+    # Every auction of a tracked frame must have ended and rendered (or
+    # failed to), so a refresh cycle still in flight keeps the frame open.
+    tracked = [
+        s for s in states.values()
+        if s and s.get("frameName", "").startswith(prefix or "") and s["auctions"]
+    ]
+    return (bool(tracked) or prefix is None) and all(
+        a["ended"] and a["outcomes"] > 0 for s in tracked for a in s["auctions"].values()
+    )
+
+def _outcome_auction(state: dict, data: dict) -> dict | None:
+    # Prebid renders name their auction; a GPT slot maps to the auction that
+    # last won its unit, else to the oldest ended auction still waiting
+    auctions   = state["auctions"]
+    auction_id = data.get("auctionId")
+    if auction_id not in auctions:
+        auction_id = state["units"].get(data.get("adUnitCode") or data.get("slot"))
+    if auction_id in auctions:
+        return auctions[auction_id]
+    return next((a for a in auctions.values() if a["ended"] and not a["outcomes"]), None)
+
+class CompletionDetector:
+    def __init__(self, tab, idle_ms: int = 1500, poll_ms: int = 250,
+                 frame_prefix: str | None = "dsq-"):
+        self._tab = tab
+        self.frame_prefix = frame_prefix
+        self.states = {}
+        self.idle_ms = idle_ms
+        self.poll_ms = poll_ms
+        self._last_activity = None
+        self._ad_requests = set()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._last_activity = loop.time()
+
+        def on_network(ev):
+            p   = ev.get("params", {})
+            key = (ev.get("sessionId"), p.get("requestId"))
+            if ev["method"] == "Network.requestWillBeSent":
+                if not is_ad_request(p["request"]["url"]):
+                    return
+                self._ad_requests.add(key)
+            elif key not in self._ad_requests:
+                return
+            elif ev["method"] != "Network.responseReceived":
+                # loadingFinished/Failed carry no URL; match them by request id
+                self._ad_requests.discard(key)
+            self._last_activity = loop.time()
+
+        await self._tab._execute_command({"method": "Network.enable"})
+        self._tab.add_session_command("Network.enable")
+        for event in NETWORK_EVENTS:
+            await self._tab.on(event, on_network)
+
+    def network_idle(self) -> bool:
+        loop = asyncio.get_running_loop()
+        return (loop.time() - self._last_activity) * 1000 >= self.idle_ms
+
+    def on_event(self, event: dict):
+        # Fed by EventSink; frame progress is tracked from pushed events only
+        key = (event.get("session"), event.get("frameId") or event.get("frameName"))
+        state = self.states.setdefault(key, {
+            "frameName": event.get("frameName", ""), "auctions": {}, "units": {},
+        })
+        kind = event.get("type")
+        data = event.get("data")
+        data = data if isinstance(data, dict) else {}
+        if kind == "auctionInit":
+            state["auctions"].setdefault(data.get("auctionId"), {"ended": False, "outcomes": 0})
+        elif kind == "auctionEnd":
+            state["auctions"].setdefault(data.get("auctionId"), {"ended": False, "outcomes": 0})["ended"] = True
+        elif kind == "bidWon":
+            state["units"][data.get("adUnitCode")] = data.get("auctionId")
+        elif kind in OUTCOME_EVENTS:
+            auction = _outcome_auction(state, data)
+            if auction is not None:
+                auction["outcomes"] += 1
+
+    async def wait(self, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if self.network_idle() and frames_complete(self.states, self.frame_prefix):
+                return True
+            await asyncio.sleep(min(self.poll_ms / 1000, max(0, deadline - loop.time())))
+        return False
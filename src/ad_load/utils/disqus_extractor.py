@@ -1,17 +1,162 @@
 # Default Libraries
+import asyncio
+import json
+import os
 import re
+import time
 from urllib.parse import urlparse
 from typing import Tuple
 
 # Pydoll Imports
 from pydoll.commands.page_commands import PageCommands
 
+# Third Party
+import requests
+from bs4 import BeautifulSoup
+
 # Local Imports
+from ad_load.pydoll_extensions import TabWrapper
 from ad_load.loaders.script_loader import load_script
 from ad_load.loaders.script_loader import _BASE_DIR
 
+DISQUS_CACHE = os.path.join("data", "disqus_config.json")
+DISQUS_TTL   = 7 * 86400
+GUESS_TTL    = 3600        # values guessed from the URL, not read from the page
+
+STATIC_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/138.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+_EMBED_RE      = re.compile(r'//([\w-]+)\.disqus\.com/embed\.js')
+_SHORTNAME_RE  = re.compile(r'disqus_shortname\s*=\s*[\'"]([^\'"]+)[\'"]')
+_IDENTIFIER_RE = (
+    re.compile(r'this\.page\.identifier\s*=\s*[\'"]([^\'"]+)[\'"]'),
+    re.compile(r'disqus_identifier\s*=\s*[\'"]([^\'"]+)[\'"]'),
+)
+
+# (forum, identifier) per page URL in one JSON file. Entries expire after
+# `ttl` seconds, guesses after `guess_ttl`; writes re-read the file first so
+# concurrent workers merge.
+class DisqusConfigCache:
+    def __init__(self, path: str = DISQUS_CACHE, ttl: float = DISQUS_TTL,
+                 guess_ttl: float = GUESS_TTL):
+        self.path      = path
+        self.ttl       = ttl
+        self.guess_ttl = guess_ttl
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def get(self, url: str) -> Tuple[str, str] | None:
+        entry = self._load().get(url)
+        if not entry:
+            return None
+        ttl = self.guess_ttl if entry.get("source") == "guess" else self.ttl
+        if time.time() - entry.get("fetched", 0) > ttl:
+            return None
+        return entry["forum"], entry["identifier"]
+
+    def put(self, url: str, forum: str, identifier: str, source: str):
+        entries = self._load()
+        entries[url] = {"forum": forum, "identifier": identifier,
+                        "source": source, "fetched": time.time()}
+        self._save(entries)
+
+    def invalidate(self, url: str | None = None):
+        # One URL, or everything
+        entries = self._load()
+        if url is None:
+            entries.clear()
+        else:
+            entries.pop(url, None)
+        self._save(entries)
+
+def parse_disqus_html(html: str) -> Tuple[str | None, str | None]:
+    # Only what the page states explicitly; the URL-based guesses are left to
+    # the browser path, which can still see values set by scripts
+    soup   = BeautifulSoup(html, "html.parser")
+    forum  = None
+    inline = []
+    for script in soup.find_all("script"):
+        m = _EMBED_RE.search(script.get("src") or "")
+        if m and not forum:
+            forum = m.group(1)
+        if script.string:
+            inline.append(script.string)
+    text = "\n".join(inline)
+
+    if not forum:
+        m = _EMBED_RE.search(text) or _SHORTNAME_RE.search(text)
+        if m: forum = m.group(1)
+
+    identifier = None
+    for pattern in _IDENTIFIER_RE:
+        m = pattern.search(text)
+        if m:
+            identifier = m.group(1)
+            break
+    return forum, identifier
+
+def fetch_disqus_info_static(url: str, timeout: float = 5) -> Tuple[str, str] | None:
+    try:
+        resp = requests.get(url, headers=STATIC_HEADERS, timeout=timeout)
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"[disqus] static fetch failed for {url}: {e}")
+        return None
+    forum, identifier = parse_disqus_html(resp.text)
+    if forum and identifier:
+        return forum, identifier
+    return None
+
+async def resolve_disqus_info(browser, url: str, cache: DisqusConfigCache | None = None,
+                              static: bool = True, install=None) -> Tuple[str, str]:
+    # Cache, then a plain HTTP fetch, then a full page load in a scratch tab.
+    # `install(tab)` prepares that tab (e.g. network cache) before navigating.
+    if cache:
+        hit = cache.get(url)
+        if hit:
+            return hit
+
+    info, source = None, "static"
+    if static:
+        info = await asyncio.to_thread(fetch_disqus_info_static, url)
+    if info is None:
+        tab = TabWrapper(await browser.new_tab())
+        try:
+            if install:
+                await install(tab)
+            found = await read_disqus_info(tab, url)
+        finally:
+            await tab.close()
+        # A slow load leaves gaps that are filled from the URL; those are only
+        # kept briefly so the next run gets another chance to read them
+        info   = guess_disqus_info(url, *found)
+        source = "browser" if all(found) else "guess"
+
+    if cache:
+        cache.put(url, *info, source=source)
+    return info
+
 
 async def extract_disqus_info(tab, url: str) -> Tuple[str, str]:
+    return guess_disqus_info(url, *await read_disqus_info(tab, url))
+
+async def read_disqus_info(tab, url: str) -> Tuple[str | None, str | None]:
+    # Only values the loaded page actually holds
     await tab._execute_command(PageCommands.navigate(url))
     print("DEBUG: loader looking in", _BASE_DIR, "for disqus_polling.js")
 
@@ -56,14 +201,18 @@ async def extract_disqus_info(tab, url: str) -> Tuple[str, str]:
             m = re.search(r'this\.page\.identifier\s*=\s*[\'"]([^\'"]+)[\'"]', html)
             if m: cfg["identifier"] = m.group(1)
 
-    if not cfg["identifier"]:
+    return cfg["forum"], cfg["identifier"]
+
+def guess_disqus_info(url: str, forum: str | None, identifier: str | None) -> Tuple[str, str]:
+    # Missing values guessed from the URL: its slug and its host's first label
+    if not identifier:
         m = re.search(r'/([^/]+)/?$', url)
-        if m: cfg["identifier"] = m.group(1)
+        if m: identifier = m.group(1)
 
-    if not cfg["forum"]:
+    if not forum:
         host = urlparse(url).netloc.lower()
         if host.startswith("www."):
             host = host[4:]
-        cfg["forum"] = host.split(".")[0]
+        forum = host.split(".")[0]
 
-    return cfg["forum"], cfg["identifier"]
\ No newline at end of file
+    return forum, identifier
\ No newline at end of file
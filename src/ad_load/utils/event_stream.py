@@ -0,0 +1,62 @@
+# Default Libraries
+import json
+import time
+
+# Pydoll Imports
+from pydoll.commands.runtime_commands import RuntimeCommands
+
+# Injected scripts call window.__adLoadEmit(json) for every tracked event
+BINDING_NAME = "__adLoadEmit"
+
+class EventSink:
+    def __init__(self, path: str, run_id: str | None = None, registry=None,
+                 profile: str | None = None):
+        self.path = path
+        self.run_id = run_id
+        self.profile = profile
+        self.count = 0
+        self._registry = registry
+        self._listeners = []
+        # Line buffered so every event reaches disk even if the run is killed
+        self._file = open(path, "w", buffering=1, encoding="utf-8")
+
+    async def attach(self, tab):
+        await tab.on("Runtime.bindingCalled", self._on_binding)
+        await tab._execute_command(RuntimeCommands.add_binding(BINDING_NAME))
+        tab.add_session_command("Runtime.addBinding", {"name": BINDING_NAME})
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def _on_binding(self, ev):
+        p = ev["params"]
+        if p.get("name") != BINDING_NAME:
+            return
+        try:
+            payload = json.loads(p["payload"])
+        except (TypeError, ValueError):
+            return
+
+        session = ev.get("sessionId")
+        frame_id = None
+        if self._registry is not None:
+            frame_id = self._registry.frame_for(session, p.get("executionContextId"))
+        # Quiet mode flushes a batch of buffered events per binding call
+        for item in payload if isinstance(payload, list) else [payload]:
+            event = {
+                "run_id": self.run_id,
+                "profile": self.profile,
+                "seq": self.count,
+                "ts": time.time(),
+                "session": session,
+                "frameId": frame_id,
+                **item,
+            }
+            self.count += 1
+            if not self._file.closed:
+                self._file.write(json.dumps(event) + "\n")
+            for listener in self._listeners:
+                listener(event)
+
+    def close(self):
+        self._file.close()
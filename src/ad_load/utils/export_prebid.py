@@ -2,39 +2,26 @@ import asyncio
 
 from pydoll.commands.runtime_commands import RuntimeCommands
 
+from ad_load.pydoll_extensions.tab_wrapper import TabWrapper
+from ad_load.utils.collector import ContextRegistry, collect_summaries
+
 async def export_prebid(tab, timeout=1):
-    
+    # collect_summaries talks to frames through tab.cdp; a plain pydoll Tab
+    # would get an error dict back for every frame
+    if not isinstance(tab, TabWrapper):
+        tab = TabWrapper(tab)
+
+    registry = ContextRegistry()
+    await registry.attach(tab)
+
     await tab._execute_command(RuntimeCommands.enable())
-    
-    contexts = {}
-    
-    async def on_ctx(ev):
-        info = ev["params"]["context"]
-        aux = info.get("auxData", {})
-        fId = aux.get("frameId")
-        if fId:
-            contexts[fId] = info["id"]
-            
-    await tab.on("Runtime.executionContextCreated", on_ctx)
-    
+
     await asyncio.sleep(timeout)
-    
-    results = {}
-    for frame_id, ctx_id in contexts.items():
-        try:
-            resp = await tab._execute_command(
-                RuntimeCommands.evaluate(
-                    expression="""
-                        (window.getPrebidPerformanceSummary
-                        ? window.getPrebidPerformanceSummary()
-                        : null)
-                    """,
-                    return_by_value=True,
-                    context_id=ctx_id
-                )
-            )
-            results[frame_id] = resp["result"]["result"]["value"]
-        except Exception as e:
-            results[frame_id] = {"Error": str(e)}
-    
-    print(results)
\ No newline at end of file
+
+    collected = await collect_summaries(tab, registry)
+    results = {
+        frame_id: value.get("prebid", value)
+        for frame_id, value in collected.items()
+    }
+
+    print(results)
@@ -0,0 +1,263 @@
+# Default Libraries
+import asyncio
+import base64
+import io
+import os
+import time
+
+# Third Party
+import numpy as np
+from PIL import Image
+
+FILMSTRIP_FPS = 10
+FILMSTRIP_MAX = 600       # frames written per run; later ones are dropped
+QUEUE_FRAMES  = 8         # encoded frames waiting for the writer, at most
+COMPLETE_AT   = 0.95      # visual progress counted as "visually complete"
+CHANGED_AT    = 0.05      # visual progress counted as "first change"
+
+# Events that say an ad was rendered, as pushed by the injected scripts
+RENDER_EVENTS = {"adRenderSucceeded": "adUnitCode", "slotOnLoad": "slot", "slotRenderEnded": "slot"}
+
+def decode_frame(raw: bytes) -> np.ndarray:
+    return np.asarray(Image.open(io.BytesIO(raw)).convert("RGB"))
+
+def frame_histogram(pixels: np.ndarray) -> np.ndarray:
+    # (3, 256) per-channel counts. Progress compares histograms, not pixels,
+    # so antialiasing and 1px shifts don't read as visual change.
+    if not pixels.size:
+        return np.zeros((3, 256), dtype=np.int64)
+    flat = pixels.reshape(-1, 3).astype(np.int32) + np.arange(3) * 256
+    return np.bincount(flat.ravel(), minlength=768).reshape(3, 256)
+
+def visual_progress(hists: np.ndarray) -> np.ndarray:
+    # 0 at the first frame, 1 once a frame's histogram matches the last one
+    first, last = hists[0], hists[-1]
+    total = np.abs(first - last).sum()
+    if total == 0:
+        return np.ones(len(hists))
+    return np.clip(1 - np.abs(hists - last).sum(axis=(1, 2)) / total, 0, 1)
+
+def speed_index(times_ms: np.ndarray, progress: np.ndarray) -> float | None:
+    # Area above the visual progress curve; nothing is drawn before frame 0
+    if not len(times_ms):
+        return None
+    return float(times_ms[0] + np.sum((1 - progress[:-1]) * np.diff(times_ms)))
+
+def first_time(times_ms: np.ndarray, progress: np.ndarray, threshold: float) -> float | None:
+    hits = np.nonzero(progress >= threshold)[0]
+    return float(times_ms[hits[0]]) if len(hits) else None
+
+def settled_time(times_ms: np.ndarray, progress: np.ndarray, threshold: float) -> float | None:
+    # First frame after which progress never drops below threshold again
+    below = np.nonzero(progress < threshold)[0]
+    idx = below[-1] + 1 if len(below) else 0
+    return float(times_ms[idx]) if idx < len(times_ms) else None
+
+# Page.startScreencast frames are acked at once, thinned to max_fps and
+# handed to a single writer through a small queue. Only each frame's
+# histogram stays in memory; pixels are re-read from disk for slot crops.
+class FilmstripRecorder:
+    def __init__(self, tab, out_dir: str, max_fps: int = FILMSTRIP_FPS,
+                 max_frames: int = FILMSTRIP_MAX, max_width: int = 800, quality: int = 70):
+        self._tab       = tab
+        self.dir        = out_dir
+        self.max_fps    = max_fps
+        self.max_frames = max_frames
+        self.max_width  = max_width
+        self.quality    = quality
+        self.frames     = []
+        self.hists      = []
+        self.renders    = []
+        self.skipped    = 0
+        self.dropped    = 0
+        self._queue     = asyncio.Queue(maxsize=QUEUE_FRAMES)
+        self._writer    = None
+        self._last      = None
+        self._taken     = 0
+
+    async def start(self):
+        os.makedirs(self.dir, exist_ok=True)
+        await self._tab.on("Page.screencastFrame", self._on_frame)
+        self._writer = asyncio.create_task(self._drain())
+        await self._tab._execute_command({
+            "method": "Page.startScreencast",
+            "params": {"format": "jpeg", "quality": self.quality, "maxWidth": self.max_width,
+                       "maxHeight": self.max_width * 4, "everyNthFrame": 1},
+        })
+
+    async def stop(self):
+        # Safe to call again, or after a failed run
+        writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        try:
+            await self._tab._execute_command({"method": "Page.stopScreencast"})
+        finally:
+            await self._queue.put(None)
+            await writer
+
+    def on_event(self, event: dict):
+        # Fed by EventSink; keeps the render events slots are matched against.
+        # Timed by the page's epoch clock: the sink's receive time lags by up
+        # to a quiet-mode flush, which would bias gap_ms against the screencast
+        key = RENDER_EVENTS.get(event.get("type"))
+        if key:
+            ts = event["epoch"] / 1000 if event.get("epoch") is not None else event["ts"]
+            self.renders.append({"type": event["type"], "ts": ts,
+                                 "frameName": event.get("frameName"),
+                                 "slot": (event.get("data") or {}).get(key)})
+
+    async def _on_frame(self, ev):
+        if ev.get("sessionId"):
+            return
+        p = ev["params"]
+        # Chrome sends nothing more until this frame is acked
+        await self._tab._execute_command({"method": "Page.screencastFrameAck",
+                                          "params": {"sessionId": p["sessionId"]}})
+        meta = p.get("metadata", {})
+        ts   = meta.get("timestamp") or time.time()
+        if self._last is not None and ts - self._last < 1 / self.max_fps:
+            self.skipped += 1
+            return
+        if self._taken >= self.max_frames:
+            self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait((ts, p["data"], meta))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return
+        self._last   = ts
+        self._taken += 1
+
+    async def _drain(self):
+        while (item := await self._queue.get()) is not None:
+            ts, data, meta = item
+            path = os.path.join(self.dir, f"frame-{len(self.frames) + 1:04d}.jpg")
+            hist = await asyncio.to_thread(self._write, path, data)
+            self.frames.append({"t": ts, "path": path,
+                                "deviceWidth": meta.get("deviceWidth"),
+                                "offsetTop": meta.get("offsetTop", 0),
+                                "scale": meta.get("pageScaleFactor", 1)})
+            self.hists.append(hist)
+
+    @staticmethod
+    def _write(path: str, data: str) -> np.ndarray:
+        raw = base64.b64decode(data)
+        with open(path, "wb") as f:
+            f.write(raw)
+        return frame_histogram(decode_frame(raw))
+
+def _attrs(node: dict) -> dict:
+    values = node.get("attributes") or []
+    return dict(zip(values[::2], values[1::2]))
+
+def _iframes(node: dict, label: str | None = None):
+    # (iframe node, id of its nearest ancestor with one); GPT and Prebid
+    # slots are the divs the ad iframes are rendered into
+    attrs = _attrs(node)
+    if node.get("nodeName") == "IFRAME":
+        yield node, label or attrs.get("id") or attrs.get("name")
+        return
+    label = attrs.get("id") or label
+    for child in node.get("children") or []:
+        yield from _iframes(child, label)
+
+def _quad_box(model: dict) -> dict:
+    quad = model["content"]
+    xs, ys = quad[0::2], quad[1::2]
+    return {"x": min(xs), "y": min(ys), "width": max(xs) - min(xs), "height": max(ys) - min(ys)}
+
+async def _boxes(tab, nodes: list[dict], session: str | None) -> list[dict | None]:
+    responses = await tab.cdp.send_many(
+        [{"method": "DOM.getBoxModel", "params": {"nodeId": n["nodeId"]}} for n in nodes], session)
+    return [_quad_box(r["result"]["model"]) if "result" in r else None for r in responses]
+
+def _is_disqus(attrs: dict) -> bool:
+    return attrs.get("name", "").startswith("dsq-app") or "disqus.com" in attrs.get("src", "")
+
+async def ad_slot_boxes(tab, top_level: bool = False) -> list[dict]:
+    # Ad iframes inside each Disqus iframe, in CSS px of the top-level viewport.
+    # A cross-origin frame reports boxes in its own viewport, so the Disqus
+    # iframe's content box is added to each of them. With top_level, the
+    # page's own iframes count as slots too (frame None).
+    top    = await tab.cdp.call("DOM.getDocument", {"depth": -1})
+    frames = list(_iframes(top["root"]))
+    boxes  = await _boxes(tab, [n for n, _ in frames], None)
+    owners = [(n, _attrs(n), box) for (n, _), box in zip(frames, boxes) if _is_disqus(_attrs(n))]
+    sessions = {info.get("targetId"): sid for sid, info in tab.cdp.sessions.items()}
+
+    slots = []
+    if top_level:
+        for (node, label), box in zip(frames, boxes):
+            if box and box["width"] and box["height"] and not _is_disqus(_attrs(node)):
+                slots.append({"frame": None, "slot": label, **box})
+    for node, attrs, outer in owners:
+        session = sessions.get(node.get("frameId"))
+        if outer is None or session is None:
+            continue
+        doc   = await tab.cdp.call("DOM.getDocument", {"depth": -1}, session=session)
+        inner = list(_iframes(doc["root"]))
+        for (_, label), box in zip(inner, await _boxes(tab, [n for n, _ in inner], session)):
+            if box is None or not box["width"] or not box["height"]:
+                continue
+            slots.append({"frame": attrs.get("name"), "slot": label,
+                          "x": outer["x"] + box["x"], "y": outer["y"] + box["y"],
+                          "width": box["width"], "height": box["height"]})
+    return slots
+
+def _crop(pixels: np.ndarray, frame: dict, box: dict) -> np.ndarray:
+    # CSS px -> screenshot px; the screencast is downscaled to max_width
+    s  = pixels.shape[1] / (frame["deviceWidth"] or pixels.shape[1])
+    z  = frame["scale"] or 1
+    x0 = int(max(0, box["x"] * z * s))
+    y0 = int(max(0, (box["y"] * z + frame["offsetTop"]) * s))
+    x1 = int(min(pixels.shape[1], (box["x"] + box["width"]) * z * s))
+    y1 = int(min(pixels.shape[0], ((box["y"] + box["height"]) * z + frame["offsetTop"]) * s))
+    return pixels[y0:y1, x0:x1] if x1 > x0 and y1 > y0 else pixels[:0, :0]
+
+def _rendered(slot: dict, renders: list[dict]) -> dict | None:
+    # Earliest render event naming exactly the slot, from its Disqus frame if it has one
+    matches = [r for r in renders
+               if slot["frame"] in (None, r["frameName"]) and r["slot"] and r["slot"] == slot["slot"]]
+    return min(matches, key=lambda r: r["ts"]) if matches else None
+
+def summarize_filmstrip(frames: list[dict], hists: list[np.ndarray], slots: list[dict],
+                        renders: list[dict], nav_start: float) -> dict:
+    if not frames:
+        return {"frames": 0, "speed_index": None, "slots": []}
+    times    = np.array([(f["t"] - nav_start) * 1000 for f in frames])
+    progress = visual_progress(np.stack(hists))
+    result   = {
+        "frames": len(frames),
+        "speed_index": speed_index(times, progress),
+        "first_visual_change_ms": first_time(times, progress, CHANGED_AT),
+        "visually_complete_ms": settled_time(times, progress, COMPLETE_AT),
+        "progress": [[round(float(t), 1), round(float(v), 4)] for t, v in zip(times, progress)],
+        "slots": [],
+    }
+
+    # One pass over the frames on disk for every slot crop at once
+    slot_hists = [[] for _ in slots]
+    if slots:
+        for frame in frames:
+            with open(frame["path"], "rb") as f:
+                pixels = decode_frame(f.read())
+            for i, box in enumerate(slots):
+                slot_hists[i].append(frame_histogram(_crop(pixels, frame, box)))
+
+    for box, hist in zip(slots, slot_hists):
+        visible = bool(np.stack(hist).sum())
+        slot    = {**box, "in_viewport": visible}
+        if visible:
+            slot_progress = visual_progress(np.stack(hist))
+            slot["first_change_ms"] = first_time(times, slot_progress, CHANGED_AT)
+            slot["visible_ms"]      = settled_time(times, slot_progress, COMPLETE_AT)
+        render = _rendered(box, renders)
+        if render:
+            slot["render_event"] = render["type"]
+            slot["rendered_ms"]  = (render["ts"] - nav_start) * 1000
+            if slot.get("visible_ms") is not None:
+                slot["gap_ms"] = slot["visible_ms"] - slot["rendered_ms"]
+        result["slots"].append(slot)
+    return result
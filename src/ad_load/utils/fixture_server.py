@@ -0,0 +1,143 @@
+# Default Libraries
+import html
+import json
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local Imports
+from ad_load.loaders.template_loader import read_template, render_template
+
+# The page is served from one host and every nested frame from the other
+# one in turn, so each frame is cross-origin (and cross-site, so Chrome puts
+# it in its own process) relative to its parent, like Disqus and its ads.
+HOSTS = ("127.0.0.1", "localhost")
+
+FIXTURE_SCENARIO = {
+    "frames": 2,                # Disqus-like iframes on the page, named dsq-app<i>
+    "depth": 1,                 # levels of frames nested inside each of those
+    "slots": 2,                 # ad slots per frame
+    "top_slots": 0,             # ad slots on the publisher page itself
+    "bidders": ["alpha", "beta", "gamma"],
+    "latency_ms": [120, 0.4],   # bidder latency: log-normal median and sigma
+    "no_bid": 0.2,              # chance a bidder passes on a unit
+    "timeout_ms": 1000,         # auction timeout; slower bidders time out
+    "render_ms": 50,            # bidWon -> creative inserted
+    "start_ms": 300,            # document start -> first auction
+    "refresh_ms": 0,            # re-run the auction every N ms (0: never)
+    "seed": 1,
+}
+
+STUBS = {"/stub/pbjs.js": "stub_pbjs.js", "/stub/gpt.js": "stub_gpt.js"}
+
+def make_scenario(**overrides) -> dict:
+    unknown = set(overrides) - set(FIXTURE_SCENARIO)
+    if unknown:
+        raise ValueError(f"Unknown fixture settings: {', '.join(sorted(unknown))}")
+    return {**FIXTURE_SCENARIO, **overrides}
+
+def frame_seed(seed: int, path: str) -> int:
+    # Every document gets its own stream, stable across runs
+    return (seed * 1_000_003 + zlib.crc32(path.encode())) & 0xFFFFFFFF
+
+def fixture_document(scenario: dict, path: str, port: int) -> str:
+    # path "" is the publisher page; "1" is dsq-app1, "1.1" the frame inside it
+    level = len(path.split(".")) if path else 0
+    host  = HOSTS[level % 2]
+    other = HOSTS[(level + 1) % 2]
+    name  = f"dsq-app{path.replace('.', '-')}" if path else "page"
+
+    n_slots = scenario["top_slots"] if level == 0 else scenario["slots"]
+    slots   = [f"{name}-slot{i}" for i in range(1, n_slots + 1)]
+    config  = {key: scenario[key] for key in ("bidders", "latency_ms", "no_bid", "timeout_ms",
+                                              "render_ms", "start_ms", "refresh_ms")}
+    config.update(name=name, slots=slots, seed=frame_seed(scenario["seed"], path),
+                  creative=f"http://{other}:{port}/creative")
+
+    if level == 0:
+        children = [str(i) for i in range(1, scenario["frames"] + 1)]
+    elif level < scenario["depth"]:
+        children = [f"{path}.1"]
+    else:
+        children = []
+
+    stubs = "".join(f'<script src="http://{host}:{port}{src}"></script>' for src in STUBS) if slots else ""
+    return render_template(
+        "fixture_page.html",
+        title  = html.escape(name),
+        config = json.dumps(config),
+        stubs  = stubs,
+        slots  = "\n".join(f'<div class="slot" id="{s}"></div>' for s in slots),
+        frames = "\n".join(
+            f'<iframe class="frame" name="dsq-app{c.replace(".", "-")}" '
+            f'src="http://{other}:{port}/frame/{c}"></iframe>' for c in children),
+    )
+
+def creative_document(query: dict) -> str:
+    slot = html.escape(query.get("slot", [""])[0])
+    cpm  = html.escape(query.get("cpm", [""])[0])
+    return (f'<!DOCTYPE html><html><body style="margin:0;background:#c33;color:#fff;'
+            f'font:20px sans-serif">{slot}<br>CPM {cpm}</body></html>')
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server.fixture
+        url    = urlparse(self.path)
+        server.requests += 1
+        if url.path in STUBS:
+            self._reply(read_template(STUBS[url.path]), "application/javascript")
+        elif url.path == "/":
+            self._reply(fixture_document(server.scenario, "", server.port))
+        elif url.path.startswith("/frame/"):
+            self._reply(fixture_document(server.scenario, url.path.removeprefix("/frame/"), server.port))
+        elif url.path == "/creative":
+            self._reply(creative_document(parse_qs(url.query)))
+        else:
+            self.send_error(404)
+
+    def _reply(self, body: str, content_type: str = "text/html"):
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+# A fake publisher page with a stub Prebid/GPT stack in every frame, served
+# from a background thread. Usable as a context manager.
+class FixtureServer:
+    def __init__(self, scenario: dict | None = None, port: int = 0):
+        self.scenario = scenario or make_scenario()
+        self.requests = 0
+        self._server  = ThreadingHTTPServer((HOSTS[0], port), _Handler)
+        self._server.fixture = self
+        self._server.daemon_threads = True
+        self._thread  = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{HOSTS[0]}:{self.port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,62 @@
+# Default Libraries
+import re
+
+# Pydoll Imports
+from pydoll.commands.fetch_commands import FetchCommands
+
+def exact_url_pattern(url: str) -> str:
+    # Fetch patterns treat * and ? as wildcards; a backslash escapes them
+    return re.sub(r"([\\*?])", r"\\\1", url)
+
+# One Fetch.requestPaused listener per tab, shared by every feature that
+# needs interception (document rewrite, record/replay). Each handler owns
+# its patterns; Fetch is re-enabled with the union, or disabled when empty.
+# Handlers added with sessions=True also intercept attached iframe sessions,
+# through one session Fetch.enable whose pattern list they all share.
+class RequestInterceptor:
+    def __init__(self, tab):
+        self._tab = tab
+        self._handlers = {}
+        self._listening = False
+        self._session_patterns = None
+        self.paused = {"other": 0}
+
+    async def add(self, name: str, patterns: list[dict], handler, sessions: bool = False):
+        self._handlers[name] = (patterns, handler)
+        self.paused.setdefault(name, 0)
+        if not self._listening:
+            await self._tab.on("Fetch.requestPaused", self._dispatch)
+            self._listening = True
+        if sessions:
+            if self._session_patterns is None:
+                self._session_patterns = []
+                self._tab.add_session_command("Fetch.enable", {"patterns": self._session_patterns})
+            self._session_patterns.extend(patterns)
+        await self._apply()
+
+    async def remove(self, name: str):
+        if self._handlers.pop(name, None) is not None:
+            await self._apply()
+
+    async def _apply(self):
+        patterns = [p for pats, _ in self._handlers.values() for p in pats]
+        if not patterns:
+            await self._tab._execute_command(FetchCommands.disable())
+            return
+        await self._tab._execute_command({
+            "method": "Fetch.enable",
+            "params": {"patterns": patterns, "handleAuthRequests": False},
+        })
+
+    async def send(self, command: dict, session: str | None = None):
+        return await self._tab.cdp.send(command, session)
+
+    async def _dispatch(self, event):
+        p       = event.get("params", event)
+        session = event.get("sessionId")
+        for name, (_, handler) in list(self._handlers.items()):
+            if await handler(p, session):
+                self.paused[name] += 1
+                return
+        self.paused["other"] += 1
+        await self.send(FetchCommands.continue_request(p["requestId"]), session)
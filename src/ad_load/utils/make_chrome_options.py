@@ -9,6 +9,11 @@ async def make_chrome_options(headless: bool, mobile: bool = False) -> ChromiumO
     options.add_argument('--disable-web-security')
     options.add_argument('--disable-features=VizDisplayCompositor')
     
+    # Concurrent runs share one window; keep background tabs at full speed
+    options.add_argument('--disable-background-timer-throttling')
+    options.add_argument('--disable-backgrounding-occluded-windows')
+    options.add_argument('--disable-renderer-backgrounding')
+    
     if mobile:
         # Emulates an iPhone
         options.add_argument(
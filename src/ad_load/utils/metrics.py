@@ -0,0 +1,261 @@
+# Default Libraries
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE    = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+FLUSH_INTERVAL  = 5           # seconds between --metrics-file writes
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CDP_BUCKETS     = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5)
+RUN_BUCKETS     = (5, 10, 20, 30, 60, 120, 300, 900, 3600)
+PENDING_MAX     = 1000        # unmatched auctions/wins kept per run
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+# Counters, gauges and histograms keyed by their label values. Updates come
+# from the event loop, rendering from the exporter threads, hence the lock.
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name: str, help: str, unit: str | None = None):
+        self.name     = name
+        self.help     = help
+        self.unit     = unit
+        self._lock    = registry.lock
+        self._values  = {}
+
+    def _header(self) -> list[str]:
+        lines = [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.help}"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        return self._header() + [f"{self.name}_total{_labels(k)} {_number(v)}"
+                                 for k, v in self._values.items()]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> list[str]:
+        return self._header() + [f"{self.name}{_labels(k)} {_number(v)}"
+                                 for k, v in self._values.items()]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name: str, help: str, unit: str | None = None,
+                 buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(registry, name, help, unit)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, n, total = self._values.get(key, ([0] * len(self.buckets), 0, 0.0))
+            # Stored cumulative, as exposed
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, n + 1, total + value)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, (counts, n, total) in self._values.items():
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', _number(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {n}")
+            lines.append(f"{self.name}_count{_labels(key)} {n}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_number(total)}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.lock     = threading.Lock()
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, unit: str | None = None) -> Counter:
+        return self._add(Counter(self, name, help, unit))
+
+    def gauge(self, name: str, help: str, unit: str | None = None) -> Gauge:
+        return self._add(Gauge(self, name, help, unit))
+
+    def histogram(self, name: str, help: str, unit: str | None = None,
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(self, name, help, unit, buckets))
+
+    def render(self) -> str:
+        with self.lock:
+            lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines + ["# EOF"]) + "\n"
+
+# Process-wide; with --workers each worker process has its own
+REGISTRY = Registry()
+RUNS_IN_FLIGHT = REGISTRY.gauge("adload_runs_in_flight", "Measurements currently running")
+RUNS           = REGISTRY.counter("adload_runs", "Finished measurements by status")
+RUN_TIME       = REGISTRY.histogram("adload_run_seconds", "Wall time per measurement",
+                                    "seconds", RUN_BUCKETS)
+QUEUE_DEPTH    = REGISTRY.gauge("adload_queue_depth", "Runs waiting to start, per queue")
+EVENTS         = REGISTRY.counter("adload_events", "Events pushed by the injected scripts")
+AUCTIONS       = REGISTRY.counter("adload_auctions", "Prebid auctions started")
+BID_WIN        = REGISTRY.histogram("adload_bid_win_latency_seconds",
+                                    "auctionInit to bidWon, per won ad unit", "seconds")
+RENDER         = REGISTRY.histogram("adload_render_latency_seconds",
+                                    "bidWon to adRenderSucceeded, per ad unit", "seconds")
+CDP_LATENCY    = REGISTRY.histogram("adload_cdp_command_latency_seconds",
+                                    "CDP command round trip, session client commands only",
+                                    "seconds", CDP_BUCKETS)
+
+def track_run(fn):
+    # Wraps a run coroutine with the in-flight gauge and run counters
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        RUNS_IN_FLIGHT.inc()
+        started, status = time.monotonic(), "error"
+        try:
+            result = await fn(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            RUNS_IN_FLIGHT.dec()
+            RUNS.inc(status=status)
+            RUN_TIME.observe(time.monotonic() - started)
+    return wrapper
+
+def _remember(pending: dict, key: tuple, value: float):
+    # Refreshing ads over a soak would otherwise grow these without bound
+    pending[key] = value
+    if len(pending) > PENDING_MAX:
+        pending.pop(next(iter(pending)))
+
+# Subscribed to a run's EventSink. Latencies use the in-page clock ("t"),
+# matched within one frame: auctionInit -> bidWon by auction id, bidWon ->
+# adRenderSucceeded by ad unit. State lives as long as the run.
+class EventMetrics:
+    def __init__(self):
+        self._inits = {}
+        self._wins  = {}
+
+    def on_event(self, event: dict):
+        kind  = event.get("type")
+        data  = event.get("data") or {}
+        frame = (event.get("session"), event.get("frameName"))
+        EVENTS.inc(source=event.get("source", ""), type=kind or "")
+        if kind == "auctionInit":
+            AUCTIONS.inc()
+        if event.get("t") is None or not isinstance(data, dict):
+            return
+        if kind == "auctionInit":
+            _remember(self._inits, frame + (data.get("auctionId"),), event["t"])
+        elif kind == "bidWon":
+            started = self._inits.get(frame + (data.get("auctionId"),))
+            if started is not None:
+                BID_WIN.observe((event["t"] - started) / 1000)
+            _remember(self._wins, frame + (data.get("adUnitCode"),), event["t"])
+        elif kind == "adRenderSucceeded":
+            won = self._wins.pop(frame + (data.get("adUnitCode"),), None)
+            if won is not None:
+                RENDER.observe((event["t"] - won) / 1000)
+
+def write_metrics(path: str, registry: Registry = REGISTRY):
+    # Atomic, so a scraper never reads half a file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+# GET /metrics on localhost, served from a background thread
+class MetricsServer:
+    def __init__(self, port: int, registry: Registry = REGISTRY):
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.registry = registry
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+# Rewrites `path` every `interval` seconds, and once more on stop
+class MetricsFile:
+    def __init__(self, path: str, interval: float = FLUSH_INTERVAL, registry: Registry = REGISTRY):
+        self.path      = path
+        self.interval  = interval
+        self._registry = registry
+        self._stop     = threading.Event()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._thread   = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            write_metrics(self.path, self._registry)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        write_metrics(self.path, self._registry)
+
+def start_exporters(port: int | None = None, path: str | None = None,
+                    interval: float = FLUSH_INTERVAL) -> list:
+    exporters = []
+    if port:
+        exporters.append(MetricsServer(port))
+        print(f"Metrics at http://127.0.0.1:{port}/metrics")
+    if path:
+        exporters.append(MetricsFile(path, interval))
+        print(f"Metrics written to {path} every {interval:g}s")
+    return exporters
@@ -0,0 +1,176 @@
+# Default Libraries
+import asyncio
+import base64
+import hashlib
+import json
+import os
+from functools import partial
+from urllib.parse import urlsplit
+
+# Pydoll Imports
+from pydoll.commands.fetch_commands import FetchCommands
+from pydoll.constants import NetworkErrorReason
+
+NETCACHE_DIR = os.path.join("data", "netcache")
+
+# Bodies are stored decoded, so the original transfer headers no longer apply
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def request_key(method: str, url: str, post_data: str | None = None) -> str:
+    body_digest = _sha256((post_data or "").encode())
+    return _sha256(f"{method}\n{url}\n{body_digest}".encode())
+
+def loose_key(method: str, url: str) -> str:
+    # Bid requests carry cache busters and auction ids in the query string;
+    # replay falls back to the latest response recorded for the same path.
+    parts = urlsplit(url)
+    return _sha256(f"{method}\n{parts.scheme}://{parts.netloc}{parts.path}".encode())
+
+class ResponseStore:
+    # Content-addressed bodies under blobs/, plus an append-only NDJSON index
+    # keyed by method + URL + body digest. Later entries win on lookup.
+    def __init__(self, root: str = NETCACHE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, "index.ndjson")
+        self._exact = {}
+        self._loose = {}
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._remember(json.loads(line))
+                    except ValueError:
+                        continue
+
+    def _remember(self, entry: dict):
+        self._exact[entry["key"]] = entry
+        self._loose[entry["loose"]] = entry
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def put(self, method: str, url: str, post_data: str | None, status: int,
+            headers: list[dict], body: bytes, delay_ms: float | None = None) -> dict:
+        digest = _sha256(body)
+        path   = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+
+        entry = {
+            "key": request_key(method, url, post_data),
+            "loose": loose_key(method, url),
+            "method": method,
+            "url": url,
+            "status": status,
+            "headers": [h for h in headers if h["name"].lower() not in _DROP_HEADERS],
+            "blob": digest,
+            "delay_ms": delay_ms,
+        }
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._remember(entry)
+        return entry
+
+    def get(self, method: str, url: str, post_data: str | None = None):
+        entry = (self._exact.get(request_key(method, url, post_data))
+                 or self._loose.get(loose_key(method, url)))
+        if entry is None:
+            return None
+        with open(self._blob_path(entry["blob"]), "rb") as f:
+            return entry, f.read()
+
+class NetworkRecorder:
+    def __init__(self, store: ResponseStore):
+        self.store = store
+        self.stats = {"stored": 0, "errors": 0}
+        self._started = {}
+
+    async def install(self, tab, interceptor):
+        loop = asyncio.get_running_loop()
+
+        def on_request(ev):
+            self._started[(ev.get("sessionId"), ev["params"]["requestId"])] = loop.time()
+
+        await tab._execute_command({"method": "Network.enable"})
+        tab.add_session_command("Network.enable")
+        await tab.on("Network.requestWillBeSent", on_request)
+        await interceptor.add("netcache", [{"urlPattern": "*", "requestStage": "Response"}],
+                              partial(self.handle, interceptor), sessions=True)
+
+    async def handle(self, interceptor, p: dict, session: str | None) -> bool:
+        if "responseStatusCode" not in p:
+            return False
+        request = p["request"]
+        started = self._started.pop((session, p.get("networkId")), None)
+        delay   = (asyncio.get_running_loop().time() - started) * 1000 if started else None
+
+        body = b""
+        if not 300 <= p["responseStatusCode"] < 400:
+            try:
+                resp = await interceptor.send(
+                    FetchCommands.get_response_body(p["requestId"]), session
+                )
+                raw  = resp["result"]["body"]
+                body = base64.b64decode(raw) if resp["result"]["base64Encoded"] else raw.encode()
+            except Exception:
+                self.stats["errors"] += 1
+
+        self.store.put(request["method"], request["url"], request.get("postData"),
+                       p["responseStatusCode"], p.get("responseHeaders", []), body, delay)
+        self.stats["stored"] += 1
+        await interceptor.send(FetchCommands.continue_request(p["requestId"]), session)
+        return True
+
+class NetworkReplayer:
+    def __init__(self, store: ResponseStore, delays: bool = False):
+        self.store = store
+        self.delays = delays
+        self.stats = {"hits": 0, "misses": 0}
+
+    async def install(self, tab, interceptor):
+        await interceptor.add("netcache", [{"urlPattern": "*", "requestStage": "Request"}],
+                              partial(self.handle, interceptor), sessions=True)
+
+    async def handle(self, interceptor, p: dict, session: str | None) -> bool:
+        request = p["request"]
+        hit = self.store.get(request["method"], request["url"], request.get("postData"))
+        if hit is None:
+            # Never fall through to the live network in replay mode
+            self.stats["misses"] += 1
+            await interceptor.send(
+                FetchCommands.fail_request(p["requestId"], NetworkErrorReason.INTERNET_DISCONNECTED),
+                session
+            )
+            return True
+
+        entry, body = hit
+        self.stats["hits"] += 1
+        if self.delays and entry.get("delay_ms"):
+            await asyncio.sleep(entry["delay_ms"] / 1000)
+        await interceptor.send(
+            FetchCommands.fulfill_request(
+                request_id       = p["requestId"],
+                response_code    = entry["status"],
+                response_headers = entry["headers"],
+                body             = base64.b64encode(body).decode(),
+            ),
+            session
+        )
+        return True
+
+def make_network_cache(netcache: dict | None):
+    # netcache: {"mode": "record" | "replay", "root": path, "delays": bool}
+    if not netcache:
+        return None
+    store = ResponseStore(netcache.get("root") or NETCACHE_DIR)
+    if netcache["mode"] == "record":
+        return NetworkRecorder(store)
+    return NetworkReplayer(store, delays=netcache.get("delays", False))
@@ -0,0 +1,67 @@
+# Network numbers follow the DevTools presets: latency in ms, throughput in
+# bytes per second (-1 disables the limit). CPU rate is the slowdown factor.
+PROFILES = {
+    "fast-desktop": {
+        "network": {"latency": 0, "download": -1, "upload": -1},
+        "cpu": 1,
+        "device": {"width": 1350, "height": 940, "deviceScaleFactor": 1, "mobile": False},
+        "user_agent": None,
+    },
+    "mid-android-4g": {
+        "network": {"latency": 150, "download": 1.6 * 1024 * 1024 / 8, "upload": 750 * 1024 / 8},
+        "cpu": 4,
+        "device": {"width": 412, "height": 823, "deviceScaleFactor": 1.75, "mobile": True},
+        "user_agent": (
+            "Mozilla/5.0 (Linux; Android 11; moto g power (2022)) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36"
+        ),
+    },
+    "low-end-3g": {
+        "network": {"latency": 400, "download": 400 * 1024 / 8, "upload": 400 * 1024 / 8},
+        "cpu": 6,
+        "device": {"width": 360, "height": 640, "deviceScaleFactor": 2, "mobile": True},
+        "user_agent": (
+            "Mozilla/5.0 (Linux; Android 8.1.0; Nokia 1) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36"
+        ),
+    },
+}
+
+def get_profile(name: str | None) -> dict | None:
+    if name is None:
+        return None
+    if name not in PROFILES:
+        raise ValueError(f"Unknown profile {name!r}, expected one of {', '.join(PROFILES)}")
+    return {"name": name, **PROFILES[name]}
+
+def profile_commands(profile: dict) -> list[dict]:
+    net = profile["network"]
+    commands = [
+        {"method": "Network.emulateNetworkConditions", "params": {
+            "offline": False,
+            "latency": net["latency"],
+            "downloadThroughput": net["download"],
+            "uploadThroughput": net["upload"],
+        }},
+        {"method": "Emulation.setCPUThrottlingRate", "params": {"rate": profile["cpu"]}},
+    ]
+    if profile.get("user_agent"):
+        commands.append({"method": "Emulation.setUserAgentOverride",
+                         "params": {"userAgent": profile["user_agent"]}})
+    return commands
+
+async def apply_profile(tab, profile: dict | None):
+    if profile is None:
+        return
+    commands = profile_commands(profile)
+    for command in commands:
+        await tab._execute_command(dict(command))
+        # Ad iframes in their own process need the same link and CPU limits
+        tab.add_session_command(command["method"], command["params"])
+
+    # Viewport and touch only make sense for the top-level page
+    await tab._execute_command({"method": "Emulation.setDeviceMetricsOverride",
+                                "params": dict(profile["device"])})
+    if profile["device"]["mobile"]:
+        await tab._execute_command({"method": "Emulation.setTouchEmulationEnabled",
+                                    "params": {"enabled": True}})
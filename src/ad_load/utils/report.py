@@ -0,0 +1,248 @@
+# Default Libraries
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+
+# Third Party
+import numpy as np
+
+# Local Imports
+from ad_load.utils.results_store import count_runs, group_label, query_samples
+
+PERCENTILES = {"p50": 50, "p95": 95, "p99": 99}
+
+# Metric -> unit, in table order. Higher is worse for every one of them:
+# all are latencies in ms except heap_growth, the soak heap slope in MB/h
+METRICS = {
+    "ttfb": "ms", "fcp": "ms", "lcp": "ms", "tbt": "ms", "inp": "ms",
+    "first_auction": "ms", "bid_win": "ms", "win_to_render": "ms",
+    "speed_index": "ms", "render_to_visible": "ms", "heap_growth": "MB/h",
+}
+
+# Resamples are drawn in blocks so a 10k-sample group never allocates
+# more than this many indices at once
+_BOOT_BLOCK = 2_000_000
+
+def _site_for(url: str) -> str:
+    return (urlparse(url).netloc or url).removeprefix("www.")
+
+def _top_frame(performance: dict) -> dict | None:
+    # Metrics are collected from every frame; the top-level document has been
+    # alive longest, so it reports the largest performance.now()
+    frames = [m for m in performance.values() if isinstance(m, dict) and "error" not in m]
+    if not frames:
+        return None
+    return max(frames, key=lambda m: m.get("pageLoadTime") or 0)
+
+def run_metrics(summary: dict) -> list[tuple[str, float]]:
+    # summary: {"prebid", "performance", "run"} as returned by disqus_only
+    samples = []
+    top = _top_frame(summary.get("performance") or {})
+    if top:
+        for metric in ("ttfb", "fcp", "lcp", "tbt", "inp"):
+            if top.get(metric) is not None:
+                samples.append((metric, float(top[metric])))
+
+    first_auction = None
+    for frame in (summary.get("prebid") or {}).values():
+        starts = {a["auctionId"]: a["startTime"] for a in frame.get("auctions", [])}
+        if starts:
+            earliest = min(starts.values())
+            first_auction = earliest if first_auction is None else min(first_auction, earliest)
+        for win in frame.get("bidWins", []):
+            if win.get("auctionId") in starts:
+                samples.append(("bid_win", win["winTime"] - starts[win["auctionId"]]))
+            # First render of the unit after this win, not an earlier refresh cycle's
+            renders = [r["renderTime"] for r in frame.get("adRenders", [])
+                       if r["adUnitCode"] == win["adUnitCode"] and r["renderTime"] >= win["winTime"]]
+            if renders:
+                samples.append(("win_to_render", min(renders) - win["winTime"]))
+    if first_auction is not None:
+        samples.append(("first_auction", first_auction))
+
+    film = (summary.get("run") or {}).get("filmstrip") or {}
+    if film.get("speed_index") is not None:
+        samples.append(("speed_index", film["speed_index"]))
+    for slot in film.get("slots", []):
+        if slot.get("gap_ms") is not None:
+            samples.append(("render_to_visible", slot["gap_ms"]))
+
+    # MB/h of the top page's heap over a --soak run
+    soak = ((summary.get("run") or {}).get("soak") or {}).get("targets", {}).get("page", {})
+    if soak.get("heap", {}).get("slope_mb_per_h") is not None:
+        samples.append(("heap_growth", soak["heap"]["slope_mb_per_h"]))
+    return samples
+
+def _run_key(summary: dict, target: str | None = None) -> tuple[str, str]:
+    run     = summary.get("run") or {}
+    profile = group_label((run.get("profile") or {}).get("name"), (run.get("cache") or {}).get("mode"))
+    return target or run.get("site") or _site_for(run.get("url", "")), profile
+
+def find_sources(paths: list[str]) -> list[str]:
+    # A sweep directory is read through its merged.json; any other directory
+    # holding a run.json is a single run
+    sources = []
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            if "merged.json" in files:
+                sources.append(root)
+                dirs.clear()
+            elif "run.json" in files:
+                sources.append(root)
+            dirs.sort()
+    return sources
+
+def _read_json(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_source(source: str) -> list[tuple[str, str, str, float]]:
+    merged = _read_json(os.path.join(source, "merged.json"))
+    if merged is not None:
+        index   = _read_json(os.path.join(source, "index.json")) or {}
+        results = index.get("results", {})
+        runs    = [(s, results.get(run_id, {}).get("target")) for run_id, s in merged.items()]
+    else:
+        runs = [({
+            "run": _read_json(os.path.join(source, "run.json")),
+            "prebid": _read_json(os.path.join(source, "prebid_summaries.json")),
+            "performance": _read_json(os.path.join(source, "performance_metrics.json")),
+        }, None)]
+
+    rows = []
+    for summary, target in runs:
+        if not summary:
+            continue
+        site, profile = _run_key(summary, target)
+        rows.extend((site, profile, metric, value) for metric, value in run_metrics(summary))
+    return rows
+
+def load_samples(paths: list[str], jobs: int = 1) -> tuple[dict, int]:
+    # Returns {(site, profile, metric): np.ndarray} and the number of sources
+    sources = find_sources(paths)
+    if jobs > 1 and len(sources) > 1:
+        with ProcessPoolExecutor(jobs, mp_context=mp.get_context("spawn")) as pool:
+            batches = list(pool.map(load_source, sources, chunksize=32))
+    else:
+        batches = [load_source(source) for source in sources]
+
+    grouped = defaultdict(list)
+    for rows in batches:
+        for site, profile, metric, value in rows:
+            grouped[(site, profile, metric)].append(value)
+    return {key: np.asarray(values, dtype=float) for key, values in grouped.items()}, len(sources)
+
+def bootstrap_ci(samples: np.ndarray, qs: list[float], n_boot: int = 1000,
+                 alpha: float = 0.05, rng=None) -> np.ndarray:
+    # Percentile bootstrap; returns an array of shape (len(qs), 2) with lo/hi
+    rng   = rng if rng is not None else np.random.default_rng(0)
+    n     = len(samples)
+    block = max(1, min(n_boot, _BOOT_BLOCK // max(n, 1)))
+    boots = []
+    for start in range(0, n_boot, block):
+        idx = rng.integers(0, n, size=(min(block, n_boot - start), n))
+        boots.append(np.percentile(samples[idx], qs, axis=1))
+    boots = np.concatenate(boots, axis=1)
+    return np.percentile(boots, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=1).T
+
+def summarize(samples: dict, n_boot: int = 1000, alpha: float = 0.05, seed: int = 0) -> dict:
+    rng    = np.random.default_rng(seed)
+    names  = list(PERCENTILES)
+    qs     = [PERCENTILES[name] for name in names]
+    groups = {}
+    for (site, profile, metric), values in sorted(samples.items()):
+        values = values[np.isfinite(values)]
+        if not len(values):
+            continue
+        point = np.percentile(values, qs)
+        ci    = bootstrap_ci(values, qs, n_boot, alpha, rng) if len(values) > 1 else None
+        stats = {"n": int(len(values))}
+        for i, name in enumerate(names):
+            lo, hi = ci[i] if ci is not None else (point[i], point[i])
+            stats[name] = {"value": float(point[i]), "lo": float(lo), "hi": float(hi)}
+        groups.setdefault(site, {}).setdefault(profile, {})[metric] = stats
+    return groups
+
+def compare(current: dict, baseline: dict, threshold: float = 0.05,
+            gate: tuple[str, ...] = ("p50", "p95")) -> list[dict]:
+    # A regression needs the whole current CI above the baseline CI and a
+    # relative slowdown beyond the threshold, so noise alone never fails the gate
+    regressions = []
+    for site, profiles in current.items():
+        for profile, metrics in profiles.items():
+            for metric, stats in metrics.items():
+                base = baseline.get(site, {}).get(profile, {}).get(metric)
+                if base is None:
+                    continue
+                for name in gate:
+                    cur, ref = stats[name], base[name]
+                    if cur["lo"] > ref["hi"] and cur["value"] > ref["value"] * (1 + threshold):
+                        regressions.append({
+                            "site": site, "profile": profile, "metric": metric,
+                            "percentile": name, "baseline": ref["value"], "current": cur["value"],
+                            "change": cur["value"] / ref["value"] - 1 if ref["value"] else None,
+                        })
+    return regressions
+
+def format_regression(r: dict) -> str:
+    return (f"REGRESSION {r['site']} {r['profile']} {r['metric']} {r['percentile']}: "
+            f"{r['baseline']:.1f} -> {r['current']:.1f} {METRICS.get(r['metric'], 'ms')}")
+
+def format_table(groups: dict) -> str:
+    lines = [f"{'site':20} {'profile':16} {'metric':14} {'n':>6}  "
+             f"{'p50 [95% CI]':>24}  {'p95 [95% CI]':>24}  {'p99':>8}"]
+    for site, profiles in groups.items():
+        for profile, metrics in profiles.items():
+            for metric in METRICS:
+                if metric not in metrics:
+                    continue
+                s = metrics[metric]
+                cells = [f"{s[p]['value']:8.1f} [{s[p]['lo']:.1f}-{s[p]['hi']:.1f}]"
+                         for p in ("p50", "p95")]
+                lines.append(f"{site:20} {profile:16} {metric:14} {s['n']:>6}  "
+                             f"{cells[0]:>24}  {cells[1]:>24}  {s['p99']['value']:8.1f}")
+    return "\n".join(lines)
+
+def load_store_samples(db: str, since: float = 0) -> tuple[dict, int]:
+    grouped = defaultdict(list)
+    for site, profile, metric, value in query_samples(db, since):
+        grouped[(site, profile, metric)].append(value)
+    samples = {key: np.asarray(values, dtype=float) for key, values in grouped.items()}
+    return samples, count_runs(db, since)
+
+def report(paths: list[str], db: str | None = None, since: float = 0, out: str | None = None,
+           baseline: str | None = None, save_baseline: str | None = None,
+           threshold: float = 0.05, n_boot: int = 1000, jobs: int = 1) -> int:
+    started = time.monotonic()
+    if paths:
+        samples, sources = load_samples(paths, jobs)
+    else:
+        samples, sources = load_store_samples(db, since)
+    groups  = summarize(samples, n_boot)
+    result  = {"generated": time.time(), "sources": sources, "groups": groups}
+    print(format_table(groups))
+    print(f"\n{sources} sources, {sum(len(v) for v in samples.values())} samples "
+          f"in {time.monotonic() - started:.1f}s")
+
+    for path in (out, save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(result, f, indent=2)
+            print(f"Wrote {path}")
+
+    if not baseline:
+        return 0
+    with open(baseline) as f:
+        regressions = compare(groups, json.load(f)["groups"], threshold)
+    for r in regressions:
+        print(format_regression(r))
+    if not regressions:
+        print(f"No significant regressions against {baseline}")
+    return 1 if regressions else 0
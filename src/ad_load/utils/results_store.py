@@ -0,0 +1,337 @@
+# Default Libraries
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+# Local Imports
+from ad_load.utils.bidders import bidder_records
+
+RESULTS_DB = os.path.join("data", "results.db")
+
+# runs/auctions/bids/renders/vitals are normalized for querying; frames keeps
+# each raw summary so the old JSON files can still be rebuilt on demand
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    site        TEXT,
+    url         TEXT,
+    profile     TEXT,
+    started     REAL,
+    completed   INTEGER,
+    waited      REAL,
+    events      INTEGER,
+    meta        TEXT,
+    cache_mode  TEXT
+);
+CREATE TABLE IF NOT EXISTS frames (
+    run_id      TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    frame_key   TEXT NOT NULL,
+    frame_name  TEXT,
+    data        TEXT,
+    PRIMARY KEY (run_id, kind, frame_key)
+);
+CREATE TABLE IF NOT EXISTS auctions (
+    run_id      TEXT NOT NULL,
+    frame_name  TEXT,
+    auction_id  TEXT,
+    start_time  REAL,
+    end_time    REAL,
+    duration    REAL
+);
+CREATE TABLE IF NOT EXISTS bids (
+    run_id      TEXT NOT NULL,
+    frame_name  TEXT,
+    auction_id  TEXT,
+    bidder      TEXT,
+    cpm         REAL,
+    ad_unit     TEXT,
+    win_time    REAL
+);
+CREATE TABLE IF NOT EXISTS renders (
+    run_id      TEXT NOT NULL,
+    frame_name  TEXT,
+    ad_unit     TEXT,
+    render_time REAL,
+    failed      INTEGER NOT NULL DEFAULT 0,
+    reason      TEXT
+);
+CREATE TABLE IF NOT EXISTS bidder_requests (
+    run_id          TEXT NOT NULL,
+    frame_name      TEXT,
+    auction_id      TEXT,
+    bidder          TEXT,
+    requested       REAL,
+    first_response  REAL,
+    done            REAL,
+    ad_units        INTEGER,
+    responses       INTEGER,
+    no_bids         INTEGER,
+    timeouts        INTEGER,
+    max_cpm         REAL,
+    auction_duration REAL
+);
+CREATE TABLE IF NOT EXISTS vitals (
+    run_id          TEXT NOT NULL,
+    frame_id        TEXT,
+    ttfb            REAL,
+    fcp             REAL,
+    lcp             REAL,
+    dom_content_loaded REAL,
+    load_event      REAL,
+    page_load_time  REAL,
+    cls             REAL,
+    tbt             REAL,
+    inp             REAL,
+    frame_name      TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_site_started ON runs (site, started);
+CREATE INDEX IF NOT EXISTS runs_started      ON runs (started);
+CREATE INDEX IF NOT EXISTS frames_name       ON frames (frame_name);
+CREATE INDEX IF NOT EXISTS auctions_run      ON auctions (run_id, frame_name);
+CREATE INDEX IF NOT EXISTS bids_run          ON bids (run_id, frame_name);
+CREATE INDEX IF NOT EXISTS renders_run       ON renders (run_id, frame_name);
+CREATE INDEX IF NOT EXISTS vitals_run        ON vitals (run_id);
+CREATE INDEX IF NOT EXISTS bidder_requests_run    ON bidder_requests (run_id);
+CREATE INDEX IF NOT EXISTS bidder_requests_bidder ON bidder_requests (bidder);
+"""
+
+_CHILD_TABLES = ("frames", "auctions", "bids", "renders", "vitals", "bidder_requests")
+_BIDDER_COLUMNS = ("run_id", "frame_name", "auction_id", "bidder", "requested", "first_response",
+                   "done", "ad_units", "responses", "no_bids", "timeouts", "max_cpm",
+                   "auction_duration")
+
+# Columns added after a table was first released; old stores gain them on open
+_ADDED_COLUMNS = {
+    "runs": (("cache_mode", "TEXT"),),
+    "vitals": (("cls", "REAL"), ("tbt", "REAL"), ("inp", "REAL"), ("frame_name", "TEXT")),
+}
+
+def _migrate(conn: sqlite3.Connection):
+    for table, columns in _ADDED_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, kind in columns:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+
+def connect(path: str = RESULTS_DB) -> sqlite3.Connection:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # WAL lets pool workers append while a report reads; the timeout covers
+    # the short writer lock taken by each run's single transaction
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    return conn
+
+def run_rows(summary: dict) -> dict[str, list[tuple]]:
+    # summary: {"prebid", "google_ads", "performance", "run"} as returned by disqus_only
+    run    = summary["run"]
+    run_id = run["run_id"]
+    rows   = {table: [] for table in ("runs",) + _CHILD_TABLES}
+    rows["runs"].append((
+        run_id, run.get("site"), run.get("url"), (run.get("profile") or {}).get("name"),
+        run.get("started"), int(bool(run.get("completed"))), run.get("waited"),
+        run.get("events"), json.dumps(run), (run.get("cache") or {}).get("mode"),
+    ))
+
+    for kind in ("prebid", "google_ads", "performance", "trace"):
+        for key, data in (summary.get(kind) or {}).items():
+            name = data.get("frameName") if kind != "trace" else key
+            rows["frames"].append((run_id, kind, key, name, json.dumps(data)))
+
+    for name, frame in (summary.get("prebid") or {}).items():
+        for a in frame.get("auctions", []):
+            rows["auctions"].append((run_id, name, a.get("auctionId"), a.get("startTime"),
+                                     a.get("endTime"), a.get("duration")))
+        for w in frame.get("bidWins", []):
+            rows["bids"].append((run_id, name, w.get("auctionId"), w.get("bidder"), w.get("cpm"),
+                                 w.get("adUnitCode"), w.get("winTime")))
+        for r in frame.get("adRenders", []):
+            rows["renders"].append((run_id, name, r.get("adUnitCode"), r.get("renderTime"), 0, None))
+        for r in frame.get("adRenderFailures", []):
+            rows["renders"].append((run_id, name, r.get("adUnitCode"), r.get("failTime"), 1,
+                                    r.get("reason")))
+
+    for record in bidder_records(run_id, summary.get("prebid")):
+        rows["bidder_requests"].append(tuple(record[c] for c in _BIDDER_COLUMNS))
+
+    for frame_id, m in (summary.get("performance") or {}).items():
+        if not isinstance(m, dict) or "error" in m:
+            continue
+        rows["vitals"].append((run_id, frame_id, m.get("ttfb"), m.get("fcp"), m.get("lcp"),
+                               m.get("domContentLoaded"), m.get("loadEvent"), m.get("pageLoadTime"),
+                               m.get("cls"), m.get("tbt"), m.get("inp"), m.get("frameName")))
+    return rows
+
+def save_runs(path: str, summaries: list[dict]):
+    # One transaction and one executemany per table for the whole batch
+    batch = {}
+    for summary in summaries:
+        for table, rows in run_rows(summary).items():
+            batch.setdefault(table, []).extend(rows)
+    if not batch:
+        return
+
+    run_ids = [row[0] for row in batch["runs"]]
+    conn = connect(path)
+    try:
+        with conn:
+            # A reused id would silently replace an earlier run's history
+            stored = {row[0] for row in conn.execute(
+                f"SELECT run_id FROM runs WHERE run_id IN ({', '.join('?' * len(run_ids))})", run_ids)}
+            seen, repeated = set(), set()
+            for run_id in run_ids:
+                (repeated if run_id in seen else seen).add(run_id)
+            clashes = sorted(stored | repeated)
+            if clashes:
+                raise ValueError(f"Run ids already in {path}: {', '.join(clashes)}")
+            for table, rows in batch.items():
+                if rows:
+                    marks = ", ".join("?" * len(rows[0]))
+                    conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+    finally:
+        conn.close()
+
+def new_id(prefix: str = "") -> str:
+    # Timestamped, plus a random suffix: two runs started in the same second
+    # must not collide now that the store refuses reused ids
+    return f"{prefix}{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+def save_run(path: str, summary: dict):
+    save_runs(path, [summary])
+
+def load_run(path: str, run_id: str) -> dict | None:
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT meta FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        summary = {"prebid": {}, "google_ads": {}, "performance": {}, "run": json.loads(row[0])}
+        for kind, key, data in conn.execute(
+            "SELECT kind, frame_key, data FROM frames WHERE run_id = ? ORDER BY rowid", (run_id,)
+        ):
+            summary.setdefault(kind, {})[key] = json.loads(data)
+        return summary
+    finally:
+        conn.close()
+
+def write_json_view(out_dir: str, summary: dict) -> list[str]:
+    # The per-run files earlier versions always wrote
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name, key in (("prebid_summaries.json", "prebid"),
+                      ("google_ads_summary.json", "google_ads"),
+                      ("performance_metrics.json", "performance"),
+                      ("run.json", "run")):
+        out = os.path.join(out_dir, name)
+        with open(out, "w") as f:
+            json.dump(summary[key], f, indent=2)
+        written.append(out)
+    if summary.get("trace"):
+        out = os.path.join(out_dir, "trace_summary.json")
+        with open(out, "w") as f:
+            json.dump(summary["trace"], f, indent=2)
+        written.append(out)
+    return written
+
+def group_label(profile: str | None, cache_mode: str | None) -> str:
+    # Report groups: cold runs keep the bare profile name, so baselines saved
+    # before cache modes existed still line up
+    profile = profile or "default"
+    return profile if cache_mode in (None, "cold") else f"{profile}+{cache_mode}"
+
+# Latencies per run, shaped like report.run_metrics rows: (site, profile, metric, value)
+SAMPLE_QUERIES = {
+    # Vitals of the top-level document, which has been alive longest
+    "vitals": """
+        SELECT r.site, r.profile, r.cache_mode, v.ttfb, v.fcp, v.lcp, v.tbt, v.inp
+        FROM runs r JOIN vitals v ON v.run_id = r.run_id
+        WHERE r.started >= ? AND v.page_load_time = (
+            SELECT MAX(page_load_time) FROM vitals WHERE run_id = r.run_id
+        )
+        GROUP BY r.run_id
+    """,
+    "first_auction": """
+        SELECT r.site, r.profile, r.cache_mode, MIN(a.start_time)
+        FROM runs r JOIN auctions a ON a.run_id = r.run_id
+        WHERE r.started >= ?
+        GROUP BY r.run_id
+    """,
+    "bid_win": """
+        SELECT r.site, r.profile, r.cache_mode, b.win_time - a.start_time
+        FROM runs r
+        JOIN bids b     ON b.run_id = r.run_id
+        JOIN auctions a ON a.run_id = b.run_id AND a.frame_name = b.frame_name
+                       AND a.auction_id = b.auction_id
+        WHERE r.started >= ?
+    """,
+    # With refresh the same ad unit renders once per cycle; each win is
+    # paired with the first render after it
+    "win_to_render": """
+        SELECT r.site, r.profile, r.cache_mode, (
+            SELECT MIN(x.render_time) FROM renders x
+            WHERE x.run_id = b.run_id AND x.frame_name = b.frame_name
+              AND x.ad_unit = b.ad_unit AND x.failed = 0
+              AND x.render_time >= b.win_time
+        ) - b.win_time
+        FROM runs r JOIN bids b ON b.run_id = r.run_id
+        WHERE r.started >= ?
+    """,
+    "speed_index": """
+        SELECT r.site, r.profile, r.cache_mode, json_extract(r.meta, '$.filmstrip.speed_index')
+        FROM runs r
+        WHERE r.started >= ?
+    """,
+    "render_to_visible": """
+        SELECT r.site, r.profile, r.cache_mode, json_extract(s.value, '$.gap_ms')
+        FROM runs r, json_each(r.meta, '$.filmstrip.slots') s
+        WHERE r.started >= ?
+    """,
+    # Top-page heap trend of --soak runs, MB/h
+    "heap_growth": """
+        SELECT r.site, r.profile, r.cache_mode,
+               json_extract(r.meta, '$.soak.targets.page.heap.slope_mb_per_h')
+        FROM runs r
+        WHERE r.started >= ?
+    """,
+}
+
+def query_samples(path: str, since: float = 0) -> list[tuple[str, str, str, float]]:
+    conn = connect(path)
+    try:
+        samples = []
+        for site, profile, mode, *values in conn.execute(SAMPLE_QUERIES["vitals"], (since,)):
+            for metric, value in zip(("ttfb", "fcp", "lcp", "tbt", "inp"), values):
+                samples.append((site, group_label(profile, mode), metric, value))
+        for metric in ("first_auction", "bid_win", "win_to_render", "speed_index",
+                       "render_to_visible", "heap_growth"):
+            for site, profile, mode, value in conn.execute(SAMPLE_QUERIES[metric], (since,)):
+                samples.append((site, group_label(profile, mode), metric, value))
+        return [row for row in samples if row[3] is not None]
+    finally:
+        conn.close()
+
+def query_bidders(path: str, since: float = 0, site: str | None = None) -> list[dict]:
+    conn = connect(path)
+    try:
+        sql = (f"SELECT {', '.join('b.' + c for c in _BIDDER_COLUMNS)} FROM bidder_requests b "
+               "JOIN runs r ON r.run_id = b.run_id WHERE r.started >= ?")
+        params = [since]
+        if site:
+            sql += " AND r.site = ?"
+            params.append(site)
+        return [dict(zip(_BIDDER_COLUMNS, row)) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+def count_runs(path: str, since: float = 0) -> int:
+    conn = connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM runs WHERE started >= ?", (since,)).fetchone()[0]
+    finally:
+        conn.close()
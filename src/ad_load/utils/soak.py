@@ -0,0 +1,237 @@
+# Default Libraries
+import asyncio
+import json
+import re
+import time
+from collections import deque
+
+# Third Party
+import numpy as np
+
+# Performance.getMetrics names sampled per target, and what they are stored as
+SOAK_METRICS = {
+    "JSHeapUsedSize": "heap_mb",
+    "Nodes": "nodes",
+    "JSEventListeners": "listeners",
+    "LayoutCount": "layouts",
+    "TaskDuration": "task_ms",
+}
+
+SOAK_INTERVAL = 10        # seconds between samples
+SOAK_SAMPLES  = 720       # samples kept in memory per target (2h at 10s)
+SOAK_CYCLES   = 500       # refresh cycles kept in memory
+SOAK_TARGETS  = 50        # iframe sessions sampled at once
+SOAK_CLOSED   = 200       # summaries kept of iframe sessions that have detached
+HEAP_WINDOWS  = 6         # windows whose heap floors must keep rising
+HEAP_MIN_MB   = 5         # ...by at least this much overall to be flagged
+DRIFT_RATIO   = 1.5       # late/early median auction duration that counts as drift
+DRIFT_MIN     = 6         # cycles needed before drift is judged
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+_UNITS    = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_duration(text: str) -> float:
+    # "90", "90s", "15m", "2h", "1.5h" -> seconds
+    match = _DURATION.match(str(text).strip().lower())
+    if not match:
+        raise ValueError(f"Bad duration {text!r}; use e.g. 90s, 15m or 2h")
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+def _metrics(response: dict) -> dict | None:
+    metrics = response.get("result", {}).get("metrics")
+    if metrics is None:
+        return None
+    values = {}
+    for metric in metrics:
+        key = SOAK_METRICS.get(metric["name"])
+        if key == "heap_mb":
+            values[key] = metric["value"] / (1 << 20)
+        elif key == "task_ms":
+            values[key] = metric["value"] * 1000
+        elif key:
+            values[key] = metric["value"]
+    return values
+
+def heap_growth(times: np.ndarray, heap: np.ndarray, windows: int = HEAP_WINDOWS,
+                min_mb: float = HEAP_MIN_MB) -> dict:
+    # GC makes the heap a sawtooth, so trends are read from each window's
+    # floor: a leak raises the floor after every collection.
+    result = {"samples": int(len(heap))}
+    if len(heap) < 2:
+        return result
+    hours = (times - times[0]) / 3600
+    if hours[-1] > 0:
+        result["slope_mb_per_h"] = float(np.polyfit(hours, heap, 1)[0])
+    if len(heap) >= windows * 2:
+        floors = np.array([w.min() for w in np.array_split(heap, windows)])
+        result["floors_mb"] = [round(float(f), 2) for f in floors]
+        result["monotonic"] = bool(np.all(np.diff(floors) > 0)
+                                   and floors[-1] - floors[0] >= min_mb)
+    return result
+
+def auction_drift(durations: np.ndarray, ratio: float = DRIFT_RATIO,
+                  min_cycles: int = DRIFT_MIN) -> dict:
+    # Median auction duration of the last third of cycles against the first
+    result = {"cycles": int(len(durations))}
+    if len(durations) < min_cycles:
+        return result
+    third = len(durations) // 3
+    early = float(np.median(durations[:third]))
+    late  = float(np.median(durations[-third:]))
+    result.update(early_ms=early, late_ms=late,
+                  ratio=late / early if early else None,
+                  drift=bool(early and late / early >= ratio))
+    return result
+
+def _target_stats(rows) -> dict:
+    times = np.array([r["t"] for r in rows])
+    last  = rows[-1]
+    stats = {"url": last["url"], "samples": len(rows),
+             "last": {k: last[k] for k in SOAK_METRICS.values() if k in last}}
+    heap  = np.array([r["heap_mb"] for r in rows if "heap_mb" in r])
+    if len(heap) == len(times):
+        stats["heap"] = heap_growth(times, heap)
+    return stats
+
+# Keeps the page open and samples Performance.getMetrics for the top target
+# and up to `max_targets` attached iframe sessions. Samples go to an NDJSON
+# time series on disk; memory holds at most `capacity` samples per live
+# target, a short summary of the last `max_closed` detached ones (every ad
+# refresh attaches a new session) and `max_cycles` refresh cycles, so a soak
+# can run for hours.
+class SoakSampler:
+    def __init__(self, tab, path: str, interval: float = SOAK_INTERVAL,
+                 capacity: int = SOAK_SAMPLES, max_cycles: int = SOAK_CYCLES,
+                 max_targets: int = SOAK_TARGETS, max_closed: int = SOAK_CLOSED):
+        self._tab        = tab
+        self.path        = path
+        self.interval    = interval
+        self.capacity    = capacity
+        self.max_targets = max_targets
+        self.samples     = {}
+        self.closed      = deque(maxlen=max_closed)
+        self.detached    = 0
+        self.untracked   = 0
+        self.cycles      = deque(maxlen=max_cycles)
+        self.count       = 0
+        self.errors      = 0
+        self._enabled    = set()
+        self._inits      = {}
+        self._seen       = {}
+        self._file       = None
+
+    async def attach(self):
+        await self._tab.cdp.on("Target.detachedFromTarget", self._on_detached)
+
+    def _on_detached(self, ev):
+        # The session's series is folded into a summary and dropped
+        session = ev["params"].get("sessionId")
+        self._enabled.discard(session)
+        rows = self.samples.pop(session, None)
+        if rows:
+            self.detached += 1
+            self.closed.append({"target": session, **_target_stats(rows)})
+
+    def on_event(self, event: dict):
+        # Fed by EventSink: each auctionEnd closes one refresh cycle of its frame
+        kind = event.get("type")
+        if kind not in ("auctionInit", "auctionEnd"):
+            return
+        frame   = event.get("frameName") or event.get("frameId") or ""
+        auction = (event.get("data") or {}).get("auctionId")
+        if kind == "auctionInit":
+            self._inits[(frame, auction)] = event["ts"]
+            if len(self._inits) > self.cycles.maxlen:
+                # Auctions that never ended
+                self._inits.pop(next(iter(self._inits)))
+            return
+        started = self._inits.pop((frame, auction), None)
+        self._seen[frame] = self._seen.get(frame, 0) + 1
+        self.cycles.append({"frame": frame, "cycle": self._seen[frame], "ts": event["ts"],
+                            "started": started,
+                            "duration_ms": (event.get("data") or {}).get("duration")})
+
+    def _targets(self) -> dict:
+        # Series are keyed by session: ad iframes often share a URL (safeframe
+        # containers, about:blank at attach), which is kept per row instead.
+        # "page" is the top-level target, the rest are flattened iframe sessions.
+        # Sessions already tracked keep their place when over max_targets.
+        iframes = {session: info.get("url") or "" for session, info in self._tab.cdp.sessions.items()
+                   if info.get("type") == "iframe"}
+        order   = sorted(iframes, key=lambda session: session not in self.samples)
+        self.untracked = max(0, len(order) - self.max_targets)
+        targets = {"page": (None, "")}
+        for session in order[:self.max_targets]:
+            targets[session] = (session, iframes[session])
+        return targets
+
+    async def _sample_one(self, session: str | None) -> dict | None:
+        commands = [{"method": "Performance.getMetrics"}]
+        if session not in self._enabled:
+            commands.insert(0, {"method": "Performance.enable"})
+        try:
+            responses = await self._tab.cdp.send_many(commands, session, timeout=5)
+        except Exception:
+            self.errors += 1
+            return None
+        self._enabled.add(session)
+        values = _metrics(responses[-1])
+        if values is None:
+            self.errors += 1
+        return values
+
+    async def sample(self):
+        targets = self._targets()
+        values  = await asyncio.gather(*(self._sample_one(s) for s, _ in targets.values()))
+        now     = time.time()
+        for (key, (_, url)), metrics in zip(targets.items(), values):
+            # A session that detached mid-sample must not reopen its series
+            if metrics is None or (key != "page" and key not in self._tab.cdp.sessions):
+                continue
+            row = {"t": now, "target": key, "url": url, **metrics}
+            self.samples.setdefault(key, deque(maxlen=self.capacity)).append(row)
+            self._file.write(json.dumps(row) + "\n")
+            self.count += 1
+
+    async def run(self, duration: float):
+        # Samples every `interval` seconds until `duration` has passed
+        self._file = open(self.path, "a", buffering=1, encoding="utf-8")
+        loop     = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        try:
+            while True:
+                await self.sample()
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(self.interval, remaining))
+        finally:
+            self._file.close()
+
+    def summary(self) -> dict:
+        targets = {key: _target_stats(rows) for key, rows in self.samples.items()}
+
+        by_frame = {}
+        for cycle in self.cycles:
+            if cycle["duration_ms"] is not None:
+                by_frame.setdefault(cycle["frame"], []).append(cycle["duration_ms"])
+        drift = {frame: auction_drift(np.array(d, dtype=float)) for frame, d in by_frame.items()}
+
+        flags = [f"heap growth in {key}" + (f" ({s['url']})" if s["url"] else "")
+                 for key, s in [*targets.items(), *((c["target"], c) for c in self.closed)]
+                 if s.get("heap", {}).get("monotonic")]
+        flags += [f"auction drift in {frame}" for frame, d in drift.items() if d.get("drift")]
+        return {
+            "path": self.path,
+            "interval": self.interval,
+            "samples": self.count,
+            "errors": self.errors,
+            "cycles": sum(self._seen.values()),
+            "targets": targets,
+            # Detached iframe sessions: how many, and the last max_closed of them
+            "detached": self.detached,
+            "closed": list(self.closed),
+            "untracked": self.untracked,
+            "auctions": drift,
+            "flags": flags,
+        }
@@ -0,0 +1,294 @@
+# Default Libraries
+import asyncio
+import base64
+import gzip
+import json
+from urllib.parse import urlsplit
+
+TRACE_CATEGORIES = [
+    "toplevel",
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "v8.execute",
+    "loading",
+]
+
+LONG_TASK_MS = 50
+
+# Script URLs that belong to the ad stack, checked in order before falling
+# back to the script's own domain (bidder adapters, creatives)
+ORIGIN_MARKERS = (
+    ("prebid", ("prebid", "pbjs")),
+    ("gpt", ("securepubads.g.doubleclick.net", "googletagservices", "googlesyndication",
+             "doubleclick.net", "/gpt/", "gpt.js")),
+    ("disqus", ("disqus.com", "disquscdn.com")),
+)
+
+SCRIPT_EVENTS = {"EvaluateScript", "FunctionCall", "v8.compile", "TimerFire"}
+LAYOUT_EVENTS = {"Layout", "UpdateLayoutTree"}
+
+_READ_SIZE = 1 << 20
+
+def classify_url(url: str | None) -> str:
+    if not url:
+        return "unattributed"
+    lowered = url.lower()
+    for origin, markers in ORIGIN_MARKERS:
+        if any(m in lowered for m in markers):
+            return origin
+    host = urlsplit(url).hostname or ""
+    # Last two labels are enough to group a bidder's hosts together
+    return ".".join(host.split(".")[-2:]) or "unattributed"
+
+class TraceRecorder:
+    # Tracing.start with ReturnAsStream; Chrome gzips the stream itself, so
+    # the chunks from IO.read go to disk untouched and never pile up in memory
+    def __init__(self, tab, path: str):
+        self._tab = tab
+        self.path = path
+        self.bytes = 0
+        self.running = False
+
+    async def start(self):
+        self.running = True
+        await self._tab._execute_command({
+            "method": "Tracing.start",
+            "params": {
+                "traceConfig": {
+                    "includedCategories": TRACE_CATEGORIES,
+                    "recordMode": "recordAsMuchAsPossible",
+                },
+                "transferMode": "ReturnAsStream",
+                "streamFormat": "json",
+                "streamCompression": "gzip",
+            },
+        })
+
+    async def stop(self, timeout: float = 60) -> str:
+        complete = asyncio.get_running_loop().create_future()
+
+        def on_complete(ev):
+            if not complete.done():
+                complete.set_result(ev["params"])
+
+        await self._tab.on("Tracing.tracingComplete", on_complete)
+        self.running = False
+        await self._tab._execute_command({"method": "Tracing.end"})
+        params = await asyncio.wait_for(complete, timeout)
+
+        handle = params["stream"]
+        with open(self.path, "wb") as f:
+            while True:
+                resp = await self._tab._execute_command({
+                    "method": "IO.read", "params": {"handle": handle, "size": _READ_SIZE}
+                })
+                result = resp["result"]
+                data   = result.get("data", "")
+                chunk  = base64.b64decode(data) if result.get("base64Encoded") else data.encode()
+                f.write(chunk)
+                self.bytes += len(chunk)
+                if result.get("eof"):
+                    break
+        await self._tab._execute_command({"method": "IO.close", "params": {"handle": handle}})
+        return self.path
+
+    async def abort(self):
+        # Ends a trace nobody will read; its stream goes away with the tab
+        if self.running:
+            self.running = False
+            await self._tab._execute_command({"method": "Tracing.end"})
+
+def iter_trace_events(path: str, chunk_size: int = 1 << 16):
+    # Decodes one event object at a time from {"traceEvents": [ ... ]}, so
+    # only the current chunk and a partial event are held in memory. `idx`
+    # walks the buffer; it is only cut down when the next chunk is appended.
+    decoder = json.JSONDecoder()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        buf = ""
+        while "[" not in buf:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buf += chunk
+        idx = buf.index("[") + 1
+        eof = False
+        while True:
+            while idx < len(buf) and buf[idx] in ", \n\r\t":
+                idx += 1
+            if buf.startswith("]", idx):
+                return
+            try:
+                event, idx = decoder.raw_decode(buf, idx)
+            except ValueError:
+                if eof:
+                    return
+                chunk = f.read(chunk_size)
+                eof   = not chunk
+                buf   = buf[idx:] + chunk
+                idx   = 0
+                continue
+            yield event
+
+def _frame_of(args: dict) -> str | None:
+    data = args.get("data") or args.get("beginData") or {}
+    return data.get("frame")
+
+def _script_url(name: str, args: dict) -> str | None:
+    data = args.get("data") or {}
+    if data.get("url"):
+        return data["url"]
+    stack = data.get("stackTrace") or (args.get("beginData") or {}).get("stackTrace")
+    return stack[0].get("url") if stack else None
+
+class TraceAttribution:
+    # Streaming aggregation keyed by (frame label, origin). Complete events are
+    # written when they finish, so a task's scripts usually arrive before the
+    # task itself; both orders are handled per thread.
+    def __init__(self, long_task_ms: float = LONG_TASK_MS):
+        self.long_task_us = long_task_ms * 1000
+        self.frames  = {}
+        self.parents = {}
+        self.pids    = {}
+        self.stats   = {}
+        self.events  = 0
+        self._pending   = {}
+        self._open_task = {}
+        self._scripts   = {}
+
+    def _note_frame(self, data: dict):
+        frame = data.get("frame")
+        if not frame:
+            return
+        self.frames[frame] = data.get("name") or self.frames.get(frame, "")
+        if data.get("parent"):
+            self.parents[frame] = data["parent"]
+        if data.get("processId"):
+            self.pids.setdefault(data["processId"], frame)
+
+    def label(self, frame: str | None, pid=None) -> str:
+        # Ad iframes nested inside a Disqus frame are charged to that frame
+        frame = frame or self.pids.get(pid)
+        seen  = set()
+        while frame and frame not in seen:
+            seen.add(frame)
+            name = self.frames.get(frame, "")
+            if name.startswith("dsq-"):
+                return name
+            if frame not in self.parents:
+                return "page" if frame in self.frames else "other"
+            frame = self.parents[frame]
+        return "other"
+
+    def _bucket(self, label: str, origin: str) -> dict:
+        return self.stats.setdefault(label, {}).setdefault(origin, {
+            "script_ms": 0.0, "layout_ms": 0.0, "long_tasks": 0, "long_task_ms": 0.0,
+        })
+
+    def _credit_script(self, thread, ts: float, end: float, label: str, origin: str) -> list:
+        # Script events nest (EvaluateScript > FunctionCall > v8.compile), so
+        # each one is charged only its self time: its duration minus the
+        # outermost scripts inside it, which is taken back from the innermost
+        # script around it. Whichever order they arrive in, the outermost
+        # script's duration is counted exactly once.
+        known    = self._scripts.setdefault(thread, [])
+        inner    = [s for s in known if ts <= s[0] and s[1] <= end and (s[0], s[1]) != (ts, end)]
+        nested   = {id(s) for s in inner}
+        outer    = [s for s in known if s[0] <= ts and end <= s[1] and id(s) not in nested]
+        maximal  = [s for s in inner
+                    if not any(o is not s and o[0] <= s[0] and s[1] <= o[1] for o in inner)]
+        self_us  = (end - ts) - sum(s[1] - s[0] for s in maximal)
+        script   = [ts, end, label, origin, self_us]
+        self._bucket(label, origin)["script_ms"] += self_us / 1000
+        if outer:
+            parent = min(outer, key=lambda s: s[1] - s[0])
+            parent[4] -= self_us
+            self._bucket(parent[2], parent[3])["script_ms"] -= self_us / 1000
+        # Scripts inside this one are accounted for; it stands in for them
+        known[:] = [s for s in known if id(s) not in nested][-255:] + [script]
+        return script
+
+    def _credit_task(self, task: dict, scripts: list):
+        by_origin = {}
+        for _, _, label, origin, dur in scripts:
+            by_origin[(label, origin)] = by_origin.get((label, origin), 0) + dur
+        if by_origin:
+            label, origin = max(by_origin, key=by_origin.get)
+        else:
+            label, origin = self.label(None, task["pid"]), "unattributed"
+        bucket = self._bucket(label, origin)
+        bucket["long_tasks"]   += 1
+        bucket["long_task_ms"] += task["dur"] / 1000
+
+    def add(self, ev: dict):
+        self.events += 1
+        name = ev.get("name")
+        args = ev.get("args") or {}
+        if name in ("TracingStartedInBrowser", "TracingStartedInPage"):
+            for frame in (args.get("data") or {}).get("frames", []):
+                self._note_frame(frame)
+            return
+        if name == "FrameCommittedInBrowser":
+            self._note_frame(args.get("data") or {})
+            return
+        if ev.get("ph") != "X" or "dur" not in ev:
+            return
+
+        thread = (ev.get("pid"), ev.get("tid"))
+        ts, dur = ev["ts"], ev["dur"]
+        if name == "RunTask":
+            # No later script can nest with one that ended by the end of a task
+            if self._scripts.get(thread):
+                self._scripts[thread] = [s for s in self._scripts[thread] if s[1] > ts + dur]
+            if dur < self.long_task_us:
+                return
+            task    = {"ts": ts, "end": ts + dur, "dur": dur, "pid": ev.get("pid")}
+            pending = self._pending.pop(thread, [])
+            inside  = [s for s in pending if s[0] >= ts and s[1] <= task["end"]]
+            if inside:
+                self._credit_task(task, inside)
+            else:
+                task["scripts"] = []
+                self._flush_open(thread)
+                self._open_task[thread] = task
+            return
+
+        if name in SCRIPT_EVENTS:
+            label  = self.label(_frame_of(args), ev.get("pid"))
+            origin = classify_url(_script_url(name, args))
+            script = self._credit_script(thread, ts, ts + dur, label, origin)
+            task   = self._open_task.get(thread)
+            if task and ts >= task["ts"] and ts + dur <= task["end"]:
+                task["scripts"].append(script)
+            else:
+                self._flush_open(thread, before=ts)
+                # Only scripts newer than the last long task can still belong to one
+                self._pending.setdefault(thread, []).append(script)
+                if len(self._pending[thread]) > 256:
+                    del self._pending[thread][:128]
+        elif name in LAYOUT_EVENTS:
+            label  = self.label(_frame_of(args), ev.get("pid"))
+            origin = classify_url(_script_url(name, args))
+            self._bucket(label, origin)["layout_ms"] += dur / 1000
+
+    def _flush_open(self, thread, before: float | None = None):
+        task = self._open_task.get(thread)
+        if task and (before is None or before > task["end"]):
+            self._credit_task(task, task.pop("scripts"))
+            del self._open_task[thread]
+
+    def summary(self) -> dict:
+        for thread in list(self._open_task):
+            self._flush_open(thread)
+        for origins in self.stats.values():
+            for bucket in origins.values():
+                bucket["script_ms"]    = round(bucket["script_ms"], 3)
+                bucket["layout_ms"]    = round(bucket["layout_ms"], 3)
+                bucket["long_task_ms"] = round(bucket["long_task_ms"], 3)
+        return self.stats
+
+def summarize_trace(path: str, long_task_ms: float = LONG_TASK_MS) -> dict:
+    attribution = TraceAttribution(long_task_ms)
+    for ev in iter_trace_events(path):
+        attribution.add(ev)
+    return {"events": attribution.events, "frames": attribution.summary()}
@@ -0,0 +1,47 @@
+// Stand-in for GPT served by the offline fixture server. The stub Prebid
+// hands each unit over through googletag.__render once its auction is done.
+;(function() {
+    const listeners = {};
+    const queued = (window.googletag && window.googletag.cmd) || [];
+
+    function fire(name, event) {
+        (listeners[name] || []).forEach(fn => {
+            try { fn(event); } catch (e) {}
+        });
+    }
+
+    function slot(code) {
+        return { getSlotElementId: () => code, getAdUnitPath: () => `/stub/${code}` };
+    }
+
+    const pubads = {
+        addEventListener(name, fn) { (listeners[name] = listeners[name] || []).push(fn); },
+        removeEventListener(name, fn) { listeners[name] = (listeners[name] || []).filter(h => h !== fn); },
+        refresh() {},
+        enableSingleRequest() {}
+    };
+
+    const cmd = [];
+    cmd.push = fn => {
+        try { fn(); } catch (e) {}
+        return cmd.length;
+    };
+
+    window.googletag = window.googletag || {};
+    Object.assign(window.googletag, {
+        apiReady: true,
+        cmd,
+        pubads: () => pubads,
+        __render(code, bid) {
+            const event = { slot: slot(code), isEmpty: !bid, advertiserId: bid ? 1 : null,
+                            creativeId: bid ? 1 : null, lineItemId: bid ? 1 : null, isBackfill: false };
+            fire('slotResponseReceived', event);
+            fire('slotRenderEnded', event);
+            if (bid) {
+                fire('slotOnLoad', { slot: slot(code) });
+                fire('impressionViewable', { slot: slot(code) });
+            }
+        }
+    });
+    queued.forEach(fn => cmd.push(fn));
+})();
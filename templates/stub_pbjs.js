@@ -0,0 +1,126 @@
+// Stand-in for Prebid.js served by the offline fixture server. Every draw
+// (latency, no-bid, CPM) for an auction is made up front from a seeded PRNG,
+// so a given seed always produces the same event sequence.
+;(function() {
+    const cfg = window.__stubConfig || {};
+    const handlers = {};
+    let state = (cfg.seed >>> 0) || 1;
+    let seq = 0;
+
+    // mulberry32
+    function random() {
+        state = (state + 0x6D2B79F5) >>> 0;
+        let t = state;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    }
+
+    // Log-normal around a median; sigma 0 is a fixed latency
+    function latency(median, sigma) {
+        const u = Math.max(random(), 1e-9), v = random();
+        const z = Math.sqrt(-2 * Math.log(u)) * Math.cos(2 * Math.PI * v);
+        return median * Math.exp(sigma * z);
+    }
+
+    function fire(name, data) {
+        (handlers[name] || []).forEach(fn => {
+            try { fn(data); } catch (e) {}
+        });
+    }
+
+    function renderCreative(code, bid, done) {
+        const slot = document.getElementById(code);
+        if (!slot) return done(false);
+        const frame = document.createElement('iframe');
+        frame.width = 300;
+        frame.height = 250;
+        frame.style.border = '0';
+        frame.onload = () => done(true);
+        frame.src = `${cfg.creative}?slot=${encodeURIComponent(code)}&bidder=${bid.bidder}&cpm=${bid.cpm}`;
+        slot.appendChild(frame);
+    }
+
+    function runAuction() {
+        const auctionId = `${cfg.name || 'page'}-${++seq}`;
+        const units = cfg.slots || [];
+        const [median, sigma] = cfg.latency_ms || [100, 0];
+        const plan = (cfg.bidders || []).map(bidder => ({
+            bidder,
+            latency: latency(median, sigma),
+            bids: units.map(code => random() < cfg.no_bid ? null : {
+                auctionId, bidder, adUnitCode: code, cpm: Math.round(random() * 500) / 100
+            })
+        }));
+
+        fire('auctionInit', { auctionId, adUnitCodes: units, timeout: cfg.timeout_ms });
+        plan.forEach(p => fire('bidRequested', {
+            auctionId, bidderCode: p.bidder, bids: units.map(code => ({ adUnitCode: code }))
+        }));
+
+        const answered = plan.filter(p => p.latency <= cfg.timeout_ms);
+        answered.forEach(p => setTimeout(() => {
+            p.bids.forEach((bid, i) => {
+                if (bid) fire('bidResponse', { ...bid, timeToRespond: p.latency });
+                else fire('noBid', { auctionId, bidder: p.bidder, adUnitCode: units[i] });
+            });
+            fire('bidderDone', { auctionId, bidderCode: p.bidder });
+        }, p.latency));
+
+        const late = plan.filter(p => p.latency > cfg.timeout_ms);
+        const endAt = late.length ? cfg.timeout_ms : Math.max(0, ...answered.map(p => p.latency));
+        setTimeout(() => {
+            if (late.length) {
+                fire('bidTimeout', late.flatMap(p => units.map(code => ({
+                    auctionId, bidder: p.bidder, adUnitCode: code
+                }))));
+            }
+            fire('auctionEnd', { auctionId });
+
+            // Highest CPM per unit among bids that made it in time
+            const winners = {};
+            answered.forEach(p => p.bids.forEach(bid => {
+                if (bid && (!winners[bid.adUnitCode] || bid.cpm > winners[bid.adUnitCode].cpm)) {
+                    winners[bid.adUnitCode] = bid;
+                }
+            }));
+            const targeting = {};
+            units.forEach(code => {
+                const bid = winners[code];
+                targeting[code] = bid ? { hb_bidder: bid.bidder, hb_pb: bid.cpm.toFixed(2) } : {};
+            });
+            fire('setTargeting', targeting);
+
+            units.forEach(code => {
+                const bid = winners[code];
+                const gpt = window.googletag && window.googletag.__render;
+                if (!bid) {
+                    if (gpt) gpt(code, null);
+                    return;
+                }
+                fire('bidWon', bid);
+                setTimeout(() => renderCreative(code, bid, ok => {
+                    if (ok) fire('adRenderSucceeded', { adUnitCode: code, bid });
+                    else fire('adRenderFailed', { adUnitCode: code, reason: 'noSlot' });
+                    if (gpt) gpt(code, bid);
+                }), cfg.render_ms);
+            });
+
+            if (cfg.refresh_ms > 0) setTimeout(runAuction, cfg.refresh_ms);
+        }, endAt);
+    }
+
+    const queued = (window.pbjs && window.pbjs.que) || [];
+    window.pbjs = {
+        version: 'stub',
+        que: { push: fn => fn() },
+        onEvent(name, fn) { (handlers[name] = handlers[name] || []).push(fn); },
+        offEvent(name, fn) { handlers[name] = (handlers[name] || []).filter(h => h !== fn); },
+        getConfig() { return { bidderTimeout: cfg.timeout_ms }; },
+        requestBids() { runAuction(); }
+    };
+    queued.forEach(fn => fn());
+
+    // The tracker polls for pbjs, so the first auction waits for it
+    setTimeout(runAuction, cfg.start_ms);
+})();
@@ -3,6 +3,8 @@ import asyncio
 from pydoll.browser import Chrome
 from pydoll.browser.options import ChromiumOptions
 
+from ad_load.utils.fixture_server import FixtureServer
+
 async def test_basic_functionality():
     print("Testing browser automation...")
     
@@ -11,18 +13,20 @@ async def test_basic_functionality():
     options.add_argument("--disable-dev-shm-usage")
     
     try:
-        async with Chrome(options=options) as browser:
-            tab = await browser.start()
-            print("Browser started successfully")
-            
-            await tab.go_to("https://petapixel.com/2025/06/17/peak-design-pro-lite-tripod-review-the-travel-tripod-we-needed/")
-            print("Navigation successful")
-            
-            title = await tab.execute_script("return document.title")
-            print(f"Page title: {title}")
-            
-            print("🎉 All tests passed!")
-            
+        with FixtureServer() as server:
+            async with Chrome(options=options) as browser:
+                tab = await browser.start()
+                print("Browser started successfully")
+                
+                # The offline fixture page; nothing here needs the network
+                await tab.go_to(server.url)
+                print("Navigation successful")
+                
+                title = await tab.execute_script("return document.title")
+                print(f"Page title: {title}")
+                
+                print("🎉 All tests passed!")
+                
     except Exception as e:
         print(f"Test failed: {e}")
         import traceback
@@ -0,0 +1,45 @@
+import pytest
+
+from ad_load.modes.bench import plan_runs, make_run_id
+from ad_load.main import resolve_target, resolve_targets
+
+def test_plan_runs_interleaves_targets():
+    targets = [("boxing", "https://a.example/"), ("pixel", "https://b.example/")]
+
+    planned = plan_runs(targets, 2)
+
+    assert [run_id for run_id, _, _ in planned] == [
+        "boxing-001", "pixel-001", "boxing-002", "pixel-002",
+    ]
+    assert planned[1] == ("pixel-001", "pixel", "https://b.example/")
+
+def test_run_ids_are_unique():
+    planned = plan_runs([("x", "u"), ("y", "v")], 5)
+    assert len({run_id for run_id, _, _ in planned}) == 10
+    assert make_run_id("x", 7) == "x-007"
+
+def test_run_ids_differ_between_sweeps():
+    first  = plan_runs([("x", "u")], 2, "20260101-000000")
+    second = plan_runs([("x", "u")], 2, "20260101-000500")
+
+    assert first[0][0] == "20260101-000000-x-001"
+    assert not {r for r, _, _ in first} & {r for r, _, _ in second}
+
+def test_resolve_target_prefers_site_keys():
+    sites = {"boxing": {"url": "https://www.boxingnews24.com/a"}}
+
+    assert resolve_target(sites, "boxing") == ("boxing", "https://www.boxingnews24.com/a")
+    assert resolve_target(sites, "https://www.example.com/post") == ("example.com", "https://www.example.com/post")
+
+def test_resolve_targets_keeps_names_unique():
+    sites   = {"boxing": {"url": "https://www.boxingnews24.com/a"}}
+    targets = resolve_targets(sites, ["boxing", "https://x.com/a", "https://x.com/b", "https://y.com/"])
+
+    names = [name for name, _ in targets]
+    assert names[0] == "boxing" and names[3] == "y.com"
+    assert names[1] != names[2] and all(n.startswith("x.com-") for n in names[1:3])
+
+    with pytest.raises(SystemExit, match="x.com/a"):
+        resolve_targets(sites, ["https://x.com/a", "https://x.com/a"])
+    with pytest.raises(SystemExit):
+        resolve_targets(sites, ["boxing", "https://www.boxingnews24.com/a"])
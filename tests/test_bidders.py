@@ -0,0 +1,43 @@
+from ad_load.utils.bidders import bidder_records, bidder_stats, format_bidders
+
+def _bidder(requested, done, responses=(), no_bids=0, timeouts=0, units=1):
+    return {"requested": requested, "done": done, "adUnits": units, "noBids": no_bids,
+            "timeouts": timeouts, "responses": [{"t": t, "cpm": 1.0} for t in responses]}
+
+def _prebid():
+    return {"dsq-app1": {"auctions": [
+        {"auctionId": "a1", "duration": 900.0, "bidders": {
+            "fast": _bidder(5.0, 120.0, responses=[110.0]),
+            "slow": _bidder(5.0, 800.0, responses=[790.0]),
+        }},
+        {"auctionId": "a2", "duration": 1000.0, "bidders": {
+            "fast": _bidder(4.0, 100.0, no_bids=1),
+            "slow": _bidder(4.0, None, timeouts=1),
+        }},
+    ]}}
+
+def test_bidder_records_flatten_auctions():
+    records = bidder_records("r1", _prebid())
+    assert len(records) == 4
+    assert records[1]["first_response"] == 790.0
+    assert records[3]["done"] is None and records[3]["timeouts"] == 1
+
+def test_bidder_stats_rates_and_critical_path():
+    stats = bidder_stats(bidder_records("r1", _prebid()))
+
+    assert stats["slow"]["timeout_rate"] == 0.5
+    assert stats["fast"]["no_bid_rate"] == 0.5
+    assert stats["slow"]["latency_p50"] == 795.0
+    # slow finished last in both auctions: 800-120 and 1000-100 (timed out at auction end)
+    assert stats["slow"]["critical_share"] == 1.0
+    assert stats["slow"]["waited_ms"] == 680.0 + 900.0
+    assert sum(stats["fast"]["histogram"]) == 2
+
+def test_timed_out_bidders_are_reported_outside_latency():
+    stats = bidder_stats(bidder_records("r1", _prebid()))
+
+    # slow's timed-out request has no latency, so p50 covers one sample
+    assert stats["slow"]["latency_n"] == 1
+    assert stats["slow"]["timed_out_no_reply"] == 1
+    assert stats["fast"]["timed_out_no_reply"] == 0
+    assert "leave out 1 request(s) that timed out" in format_bidders(stats)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from ad_load.utils.blocking import RequestBlocker, TransferStats, resolve_rules, site_rules
+
+def test_site_rules_extend_a_preset():
+    rules = resolve_rules({"preset": "no-media", "urls": ["*hotjar.com*"], "types": ["Font"]})
+    assert rules["preset"] == "no-media"
+    assert rules["urls"][-1] == "*hotjar.com*"
+    assert rules["types"].count("Font") == 1
+    assert resolve_rules({"urls": ["*x*"]}) == {"preset": None, "urls": ["*x*"], "types": [], "allow": []}
+    with pytest.raises(ValueError):
+        resolve_rules("everything")
+
+def test_override_wins_over_the_site():
+    assert site_rules("boxing", "none") is None
+    assert site_rules("boxing", "ads-only")["preset"] == "ads-only"
+    assert site_rules(None) is None
+
+class _Interceptor:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, command, session=None):
+        self.sent.append((command["method"], session))
+
+def _paused(url, kind, **extra):
+    return {"requestId": "R1", "resourceType": kind, "request": {"url": url}, **extra}
+
+def test_blocker_keeps_the_ad_path():
+    blocker     = RequestBlocker(resolve_rules("ads-only"))
+    interceptor = _Interceptor()
+    handle      = lambda p: asyncio.run(blocker.handle(interceptor, p, "S1"))
+
+    assert handle(_paused("https://cdn.example/hero.jpg", "Image"))
+    assert not handle(_paused("https://tpc.googlesyndication.com/creative.png", "Image"))
+    assert not handle(_paused("https://c.disquscdn.com/next/avatar.png", "Image"))
+    assert not handle(_paused("https://cdn.example/app.js", "Script"))
+    assert not handle(_paused("https://cdn.example/hero.jpg", "Image", responseStatusCode=200))
+    assert interceptor.sent == [("Fetch.failRequest", "S1")]
+    assert blocker.blocked == {"Image": 1}
+
+def test_transfer_stats_per_type_and_session():
+    stats = TransferStats()
+    for session, rid, url, kind in (
+        (None, "1", "https://example.com/", "Document"),
+        ("S1", "1", "https://securepubads.g.doubleclick.net/gampad/ads", "XHR"),
+        (None, "2", "https://cdn.example/hero.jpg", "Image"),
+    ):
+        stats._on_request({"sessionId": session,
+                           "params": {"requestId": rid, "type": kind, "request": {"url": url}}})
+    stats._on_finished({"params": {"requestId": "1", "encodedDataLength": 1000}})
+    stats._on_finished({"sessionId": "S1", "params": {"requestId": "1", "encodedDataLength": 300}})
+    stats._on_failed({"params": {"requestId": "2", "errorText": "net::ERR_BLOCKED_BY_CLIENT"}})
+
+    summary = stats.summary()
+    assert summary["transferred_bytes"] == 1300
+    assert summary["ad_bytes"] == 300
+    assert summary["by_type"]["XHR"] == {"requests": 1, "bytes": 300}
+    assert summary["blocked"] == {"Image": 1}
+
+def test_blocker_keeps_assets_of_ad_frames_whatever_their_host():
+    blocker     = RequestBlocker(resolve_rules("ads-only"))
+    interceptor = _Interceptor()
+    handle      = lambda p: asyncio.run(blocker.handle(interceptor, p, "S1"))
+
+    # An OOPIF creative, a friendly GPT iframe and a frame nested in it
+    blocker._on_attached({"params": {"targetInfo": {
+        "type": "iframe", "targetId": "OOPIF", "url": "https://tpc.googlesyndication.com/safeframe/1"}}})
+    blocker._on_frame_navigated({"params": {"frame": {
+        "id": "GPT", "parentId": "DSQ", "name": "google_ads_iframe_/1/x_0", "url": "about:blank"}}})
+    blocker._on_frame_attached({"params": {"frameId": "NESTED", "parentFrameId": "GPT"}})
+    blocker._on_frame_navigated({"params": {"frame": {
+        "id": "DSQ", "name": "dsq-app1", "url": "https://disqus.com/embed/comments/"}}})
+
+    for frame in ("OOPIF", "GPT", "NESTED"):
+        assert not handle(_paused("https://s0.2mdn.net/creative/banner.jpg", "Image", frameId=frame))
+    assert handle(_paused("https://s0.2mdn.net/creative/banner.jpg", "Image", frameId="DSQ"))
+    assert blocker.ad_frames == {"OOPIF", "GPT", "NESTED"}
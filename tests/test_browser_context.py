@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from ad_load.utils.browser_context import RunContext
+
+class _FakeBrowser:
+    def __init__(self):
+        self.created, self.deleted, self.tabs = [], [], []
+
+    async def create_browser_context(self):
+        self.created.append(f"ctx{len(self.created) + 1}")
+        return self.created[-1]
+
+    async def delete_browser_context(self, context_id):
+        self.deleted.append(context_id)
+
+    async def new_tab(self, url="", browser_context_id=None):
+        self.tabs.append(browser_context_id)
+        return object()
+
+def test_cold_context_is_disposed_even_on_error():
+    browser = _FakeBrowser()
+
+    async def run():
+        async with RunContext(browser, "cold") as context:
+            await context.new_tab()
+            raise RuntimeError("run failed")
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert browser.tabs == ["ctx1"] and browser.deleted == ["ctx1"]
+
+def test_warm_uses_default_context():
+    browser = _FakeBrowser()
+
+    async def run():
+        async with RunContext(browser, "warm") as context:
+            await context.new_tab()
+    asyncio.run(run())
+    assert browser.tabs == [None] and browser.created == [] and browser.deleted == []
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        RunContext(_FakeBrowser(), "hot")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+from pydoll.connection.managers.commands_manager import CommandsManager
+
+from ad_load.pydoll_extensions import CDPClient, CDPError, SessionDetached
+
+class _FakeWs:
+    def __init__(self, manager, reply=True):
+        self.manager = manager
+        self.reply = reply
+        self.sent = []
+
+    async def send(self, message):
+        command = json.loads(message)
+        self.sent.append(command)
+        if self.reply:
+            response = {"id": command["id"], "result": {"method": command["method"]}}
+            if command["method"] == "Bad.method":
+                response = {"id": command["id"], "error": {"code": -32601, "message": "not found"}}
+            asyncio.get_running_loop().call_soon(
+                self.manager.resolve_command, command["id"], json.dumps(response))
+
+class _FakeHandler:
+    def __init__(self, reply=True):
+        self._command_manager = CommandsManager()
+        self._ws_connection = _FakeWs(self._command_manager, reply)
+
+    async def _ensure_active_connection(self):
+        pass
+
+class _FakeTab:
+    def __init__(self, reply=True):
+        self._connection_handler = _FakeHandler(reply)
+        self.handlers = {}
+
+    async def on(self, event, callback, temporary=False):
+        self.handlers.setdefault(event, []).append(callback)
+
+def test_pipelined_sends_share_pydoll_ids():
+    tab = _FakeTab()
+    cdp = CDPClient(tab)
+
+    async def run():
+        # An id pydoll itself already handed out must not be reused
+        tab._connection_handler._command_manager.create_command_future({"method": "Page.enable"})
+        return await cdp.send_many([{"method": "A"}, {"method": "B"}], session="S1")
+    responses = asyncio.run(run())
+
+    sent = tab._connection_handler._ws_connection.sent
+    assert [c["id"] for c in sent] == [2, 3]
+    assert all(c["sessionId"] == "S1" for c in sent)
+    assert [r["result"]["method"] for r in responses] == ["A", "B"]
+
+def test_call_raises_on_error_response():
+    cdp = CDPClient(_FakeTab())
+    with pytest.raises(CDPError) as err:
+        asyncio.run(cdp.call("Bad.method", session="S1"))
+    assert err.value.code == -32601
+
+def test_timeout_drops_pending_futures():
+    tab = _FakeTab(reply=False)
+    cdp = CDPClient(tab, timeout=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(cdp.send({"method": "A"}))
+    assert tab._connection_handler._command_manager._pending_commands == {}
+
+def test_detach_fails_only_that_sessions_commands():
+    tab = _FakeTab(reply=False)
+    cdp = CDPClient(tab)
+
+    async def run():
+        await cdp.track_sessions()
+        pending = asyncio.ensure_future(cdp.send({"method": "A"}, session="S1"))
+        other = asyncio.ensure_future(cdp.send({"method": "A"}, session="S2", timeout=0.05))
+        await asyncio.sleep(0)
+        tab.handlers["Target.detachedFromTarget"][0]({"params": {"sessionId": "S1"}})
+        with pytest.raises(SessionDetached):
+            await pending
+        with pytest.raises(asyncio.TimeoutError):
+            await other
+    asyncio.run(run())
+
+def test_events_are_routed_by_session():
+    tab = _FakeTab()
+    cdp = CDPClient(tab)
+    seen = {"top": [], "S1": [], "all": []}
+
+    async def run():
+        await cdp.on("Runtime.consoleAPICalled", seen["top"].append, session=None)
+        await cdp.on("Runtime.consoleAPICalled", seen["S1"].append, session="S1")
+        await cdp.on("Runtime.consoleAPICalled", seen["all"].append)
+    asyncio.run(run())
+
+    assert len(tab.handlers["Runtime.consoleAPICalled"]) == 1
+    dispatch = tab.handlers["Runtime.consoleAPICalled"][0]
+    dispatch({"params": {}})
+    dispatch({"params": {}, "sessionId": "S1"})
+    dispatch({"params": {}, "sessionId": "S2"})
+    assert (len(seen["top"]), len(seen["S1"]), len(seen["all"])) == (1, 1, 3)
+
+def test_latency_is_recorded_once_per_command():
+    from ad_load.utils.metrics import CDP_LATENCY
+    def count(method):
+        return CDP_LATENCY._values.get((("method", method),), (None, 0, 0))[1]
+
+    before = count("Latency.a"), count("Latency.b")
+    asyncio.run(CDPClient(_FakeTab()).send_many([{"method": "Latency.a"}, {"method": "Latency.b"},
+                                                 {"method": "Latency.b"}]))
+    assert (count("Latency.a"), count("Latency.b")) == (before[0] + 1, before[1] + 2)
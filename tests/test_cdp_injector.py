@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+from pydoll.connection.managers.commands_manager import CommandsManager
+
+from ad_load.pydoll_extensions import TabWrapper
+from ad_load.utils.cdp_injector import bundle_scripts, inject_scripts
+
+class _FakeWs:
+    def __init__(self, manager):
+        self.manager = manager
+        self.sent = []
+
+    async def send(self, message):
+        command = json.loads(message)
+        self.sent.append(command)
+        asyncio.get_running_loop().call_soon(
+            self.manager.resolve_command, command["id"], json.dumps({"id": command["id"], "result": {}}))
+
+class _FakeHandler:
+    def __init__(self):
+        self._command_manager = CommandsManager()
+        self._ws_connection = _FakeWs(self._command_manager)
+
+    async def _ensure_active_connection(self):
+        pass
+
+class _FakeTab:
+    def __init__(self):
+        self.commands = []
+        self.handlers = {}
+        self._connection_handler = _FakeHandler()
+
+    async def _execute_command(self, command):
+        self.commands.append(command)
+        return {"result": {}}
+
+    async def on(self, event, callback, temporary=False):
+        self.handlers.setdefault(event, []).append(callback)
+
+def test_bundle_is_guarded_per_digest():
+    bundle = bundle_scripts("a()", "b()")
+    assert bundle.count("try {") == 2
+    assert bundle == bundle_scripts("a()", "b()")
+    assert bundle != bundle_scripts("a()")
+
+def test_one_attach_handler_releases_iframe_once():
+    fake = _FakeTab()
+    tab  = TabWrapper(fake)
+    tab.add_session_command("Network.enable")
+
+    async def run():
+        await inject_scripts(tab, "a()", "b()", "c()")
+        fake.handlers["Target.attachedToTarget"][0]({"params": {
+            "sessionId": "S1", "targetInfo": {"type": "iframe", "targetId": "F1"},
+        }})
+        await asyncio.sleep(0.01)
+    asyncio.run(run())
+
+    assert len(fake.handlers["Target.attachedToTarget"]) == 1
+    assert len(fake.handlers["Page.loadEventFired"]) == 1
+    sent = fake._connection_handler._ws_connection.sent
+    methods = [m["method"] for m in sent]
+    assert all(m["sessionId"] == "S1" for m in sent)
+    assert methods == ["Runtime.enable", "Page.addScriptToEvaluateOnNewDocument",
+                       "Network.enable", "Runtime.runIfWaitingForDebugger"]
+    stats = tab.injection_stats()
+    assert stats["per_frame"] == {"F1": 4}
+    assert stats["page_commands"] == 3
+    assert stats["attach_errors"] == {}
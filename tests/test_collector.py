@@ -0,0 +1,75 @@
+import asyncio
+
+from ad_load.utils.collector import ContextRegistry, collect_summaries, split_summaries
+
+def _created(ctx_id, frame_id, session=None, is_default=True):
+    ev = {"params": {"context": {"id": ctx_id,
+                                 "auxData": {"frameId": frame_id, "isDefault": is_default}}}}
+    if session:
+        ev["sessionId"] = session
+    return ev
+
+def test_registry_tracks_context_lifecycle():
+    reg = ContextRegistry()
+    reg._on_created(_created(1, "TOP"))
+    reg._on_created(_created(2, "TOP", is_default=False))
+    reg._on_created(_created(1, "AD", session="S1"))
+    reg._on_created(_created(2, "AD2", session="S1"))
+    assert reg.snapshot() == {(None, 1): "TOP", ("S1", 1): "AD", ("S1", 2): "AD2"}
+
+    reg._on_destroyed({"params": {"executionContextId": 1}, "sessionId": "S1"})
+    assert reg.frame_for("S1", 1) is None
+
+    reg._on_cleared({"params": {}})
+    assert reg.snapshot() == {("S1", 2): "AD2"}
+
+    reg._on_detached({"params": {"sessionId": "S1"}})
+    assert reg.snapshot() == {}
+
+class _FakeTab:
+    def __init__(self, values):
+        self.values = values
+        self.commands = []
+
+        self.cdp = self
+
+    async def send(self, command, session=None, timeout=None):
+        self.commands.append(dict(command, sessionId=session))
+        value = self.values[(session, command["params"]["contextId"])]
+        if isinstance(value, Exception):
+            raise value
+        return {"result": {"result": {"value": value}}}
+
+def test_collect_issues_one_evaluate_per_live_context():
+    reg = ContextRegistry()
+    reg._on_created(_created(1, "TOP"))
+    reg._on_created(_created(4, "DSQ", session="S1"))
+    reg._on_created(_created(5, "GONE"))
+    tab = _FakeTab({
+        (None, 1): None,
+        ("S1", 4): {"prebid": {"frameName": "dsq-app1"}, "google_ads": None, "performance": {"ttfb": 5}},
+        (None, 5): RuntimeError("Cannot find context"),
+    })
+
+    collected = asyncio.run(collect_summaries(tab, reg))
+
+    assert len(tab.commands) == 3
+    assert tab.commands[1]["sessionId"] == "S1"
+    assert set(collected) == {"DSQ", "GONE"}
+    assert "Error" in collected["GONE"]
+
+    prebid, google_ads, performance = split_summaries(collected)
+    assert prebid == {"dsq-app1": {"frameName": "dsq-app1"}}
+    assert google_ads == {}
+    assert performance == {"DSQ": {"ttfb": 5}}
+
+def test_split_keeps_every_frame_with_ads_on_full_pages():
+    collected = {
+        "TOP": {"prebid": {"frameName": "", "auctions": [{"id": 1}]},
+                "google_ads": {"frameName": "", "slotRenders": []}},
+        "AD":  {"prebid": {"frameName": "", "auctions": [{"id": 2}]}},
+        "DSQ": {"google_ads": {"frameName": "dsq-app1", "slotRenders": [{"slot": "x"}]}},
+    }
+    prebid, google_ads, _ = split_summaries(collected, prefix=None)
+    assert list(prebid) == ["", "#AD"]
+    assert google_ads == {"dsq-app1": collected["DSQ"]["google_ads"]}
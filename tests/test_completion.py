@@ -0,0 +1,69 @@
+from ad_load.utils.completion import CompletionDetector, frames_complete, is_ad_request
+
+def _state(name, *auctions):
+    # One (ended, outcomes) pair per auction
+    return {"frameName": name, "units": {},
+            "auctions": {f"a{i}": {"ended": e, "outcomes": o} for i, (e, o) in enumerate(auctions)}}
+
+def test_frames_complete_requires_ended_and_rendered_auctions():
+    states = {
+        "A": _state("dsq-app1", (True, 1)),
+        "B": _state("dsq-app2", (True, 1), (False, 0)),
+    }
+    assert not frames_complete(states)
+
+    states["B"] = _state("dsq-app2", (True, 1), (True, 1))
+    assert frames_complete(states)
+
+def test_frames_complete_waits_for_each_auction_to_render():
+    # The first cycle rendered two units, the refresh has ended but not rendered
+    states = {"A": _state("dsq-app1", (True, 2), (True, 0))}
+    assert not frames_complete(states)
+
+def _event(kind, **data):
+    return {"session": "S1", "frameName": "dsq-app1", "type": kind, "data": data}
+
+def test_detector_credits_outcomes_to_their_auction():
+    detector = CompletionDetector(tab=None)
+    for event in (
+        _event("auctionInit", auctionId="a1"),
+        _event("auctionEnd", auctionId="a1"),
+        _event("bidWon", auctionId="a1", adUnitCode="u1"),
+        _event("adRenderSucceeded", auctionId="a1", adUnitCode="u1"),
+        _event("auctionInit", auctionId="a2"),
+        _event("auctionEnd", auctionId="a2"),
+        # A late GPT render of the first cycle's unit must not close a2
+        _event("slotRenderEnded", slot="u1", isEmpty=False),
+    ):
+        detector.on_event(event)
+    assert not frames_complete(detector.states)
+
+    # A GPT-only outcome for a unit nobody won goes to the auction waiting on one
+    detector.on_event(_event("slotRenderEnded", slot="u2", isEmpty=True))
+    assert frames_complete(detector.states)
+
+def test_frames_complete_ignores_untracked_frames():
+    states = {
+        "top": _state("unnamed-frame", (False, 0)),
+        "idle": _state("dsq-app3"),
+        "ad": None,
+        "A": _state("dsq-app1", (True, 1)),
+    }
+    assert frames_complete(states)
+
+def test_frames_complete_needs_at_least_one_auction():
+    assert not frames_complete({})
+    assert not frames_complete({"A": _state("dsq-app1")})
+    assert not frames_complete({"A": _state("dsq-app1", (True, 0))})
+
+def test_is_ad_request():
+    assert is_ad_request("https://securepubads.g.doubleclick.net/gampad/ads?x=1")
+    assert is_ad_request("https://c.amazon-adsystem.com/aax2/apstag.js")
+    assert not is_ad_request("https://c.disquscdn.com/next/embed/styles/lounge.css")
+
+def test_frames_complete_full_page_tracks_every_frame():
+    assert frames_complete({}, prefix=None)
+    states = {"top": _state("", (False, 0)), "A": _state("dsq-app1", (True, 1))}
+    assert not frames_complete(states, prefix=None)
+    states["top"] = _state("", (True, 1))
+    assert frames_complete(states, prefix=None)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from ad_load.utils import disqus_extractor
+from ad_load.utils.disqus_extractor import DisqusConfigCache, parse_disqus_html, resolve_disqus_info
+
+PAGE = """<html><head>
+<script src="https://cdn.example/app.js"></script>
+</head><body><div id="disqus_thread"></div>
+<script>
+var disqus_config = function () {
+    this.page.url = "https://blog.example/post/";
+    this.page.identifier = 'post-42';
+};
+(function() { var d = document, s = d.createElement('script');
+s.src = 'https://blog-example.disqus.com/embed.js'; (d.head || d.body).appendChild(s); })();
+</script></body></html>"""
+
+def test_parse_reads_forum_and_identifier():
+    assert parse_disqus_html(PAGE) == ("blog-example", "post-42")
+
+def test_parse_prefers_embed_src_and_leaves_gaps():
+    html = ('<script src="//other.disqus.com/embed.js"></script>'
+            '<script>var disqus_shortname = "legacy";</script>')
+    assert parse_disqus_html(html) == ("other", None)
+    assert parse_disqus_html("<p>no comments</p>") == (None, None)
+
+def test_cache_expires_and_invalidates(tmp_path):
+    cache = DisqusConfigCache(str(tmp_path / "cfg.json"), ttl=60)
+    cache.put("https://a.example/x", "forum", "x", source="static")
+    assert DisqusConfigCache(cache.path, ttl=60).get("https://a.example/x") == ("forum", "x")
+
+    entries = cache._load()
+    entries["https://a.example/x"]["fetched"] = time.time() - 120
+    cache._save(entries)
+    assert cache.get("https://a.example/x") is None
+
+    cache.put("https://a.example/x", "forum", "x", source="static")
+    cache.invalidate("https://a.example/x")
+    assert cache.get("https://a.example/x") is None
+
+def test_resolve_uses_cache_then_static(tmp_path, monkeypatch):
+    cache = DisqusConfigCache(str(tmp_path / "cfg.json"))
+    calls = []
+    def fake_static(url, timeout=5):
+        calls.append(url)
+        return "forum", "id"
+    monkeypatch.setattr(disqus_extractor, "fetch_disqus_info_static", fake_static)
+
+    for _ in range(2):
+        info = asyncio.run(resolve_disqus_info(None, "https://a.example/x", cache=cache))
+        assert info == ("forum", "id")
+    assert calls == ["https://a.example/x"]
+    assert cache._load()["https://a.example/x"]["source"] == "static"
+
+def test_browser_guesses_are_cached_briefly(tmp_path, monkeypatch):
+    class _Tab:
+        async def close(self):
+            pass
+    class _Browser:
+        async def new_tab(self):
+            return _Tab()
+    async def slow_page(tab, url):
+        return None, None
+    monkeypatch.setattr(disqus_extractor, "read_disqus_info", slow_page)
+    cache = DisqusConfigCache(str(tmp_path / "cfg.json"), guess_ttl=60)
+
+    info = asyncio.run(resolve_disqus_info(_Browser(), "https://www.blog.example/post-7/",
+                                           cache=cache, static=False))
+
+    assert info == ("blog", "post-7")
+    assert cache._load()["https://www.blog.example/post-7/"]["source"] == "guess"
+    assert cache.get("https://www.blog.example/post-7/") == info
+    entries = cache._load()
+    entries["https://www.blog.example/post-7/"]["fetched"] = time.time() - 120
+    cache._save(entries)
+    assert cache.get("https://www.blog.example/post-7/") is None
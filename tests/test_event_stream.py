@@ -0,0 +1,61 @@
+import json
+
+from ad_load.utils.event_stream import EventSink, BINDING_NAME
+from ad_load.utils.completion import CompletionDetector
+from ad_load.utils.collector import ContextRegistry
+
+def _binding(payload, ctx_id, session=None):
+    ev = {"method": "Runtime.bindingCalled",
+          "params": {"name": BINDING_NAME, "payload": json.dumps(payload),
+                     "executionContextId": ctx_id}}
+    if session:
+        ev["sessionId"] = session
+    return ev
+
+def test_sink_writes_attributed_ndjson(tmp_path):
+    path = tmp_path / "events.ndjson"
+    registry = ContextRegistry()
+    registry._on_created({"params": {"context": {"id": 3, "auxData": {"frameId": "F1"}}},
+                          "sessionId": "S1"})
+    sink = EventSink(str(path), run_id="boxing-001", registry=registry)
+
+    sink._on_binding(_binding({"type": "auctionInit", "frameName": "dsq-app1"}, 3, "S1"))
+    sink._on_binding(_binding({"type": "auctionEnd", "frameName": "dsq-app1"}, 9))
+
+    # Written before close, so a killed run still leaves its events behind
+    lines = [json.loads(l) for l in path.read_text().splitlines()]
+    sink.close()
+
+    assert [e["type"] for e in lines] == ["auctionInit", "auctionEnd"]
+    assert lines[0]["frameId"] == "F1" and lines[0]["session"] == "S1"
+    assert lines[1]["frameId"] is None
+    assert {e["run_id"] for e in lines} == {"boxing-001"}
+    assert sink.count == 2
+
+def test_sink_ignores_foreign_bindings(tmp_path):
+    sink = EventSink(str(tmp_path / "events.ndjson"))
+    sink._on_binding({"params": {"name": "other", "payload": "{}", "executionContextId": 1}})
+    sink._on_binding({"params": {"name": BINDING_NAME, "payload": "{oops", "executionContextId": 1}})
+    sink.close()
+    assert sink.count == 0
+
+def test_detector_tracks_progress_from_events(tmp_path):
+    sink = EventSink(str(tmp_path / "events.ndjson"))
+    detector = CompletionDetector(tab=None)
+    sink.subscribe(detector.on_event)
+
+    for kind in ("auctionInit", "auctionEnd", "slotRenderEnded"):
+        sink._on_binding(_binding({"type": kind, "frameName": "dsq-app1"}, 1))
+    sink.close()
+
+    (state,) = detector.states.values()
+    assert state["frameName"] == "dsq-app1"
+    assert state["auctions"] == {None: {"ended": True, "outcomes": 1}}
+
+def test_sink_unpacks_quiet_mode_batches(tmp_path):
+    sink = EventSink(str(tmp_path / "events.ndjson"))
+    sink._on_binding(_binding([{"type": "auctionInit"}, {"type": "bidWon"}], 1))
+    sink.close()
+
+    lines = [json.loads(l) for l in (tmp_path / "events.ndjson").read_text().splitlines()]
+    assert [(e["seq"], e["type"]) for e in lines] == [(0, "auctionInit"), (1, "bidWon")]
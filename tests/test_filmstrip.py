@@ -0,0 +1,70 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from ad_load.utils.filmstrip import (FilmstripRecorder, _iframes, _rendered, frame_histogram,
+                                     speed_index, summarize_filmstrip, visual_progress)
+
+def _jpeg(path, block=None):
+    pixels = np.full((100, 200, 3), 255, dtype=np.uint8)
+    if block:
+        x, y, w, h = block
+        pixels[y:y + h, x:x + w] = (200, 0, 0)
+    Image.fromarray(pixels).save(path, format="JPEG", quality=95)
+    with open(path, "rb") as f:
+        return np.asarray(Image.open(io.BytesIO(f.read())).convert("RGB"))
+
+def test_speed_index_is_area_above_progress():
+    times    = np.array([100.0, 200.0, 300.0])
+    progress = np.array([0.0, 0.5, 1.0])
+    assert speed_index(times, progress) == 100 + 100 + 50
+
+def test_progress_runs_from_first_to_last_frame():
+    blank = np.full((10, 10, 3), 255, dtype=np.uint8)
+    full  = blank.copy()
+    full[:, :5] = 0
+    half  = blank.copy()
+    half[:, :5][::2] = 0
+    hists = np.stack([frame_histogram(p) for p in (blank, half, full)])
+    assert list(visual_progress(hists)) == [0.0, 0.5, 1.0]
+
+def test_iframes_are_labelled_by_nearest_id():
+    doc = {"nodeName": "#document", "children": [
+        {"nodeName": "DIV", "attributes": ["id", "div-gpt-ad-1"], "children": [
+            {"nodeName": "DIV", "children": [{"nodeName": "IFRAME", "nodeId": 7}]}]},
+        {"nodeName": "IFRAME", "nodeId": 9, "attributes": ["name", "safeframe"]},
+    ]}
+    assert [(n["nodeId"], label) for n, label in _iframes(doc)] == [(7, "div-gpt-ad-1"), (9, "safeframe")]
+
+def test_slot_visibility_is_matched_to_render_event(tmp_path):
+    # The ad's box fills at 300ms; its render event arrived at 150ms
+    frames, hists = [], []
+    for i, block in enumerate([None, None, (50, 20, 40, 30), (50, 20, 40, 30)]):
+        path = str(tmp_path / f"f{i}.jpg")
+        hists.append(frame_histogram(_jpeg(path, block)))
+        frames.append({"t": 10.0 + (i + 1) * 0.1, "path": path, "deviceWidth": 400,
+                       "offsetTop": 0, "scale": 1})
+    slots   = [{"frame": "dsq-app1", "slot": "div-gpt-ad-1", "x": 100, "y": 40, "width": 80, "height": 60},
+               {"frame": "dsq-app1", "slot": "below", "x": 100, "y": 900, "width": 80, "height": 60}]
+    renders = [{"type": "slotOnLoad", "ts": 10.15, "frameName": "dsq-app1", "slot": "div-gpt-ad-1"}]
+
+    film = summarize_filmstrip(frames, hists, slots, renders, nav_start=10.0)
+
+    assert film["frames"] == 4
+    assert round(film["speed_index"]) == 300
+    ad, below = film["slots"]
+    assert ad["in_viewport"] and round(ad["visible_ms"]) == 300
+    assert round(ad["rendered_ms"]) == 150 and round(ad["gap_ms"]) == 150
+    assert below["in_viewport"] is False and "gap_ms" not in below
+
+def test_render_events_use_the_page_clock_and_exact_slots():
+    film = FilmstripRecorder(None, "unused")
+    film.on_event({"type": "slotOnLoad", "ts": 12.4, "epoch": 12150.0, "frameName": "dsq-app1",
+                   "data": {"slot": "ad-10"}})
+    film.on_event({"type": "slotOnLoad", "ts": 12.5, "frameName": "dsq-app1", "data": {"slot": "ad-1"}})
+
+    assert film.renders[0]["ts"] == 12.15
+    slot = {"frame": "dsq-app1", "slot": "ad-1"}
+    assert _rendered(slot, film.renders)["ts"] == 12.5
+    assert _rendered({"frame": "dsq-app1", "slot": "ad"}, film.renders) is None
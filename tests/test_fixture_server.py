@@ -0,0 +1,50 @@
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ad_load.utils.fixture_server import FixtureServer, fixture_document, frame_seed, make_scenario
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return resp.headers["Content-Type"], resp.read().decode()
+
+def test_make_scenario_rejects_unknown_settings():
+    assert make_scenario(frames=3)["frames"] == 3
+    with pytest.raises(ValueError):
+        make_scenario(frame=3)
+
+def test_frames_alternate_hosts_down_the_tree():
+    scenario = make_scenario(frames=2, depth=2, top_slots=1)
+    page = fixture_document(scenario, "", 8000)
+    assert re.findall(r'name="(dsq-app[\w-]+)" src="([^"]+)"', page) == [
+        ("dsq-app1", "http://localhost:8000/frame/1"),
+        ("dsq-app2", "http://localhost:8000/frame/2"),
+    ]
+    assert 'id="page-slot1"' in page and "/stub/pbjs.js" in page
+
+    outer = fixture_document(scenario, "1", 8000)
+    assert 'src="http://127.0.0.1:8000/frame/1.1"' in outer
+    assert '"creative": "http://127.0.0.1:8000/creative"' in outer
+    inner = fixture_document(scenario, "1.1", 8000)
+    assert "<iframe" not in inner and 'id="dsq-app1-1-slot2"' in inner
+
+def test_pages_without_slots_load_no_stubs():
+    assert "/stub/" not in fixture_document(make_scenario(), "", 8000)
+
+def test_seeds_differ_per_document_but_not_per_run():
+    assert frame_seed(1, "1") == frame_seed(1, "1")
+    assert len({frame_seed(1, "1"), frame_seed(1, "2"), frame_seed(2, "1")}) == 3
+
+def test_server_routes():
+    with FixtureServer(make_scenario(frames=1)) as server:
+        kind, page = _get(server.url)
+        assert kind.startswith("text/html") and 'name="dsq-app1"' in page
+        kind, stub = _get(server.url + "stub/pbjs.js")
+        assert kind.startswith("application/javascript") and "window.pbjs" in stub
+        assert "googletag" in _get(server.url + "stub/gpt.js")[1]
+        assert "div-1" in _get(server.url + "creative?slot=div-1&cpm=1.5")[1]
+        with pytest.raises(urllib.error.HTTPError):
+            _get(server.url + "missing")
+        assert server.requests == 5
@@ -0,0 +1,17 @@
+from ad_load.modes.harness import collect_slope, harness_samples
+
+def test_harness_samples_split_per_frame_and_per_run():
+    summary = {"run": {"waited": 1.5, "collect_ms": 12.0,
+                       "injection": {"per_frame": {"A": 5, "B": 5},
+                                     "attach_ms": {"A": 3.0, "B": 4.0}}}}
+    samples = harness_samples(summary, 2000.0)
+    assert sorted(v for m, v in samples if m == "attach_ms") == [3.0, 4.0]
+    assert [v for m, v in samples if m == "commands_per_frame"] == [5, 5]
+    assert ("overhead_ms", 500.0) in samples and ("collect_ms", 12.0) in samples
+
+def test_collect_slope_fits_frame_counts():
+    stats  = lambda v: {"collect_ms": {"p50": {"value": v}}}
+    groups = {"fixture": {"01 frames": stats(10.0), "02 frames": stats(12.0),
+                          "04 frames": stats(16.0)}}
+    assert abs(collect_slope(groups) - 2.0) < 1e-9
+    assert collect_slope({"fixture": {"01 frames": stats(10.0)}}) is None
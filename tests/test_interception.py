@@ -0,0 +1,35 @@
+import asyncio
+
+from ad_load.utils.interception import RequestInterceptor, exact_url_pattern
+
+def test_exact_url_pattern_escapes_wildcards():
+    assert exact_url_pattern("https://a.example/post?id=1") == r"https://a.example/post\?id=1"
+    assert exact_url_pattern("https://a.example/*/x") == r"https://a.example/\*/x"
+    assert exact_url_pattern("https://a.example/plain/") == "https://a.example/plain/"
+
+class _Tab:
+    def __init__(self):
+        self.session_commands = []
+        self.executed = []
+
+    async def on(self, event, callback):
+        pass
+
+    def add_session_command(self, method, params=None):
+        self.session_commands.append({"method": method, "params": params or {}})
+
+    async def _execute_command(self, command):
+        self.executed.append(command)
+
+def test_session_handlers_share_one_fetch_enable():
+    async def handler(p, session):
+        return False
+
+    tab = _Tab()
+    interceptor = RequestInterceptor(tab)
+    a = [{"urlPattern": "*", "resourceType": "Image", "requestStage": "Request"}]
+    b = [{"urlPattern": "*", "requestStage": "Response"}]
+    asyncio.run(interceptor.add("block", a, handler, sessions=True))
+    asyncio.run(interceptor.add("netcache", b, handler, sessions=True))
+    assert tab.session_commands == [{"method": "Fetch.enable", "params": {"patterns": a + b}}]
+    assert tab.executed[-1]["params"]["patterns"] == a + b
@@ -0,0 +1,73 @@
+import asyncio
+import urllib.request
+
+import pytest
+
+from ad_load.utils import metrics
+from ad_load.utils.metrics import (CONTENT_TYPE, EventMetrics, MetricsServer, Registry, track_run,
+                                   write_metrics)
+
+def test_render_is_openmetrics_text():
+    reg = Registry()
+    reg.counter("x_runs", "Runs").inc(status="ok")
+    reg.gauge("x_depth", "Depth").set(3, queue='a"b')
+    hist = reg.histogram("x_latency_seconds", "Latency", "seconds", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 2):
+        hist.observe(value)
+    assert reg.render().splitlines() == [
+        "# TYPE x_runs counter", "# HELP x_runs Runs",
+        'x_runs_total{status="ok"} 1',
+        "# TYPE x_depth gauge", "# HELP x_depth Depth",
+        'x_depth{queue="a\\"b"} 3',
+        "# TYPE x_latency_seconds histogram", "# HELP x_latency_seconds Latency",
+        "# UNIT x_latency_seconds seconds",
+        'x_latency_seconds_bucket{le="0.1"} 1',
+        'x_latency_seconds_bucket{le="1"} 2',
+        'x_latency_seconds_bucket{le="+Inf"} 3',
+        "x_latency_seconds_count 3",
+        "x_latency_seconds_sum 2.55",
+        "# EOF",
+    ]
+
+def _count(hist):
+    return sum(n for _, n, _ in hist._values.values())
+
+def test_event_metrics_match_latencies_within_a_frame():
+    bid_win, render = _count(metrics.BID_WIN), _count(metrics.RENDER)
+    listener = EventMetrics()
+    frame = {"session": "S1", "frameName": "dsq-app1", "source": "prebid"}
+    listener.on_event({**frame, "type": "auctionInit", "t": 100, "data": {"auctionId": "a"}})
+    listener.on_event({**frame, "type": "bidWon", "t": 400,
+                       "data": {"auctionId": "a", "adUnitCode": "u"}})
+    # Same unit in another frame: no render latency for it
+    listener.on_event({**frame, "session": "S2", "type": "adRenderSucceeded", "t": 450,
+                       "data": {"adUnitCode": "u"}})
+    listener.on_event({**frame, "type": "adRenderSucceeded", "t": 500, "data": {"adUnitCode": "u"}})
+    assert _count(metrics.BID_WIN) == bid_win + 1
+    assert _count(metrics.RENDER) == render + 1
+
+def test_track_run_counts_failures():
+    @track_run
+    async def broken():
+        assert metrics.RUNS_IN_FLIGHT._values[()] >= 1
+        raise RuntimeError("boom")
+
+    before = metrics.RUNS._values.get((("status", "error"),), 0)
+    with pytest.raises(RuntimeError):
+        asyncio.run(broken())
+    assert metrics.RUNS._values[(("status", "error"),)] == before + 1
+
+def test_exporters(tmp_path):
+    reg = Registry()
+    reg.counter("x_events", "Events").inc()
+    path = tmp_path / "metrics.txt"
+    write_metrics(str(path), reg)
+    assert path.read_text().endswith("# EOF\n")
+
+    server = MetricsServer(0, reg)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as resp:
+            assert resp.headers["Content-Type"] == CONTENT_TYPE
+            assert "x_events_total 1" in resp.read().decode()
+    finally:
+        server.stop()
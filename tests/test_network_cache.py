@@ -0,0 +1,58 @@
+import asyncio
+import base64
+import os
+
+from ad_load.utils.network_cache import ResponseStore, NetworkReplayer
+
+def _blobs(root):
+    return [f for _, _, files in os.walk(root / "blobs") for f in files]
+
+def test_store_dedupes_bodies_and_persists_index(tmp_path):
+    store = ResponseStore(str(tmp_path))
+    headers = [{"name": "Content-Type", "value": "text/javascript"},
+               {"name": "Content-Encoding", "value": "gzip"}]
+    store.put("GET", "https://cdn.example/pbjs.js?v=1", None, 200, headers, b"pbjs()", 42.0)
+    store.put("GET", "https://cdn.example/copy.js", None, 200, headers, b"pbjs()")
+
+    assert len(_blobs(tmp_path)) == 1
+
+    reloaded = ResponseStore(str(tmp_path))
+    entry, body = reloaded.get("GET", "https://cdn.example/pbjs.js?v=1")
+    assert body == b"pbjs()"
+    assert entry["delay_ms"] == 42.0
+    assert entry["headers"] == [{"name": "Content-Type", "value": "text/javascript"}]
+
+def test_store_keys_on_post_body_and_falls_back_to_path(tmp_path):
+    store = ResponseStore(str(tmp_path))
+    store.put("POST", "https://bid.example/auction", '{"a":1}', 200, [], b"one")
+    store.put("POST", "https://bid.example/auction", '{"a":2}', 200, [], b"two")
+
+    assert store.get("POST", "https://bid.example/auction", '{"a":1}')[1] == b"one"
+    # Unseen body or query string: latest response recorded for the same path
+    assert store.get("POST", "https://bid.example/auction?cb=9", '{"a":3}')[1] == b"two"
+    assert store.get("GET", "https://bid.example/auction") is None
+
+class _FakeInterceptor:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, command, session=None):
+        self.sent.append((command, session))
+
+def test_replayer_fulfills_hits_and_fails_misses(tmp_path):
+    store = ResponseStore(str(tmp_path))
+    store.put("GET", "https://cdn.example/gpt.js", None, 200, [], b"gpt")
+    replayer = NetworkReplayer(store)
+    interceptor = _FakeInterceptor()
+
+    def paused(url):
+        return {"requestId": "R1", "request": {"method": "GET", "url": url}}
+
+    asyncio.run(replayer.handle(interceptor, paused("https://cdn.example/gpt.js"), "S1"))
+    asyncio.run(replayer.handle(interceptor, paused("https://live.example/x"), None))
+
+    (hit, hit_session), (miss, _) = interceptor.sent
+    assert hit["method"] == "Fetch.fulfillRequest" and hit_session == "S1"
+    assert base64.b64decode(hit["params"]["body"]) == b"gpt"
+    assert miss["method"] == "Fetch.failRequest"
+    assert replayer.stats == {"hits": 1, "misses": 1}
@@ -0,0 +1,18 @@
+from ad_load.modes.overhead import compare_arms, plan_arms
+
+def test_plan_arms_alternates():
+    assert [arm for _, arm in plan_arms(["none", "quiet"], 2)] == ["none", "quiet", "none", "quiet"]
+    assert plan_arms(["none"], 1) == [("none-001", "none")]
+
+def test_compare_arms_reports_shift_against_baseline():
+    probes = {
+        "none":    [{"fcp": 100.0, "script_ms": 10.0}, {"fcp": 110.0, "script_ms": 12.0}],
+        "verbose": [{"fcp": 120.0, "script_ms": 30.0}, {"fcp": 130.0, "script_ms": None}],
+    }
+    result = compare_arms(probes, n_boot=50)
+
+    assert result["fcp"]["none"]["median"] == 105.0
+    assert result["fcp"]["verbose"]["delta"] == 20.0
+    assert abs(result["fcp"]["verbose"]["shift"] - 20 / 105) < 1e-9
+    assert result["script_ms"]["verbose"]["n"] == 1
+    assert "lcp" not in result
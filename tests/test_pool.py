@@ -0,0 +1,14 @@
+from ad_load.modes.pool import JOB_SETUP, job_attempt, job_deadline, make_jobs
+
+def test_job_deadline_covers_timeout_and_soak():
+    assert job_deadline({"timeout": 30}) == 30 + JOB_SETUP
+    assert job_deadline({"timeout": 300, "soak": None}) == 300 + JOB_SETUP
+    assert job_deadline({"timeout": 30, "soak": 3600.0}) == 3630 + JOB_SETUP
+
+def test_retries_get_their_own_run_id():
+    (job,) = make_jobs([("boxing", "https://x.com/")], 1, ["desktop"], "out", sweep_id="s")
+    assert job_attempt(job) is job
+    job["attempt"] = 2
+    retry = job_attempt(job)
+    assert retry["run_id"] == "s-boxing-001-a2" and retry["job"] == "s-boxing-001"
+    assert retry["out_dir"].endswith("s-boxing-001-a2")
@@ -0,0 +1,29 @@
+import pytest
+
+from ad_load.main import target_profile
+from ad_load.utils.profiles import PROFILES, get_profile, profile_commands
+
+def test_get_profile_includes_name():
+    assert get_profile(None) is None
+    assert get_profile("low-end-3g")["name"] == "low-end-3g"
+    with pytest.raises(ValueError):
+        get_profile("dial-up")
+
+def test_profile_commands():
+    methods = [c["method"] for c in profile_commands(get_profile("fast-desktop"))]
+    assert methods == ["Network.emulateNetworkConditions", "Emulation.setCPUThrottlingRate"]
+
+    commands = profile_commands(get_profile("mid-android-4g"))
+    assert commands[1]["params"]["rate"] == PROFILES["mid-android-4g"]["cpu"]
+    assert commands[-1]["method"] == "Emulation.setUserAgentOverride"
+
+def test_cli_profile_overrides_site():
+    sites = {"boxing": {"url": "https://example.com", "profile": "low-end-3g"}}
+    assert target_profile(sites, "boxing") == "low-end-3g"
+    assert target_profile(sites, "boxing", "fast-desktop") == "fast-desktop"
+    assert target_profile(sites, "example.com") is None
+
+def test_unknown_site_profile_exits_with_choices():
+    sites = {"boxing": {"url": "https://example.com", "profile": "dial-up"}}
+    with pytest.raises(SystemExit, match="'dial-up' for boxing.*low-end-3g"):
+        target_profile(sites, "boxing")
@@ -0,0 +1,99 @@
+import json
+
+import numpy as np
+
+from ad_load.utils.report import compare, format_regression, load_samples, run_metrics, summarize
+
+def _summary(url, ttfb, profile=None):
+    return {
+        "run": {"url": url, "profile": {"name": profile} if profile else None},
+        "performance": {
+            "top": {"ttfb": ttfb, "fcp": 200.0, "lcp": None, "pageLoadTime": 5000},
+            "iframe": {"ttfb": 1.0, "fcp": 2.0, "pageLoadTime": 900},
+        },
+        "prebid": {
+            "dsq-app1": {
+                "auctions": [{"auctionId": "a", "startTime": 300.0}],
+                "bidWins": [{"auctionId": "a", "adUnitCode": "u", "winTime": 450.0}],
+                "adRenders": [{"adUnitCode": "u", "renderTime": 500.0}],
+            },
+        },
+    }
+
+def test_run_metrics_uses_top_frame_and_pairs_wins():
+    metrics = dict(run_metrics(_summary("https://a.example/", 80.0)))
+    assert metrics == {"ttfb": 80.0, "fcp": 200.0, "first_auction": 300.0,
+                       "bid_win": 150.0, "win_to_render": 50.0}
+
+def test_win_pairs_with_first_render_after_it():
+    # Two refresh cycles of the same unit: the second win must not pair with
+    # the first cycle's render
+    summary = _summary("https://a.example/", 80.0)
+    frame   = summary["prebid"]["dsq-app1"]
+    frame["bidWins"].append({"auctionId": "b", "adUnitCode": "u", "winTime": 1450.0})
+    frame["adRenders"].append({"adUnitCode": "u", "renderTime": 1470.0})
+    renders = [v for m, v in run_metrics(summary) if m == "win_to_render"]
+    assert renders == [50.0, 20.0]
+
+def test_load_samples_reads_sweeps_and_single_runs(tmp_path):
+    sweep = tmp_path / "sweep"
+    sweep.mkdir()
+    merged = {f"boxing-{i:03d}": _summary("https://www.boxingnews24.com/x", 100.0 + i, "low-end-3g")
+              for i in range(3)}
+    (sweep / "merged.json").write_text(json.dumps(merged))
+    (sweep / "index.json").write_text(json.dumps({"results": {k: {"target": "boxing"} for k in merged}}))
+    # Run directories inside a sweep are covered by merged.json
+    (sweep / "boxing-000").mkdir()
+    (sweep / "boxing-000" / "run.json").write_text("{}")
+
+    single = tmp_path / "single"
+    single.mkdir()
+    s = _summary("https://www.example.com/post", 90.0)
+    (single / "run.json").write_text(json.dumps(s["run"]))
+    (single / "performance_metrics.json").write_text(json.dumps(s["performance"]))
+    (single / "prebid_summaries.json").write_text(json.dumps(s["prebid"]))
+
+    samples, sources = load_samples([str(tmp_path)])
+
+    assert sources == 2
+    assert list(samples[("boxing", "low-end-3g", "ttfb")]) == [100.0, 101.0, 102.0]
+    assert list(samples[("example.com", "default", "ttfb")]) == [90.0]
+
+def test_compare_flags_only_significant_slowdowns():
+    rng  = np.random.default_rng(1)
+    base = summarize({("s", "default", "ttfb"): rng.normal(100, 5, 400)}, n_boot=200)
+    same = summarize({("s", "default", "ttfb"): rng.normal(100, 5, 400)}, n_boot=200)
+    slow = summarize({("s", "default", "ttfb"): rng.normal(130, 5, 400)}, n_boot=200)
+
+    assert compare(same, base) == []
+    flagged = compare(slow, base)
+    assert {r["percentile"] for r in flagged} == {"p50", "p95"}
+    assert flagged[0]["change"] > 0.2
+
+def test_store_samples_match_file_samples(tmp_path):
+    from ad_load.utils.report import load_store_samples
+    from ad_load.utils.results_store import save_runs
+
+    summary = _summary("https://a.example/", 80.0, "low-end-3g")
+    summary["run"].update({"run_id": "a-001", "site": "a", "started": 100.0,
+                           "filmstrip": {"speed_index": 900.0,
+                                         "slots": [{"gap_ms": 120.0}, {"gap_ms": None}]}})
+    # A refresh cycle, so the store has to pair each win with its own render
+    summary["prebid"]["dsq-app1"]["bidWins"].append(
+        {"auctionId": "b", "adUnitCode": "u", "winTime": 1450.0})
+    summary["prebid"]["dsq-app1"]["adRenders"].append({"adUnitCode": "u", "renderTime": 1470.0})
+    save_runs(str(tmp_path / "r.db"), [summary])
+
+    samples, runs = load_store_samples(str(tmp_path / "r.db"))
+    assert runs == 1
+    expected = {}
+    for metric, value in run_metrics(summary):
+        expected.setdefault(metric, []).append(value)
+    assert {k[2]: sorted(v) for k, v in samples.items()} == {k: sorted(v) for k, v in expected.items()}
+    assert expected["win_to_render"] == [50.0, 20.0]
+    assert load_store_samples(str(tmp_path / "r.db"), since=200.0)[1] == 0
+
+def test_regressions_print_each_metric_in_its_unit():
+    r = {"site": "s", "profile": "default", "percentile": "p50", "baseline": 1.0, "current": 2.0}
+    assert format_regression({**r, "metric": "ttfb"}).endswith("1.0 -> 2.0 ms")
+    assert format_regression({**r, "metric": "heap_growth"}).endswith("1.0 -> 2.0 MB/h")
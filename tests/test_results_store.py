@@ -0,0 +1,70 @@
+import sqlite3
+
+import pytest
+
+from ad_load.utils.results_store import load_run, query_samples, run_rows, save_run, save_runs
+
+def _summary(run_id, site="boxing"):
+    return {
+        "run": {"run_id": run_id, "site": site, "url": "https://x.example/",
+                "started": 1000.0, "completed": True, "profile": None},
+        "prebid": {"dsq-app1": {
+            "frameName": "dsq-app1",
+            "auctions": [{"auctionId": "a", "startTime": 10.0, "endTime": 30.0, "duration": 20.0}],
+            "bidWins": [{"auctionId": "a", "bidder": "b", "cpm": 1.5, "adUnitCode": "u", "winTime": 40.0}],
+            "adRenders": [{"adUnitCode": "u", "renderTime": 60.0}],
+            "adRenderFailures": [{"adUnitCode": "v", "reason": "x", "failTime": 70.0}],
+        }},
+        "google_ads": {"dsq-app1": {"frameName": "dsq-app1", "slots": {}}},
+        "performance": {"F1": {"ttfb": 5.0, "fcp": 9.0, "pageLoadTime": 100.0}},
+    }
+
+def test_run_rows_normalizes_summary():
+    rows = run_rows(_summary("r1"))
+    assert len(rows["frames"]) == 3
+    assert rows["bids"] == [("r1", "dsq-app1", "a", "b", 1.5, "u", 40.0)]
+    assert [r[4] for r in rows["renders"]] == [0, 1]
+
+def test_save_round_trips_and_refuses_reused_ids(tmp_path):
+    db = str(tmp_path / "results.db")
+    save_runs(db, [_summary("r1"), _summary("r2", site="pixel")])
+    with pytest.raises(ValueError, match="r1"):
+        save_run(db, _summary("r1"))
+    with pytest.raises(ValueError, match="r3"):
+        save_runs(db, [_summary("r3"), _summary("r3")])
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM auctions").fetchone()[0] == 2
+    assert conn.execute("SELECT site FROM runs ORDER BY run_id").fetchall() == [("boxing",), ("pixel",)]
+    conn.close()
+
+    assert load_run(db, "r1") == _summary("r1")
+    assert load_run(db, "missing") is None
+
+def test_old_store_gains_new_vitals_columns(tmp_path):
+    db = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE vitals (run_id TEXT NOT NULL, frame_id TEXT, ttfb REAL, fcp REAL,"
+                 " lcp REAL, dom_content_loaded REAL, load_event REAL, page_load_time REAL)")
+    conn.close()
+
+    save_run(db, _summary("r1"))
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT ttfb, frame_name FROM vitals").fetchall() == [(5.0, None)]
+    conn.close()
+
+def test_cache_mode_splits_report_groups(tmp_path):
+    db = str(tmp_path / "results.db")
+    warm = _summary("r2")
+    warm["run"]["cache"] = {"mode": "warm"}
+    save_runs(db, [_summary("r1"), warm])
+
+    groups = {(site, profile) for site, profile, *_ in query_samples(db)}
+    assert groups == {("boxing", "default"), ("boxing", "default+warm")}
+
+def test_new_ids_differ_within_a_second():
+    from ad_load.utils.results_store import new_id
+    assert len({new_id() for _ in range(50)}) == 50
+    assert new_id("overhead-").startswith("overhead-")
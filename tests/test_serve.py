@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+from ad_load.modes import serve as serve_mod
+from ad_load.modes.serve import Daemon, process_tree_rss_mb, submit
+
+class _FakeBrowser:
+    def __init__(self):
+        self.stopped = False
+
+    async def get_version(self):
+        return {"product": "Chrome/fake"}
+
+def _patch(monkeypatch, launched, runs):
+    async def launch(device, headless):
+        launched.append(_FakeBrowser())
+        return launched[-1]
+    async def stop(browser):
+        browser.stopped = True
+    async def fake_run(browser, url, run_id=None, site=None, **opts):
+        runs.append((browser, url, site, opts))
+        return {"run": {"run_id": run_id, "url": url}}
+    monkeypatch.setattr(serve_mod, "launch_browser", launch)
+    monkeypatch.setattr(serve_mod, "stop_browser", stop)
+    monkeypatch.setattr(serve_mod, "runner", lambda mode: fake_run)
+
+def test_process_tree_rss_counts_this_process():
+    assert process_tree_rss_mb(os.getpid()) > 0
+
+def test_daemon_runs_jobs_over_socket_and_recycles(tmp_path, monkeypatch):
+    launched, runs = [], []
+    _patch(monkeypatch, launched, runs)
+    sock = str(tmp_path / "d.sock")
+
+    async def run():
+        daemon = Daemon(browsers=1, max_runs=2, out_dir=str(tmp_path))
+        await daemon.start()
+        server = await asyncio.start_unix_server(daemon.handle, path=sock)
+        events = []
+        try:
+            for _ in range(3):
+                result = await submit({"cmd": "run", "url": "https://a.example/x", "site": "a",
+                                       "options": {"timeout": 5, "headless": False, "bogus": 1}},
+                                      sock, on_event=events.append)
+                assert result["event"] == "done"
+            health = await submit({"cmd": "health"}, sock)
+        finally:
+            server.close()
+            await daemon.close()
+        return events, health
+    events, health = asyncio.run(run())
+
+    assert [e["event"] for e in events] == ["queued", "started"] * 3
+    for *_, opts in runs:
+        assert opts["timeout"] == 5 and opts["headless"] is True and "bogus" not in opts
+    # Two runs on the first browser, then a fresh one
+    assert len(launched) == 2 and launched[0].stopped
+    assert runs[0][0] is runs[1][0] is launched[0] and runs[2][0] is launched[1]
+    assert health["done"] == 3
+    assert health["browsers"][0]["generation"] == 2
+
+def test_monitor_and_job_never_recycle_the_same_browser_twice(tmp_path, monkeypatch):
+    launched, runs = [], []
+    _patch(monkeypatch, launched, runs)
+
+    class _Hung(_FakeBrowser):
+        async def get_version(self):
+            await asyncio.sleep(0.1)
+            raise ConnectionError("no answer")
+
+    async def launch(device, headless):
+        launched.append(_Hung() if not launched else _FakeBrowser())
+        return launched[-1]
+    monkeypatch.setattr(serve_mod, "launch_browser", launch)
+
+    async def run():
+        daemon = Daemon(browsers=1, health_interval=0.01, out_dir=str(tmp_path))
+        await daemon.start()
+        try:
+            # Queued while the monitor is still waiting on the hung browser
+            await asyncio.sleep(0.03)
+            reply = asyncio.Queue()
+            await daemon.jobs.put(({"run_id": "r1", "url": "https://a.example/"}, reply))
+            while (msg := await reply.get())["event"] != "done":
+                pass
+        finally:
+            await daemon.close()
+    asyncio.run(run())
+
+    # One relaunch, by the monitor; the job ran on the replacement
+    assert len(launched) == 2 and launched[0].stopped
+    assert runs[0][0] is launched[1]
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from ad_load.utils.soak import SoakSampler, auction_drift, heap_growth, parse_duration
+
+def test_parse_duration():
+    assert parse_duration("90") == 90
+    assert parse_duration("15m") == 900
+    assert parse_duration("1.5h") == 5400
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+def test_heap_growth_reads_floors_not_gc_peaks():
+    times    = np.arange(60) * 60.0
+    sawtooth = 50 + (np.arange(60) % 10) * 3
+    flat     = heap_growth(times, sawtooth)
+    assert not flat["monotonic"]
+
+    leaking = heap_growth(times, sawtooth + np.arange(60) * 0.5)
+    assert leaking["monotonic"]
+    assert leaking["slope_mb_per_h"] > 0
+
+def test_auction_drift_compares_late_cycles_with_early_ones():
+    assert "drift" not in auction_drift(np.array([100.0, 110.0]))
+    assert not auction_drift(np.full(9, 100.0))["drift"]
+    assert auction_drift(np.array([100.0] * 3 + [150.0] * 3 + [200.0] * 3))["drift"]
+
+class _CDP:
+    def __init__(self):
+        self.sessions = {"S1": {"type": "iframe", "url": "https://disqus.com/embed"},
+                         "S2": {"type": "iframe", "url": "https://disqus.com/embed"},
+                         "W1": {"type": "worker"}}
+        self.sent = []
+        self.routes = {}
+
+    async def on(self, event, callback):
+        self.routes[event] = callback
+
+    async def send_many(self, commands, session=None, timeout=None):
+        self.sent.append((session, [c["method"] for c in commands]))
+        metrics = [{"name": "JSHeapUsedSize", "value": 10 * (1 << 20)},
+                   {"name": "Nodes", "value": 400}, {"name": "TaskDuration", "value": 0.5}]
+        return [{"result": {}}] * (len(commands) - 1) + [{"result": {"metrics": metrics}}]
+
+class _Tab:
+    def __init__(self):
+        self.cdp = _CDP()
+
+def test_sampler_keeps_bounded_series_per_target(tmp_path):
+    tab     = _Tab()
+    sampler = SoakSampler(tab, str(tmp_path / "soak.ndjson"), interval=0, capacity=2)
+    for _ in range(3):
+        asyncio.run(sampler.run(0))
+
+    # Performance.enable goes out once per target; workers are not sampled
+    assert tab.cdp.sent[:3] == [(None, ["Performance.enable", "Performance.getMetrics"]),
+                                ("S1", ["Performance.enable", "Performance.getMetrics"]),
+                                ("S2", ["Performance.enable", "Performance.getMetrics"])]
+    assert tab.cdp.sent[3] == (None, ["Performance.getMetrics"])
+    # Frames sharing a URL keep separate series
+    assert set(sampler.samples) == {"page", "S1", "S2"}
+    assert len(sampler.samples["page"]) == 2
+    with open(sampler.path) as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 9
+    assert rows[0]["heap_mb"] == 10 and rows[0]["task_ms"] == 500
+    assert rows[1]["target"] == "S1" and rows[1]["url"] == "https://disqus.com/embed"
+    assert sampler.summary()["targets"]["S2"]["url"] == "https://disqus.com/embed"
+
+def test_sampler_counts_refresh_cycles_per_frame(tmp_path):
+    sampler = SoakSampler(_Tab(), str(tmp_path / "soak.ndjson"), max_cycles=2)
+    for i, duration in enumerate((100, 120, 300)):
+        sampler.on_event({"type": "auctionInit", "frameName": "dsq-app1", "ts": i,
+                          "data": {"auctionId": str(i)}})
+        sampler.on_event({"type": "auctionEnd", "frameName": "dsq-app1", "ts": i + 0.1,
+                          "data": {"auctionId": str(i), "duration": duration}})
+    assert [c["cycle"] for c in sampler.cycles] == [2, 3]
+    summary = sampler.summary()
+    assert summary["cycles"] == 3
+    assert summary["auctions"]["dsq-app1"]["cycles"] == 2
+
+def test_sampler_folds_detached_sessions_and_caps_targets(tmp_path):
+    tab     = _Tab()
+    sampler = SoakSampler(tab, str(tmp_path / "soak.ndjson"), interval=0,
+                          max_targets=1, max_closed=1)
+    asyncio.run(sampler.attach())
+    asyncio.run(sampler.run(0))
+    # Only one iframe session fits; the other is counted, not sampled
+    assert set(sampler.samples) == {"page", "S1"}
+    assert sampler.untracked == 1
+
+    # A refresh replaces S1: its series is folded and S2 takes the free place
+    del tab.cdp.sessions["S1"]
+    tab.cdp.routes["Target.detachedFromTarget"]({"params": {"sessionId": "S1"}})
+    asyncio.run(sampler.run(0))
+    assert set(sampler.samples) == {"page", "S2"}
+    assert "S1" not in sampler._enabled
+
+    summary = sampler.summary()
+    assert summary["detached"] == 1
+    assert [c["target"] for c in summary["closed"]] == ["S1"]
+    assert summary["closed"][0]["samples"] == 1
+    assert set(summary["targets"]) == {"page", "S2"}
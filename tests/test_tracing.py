@@ -0,0 +1,88 @@
+import asyncio
+import gzip
+import json
+
+from ad_load.utils.tracing import TraceRecorder, classify_url, iter_trace_events, summarize_trace
+
+def _write_trace(path, events):
+    body = '{"traceEvents":[' + ",\n".join(json.dumps(e) for e in events) + '],"metadata":{}}'
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(body)
+
+def _x(name, ts, dur, tid=1, **data):
+    return {"name": name, "ph": "X", "pid": 7, "tid": tid, "ts": ts, "dur": dur,
+            "args": {"data": data}}
+
+def test_classify_url():
+    assert classify_url("https://c.disquscdn.com/prebid.9.js") == "prebid"
+    assert classify_url("https://securepubads.g.doubleclick.net/tag/js/gpt.js") == "gpt"
+    assert classify_url("https://disqus.com/embed/comments/") == "disqus"
+    assert classify_url("https://fastlane.rubiconproject.com/a/api") == "rubiconproject.com"
+    assert classify_url(None) == "unattributed"
+
+def test_iter_trace_events_across_chunks(tmp_path):
+    path   = tmp_path / "trace.json.gz"
+    events = [{"name": f"e{i}", "args": {"s": "x" * 50}} for i in range(40)]
+    _write_trace(path, events)
+
+    assert list(iter_trace_events(str(path), chunk_size=7)) == events
+
+def test_attribution_per_disqus_frame(tmp_path):
+    path = tmp_path / "trace.json.gz"
+    _write_trace(path, [
+        {"name": "TracingStartedInBrowser", "ph": "I", "args": {"data": {"frames": [
+            {"frame": "TOP", "name": "", "processId": 1},
+            {"frame": "DSQ", "name": "dsq-app1", "parent": "TOP", "processId": 7},
+            {"frame": "AD", "name": "google_ads_iframe_1", "parent": "DSQ", "processId": 9},
+        ]}}},
+        # Child first, as Chrome writes complete events when they end
+        _x("FunctionCall", 1000, 70000, frame="DSQ", url="https://x.example/prebid.js"),
+        _x("RunTask", 900, 80000),
+        # Parent first: the task stays open until a later event ends it
+        _x("RunTask", 200000, 60000, tid=2),
+        _x("EvaluateScript", 200100, 50000, tid=2, frame="AD", url="https://ads.bidder.com/c.js"),
+        _x("Layout", 300000, 4000, tid=2, frame="DSQ"),
+        _x("RunTask", 400000, 10000),
+    ])
+
+    summary = summarize_trace(str(path))
+    frame   = summary["frames"]["dsq-app1"]
+
+    assert summary["events"] == 7
+    assert frame["prebid"]["script_ms"] == 70.0
+    assert frame["prebid"]["long_tasks"] == 1 and frame["prebid"]["long_task_ms"] == 80.0
+    assert frame["bidder.com"]["long_tasks"] == 1 and frame["bidder.com"]["script_ms"] == 50.0
+    assert frame["unattributed"]["layout_ms"] == 4.0
+
+def test_nested_scripts_are_counted_once(tmp_path):
+    nested = [
+        _x("v8.compile", 1100, 2000, frame="F", url="https://x.example/prebid.js"),
+        _x("FunctionCall", 1000, 8000, frame="F", url="https://x.example/prebid.js"),
+        _x("EvaluateScript", 900, 10000, frame="F", url="https://a.bidder.com/x.js"),
+    ]
+    for order in (nested, nested[::-1]):
+        path = tmp_path / "trace.json.gz"
+        _write_trace(path, [_x("RunTask", 0, 1000, tid=2)] + order + [_x("RunTask", 800, 12000)])
+
+        frame = summarize_trace(str(path))["frames"]["other"]
+
+        assert frame["prebid"]["script_ms"] == 8.0
+        assert frame["bidder.com"]["script_ms"] == 2.0
+        assert sum(b["script_ms"] for b in frame.values()) == 10.0
+
+def test_abort_ends_a_running_trace_once():
+    class Tab:
+        def __init__(self):
+            self.sent = []
+        async def _execute_command(self, command):
+            self.sent.append(command["method"])
+
+    async def run():
+        tab = Tab()
+        recorder = TraceRecorder(tab, "unused.json.gz")
+        await recorder.abort()
+        await recorder.start()
+        await recorder.abort()
+        await recorder.abort()
+        return tab.sent
+    assert asyncio.run(run()) == ["Tracing.start", "Tracing.end"]